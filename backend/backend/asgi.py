@@ -5,6 +5,21 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+ASGI deployment mode: run gunicorn with uvicorn workers instead of the sync
+workers used by the Procfile's WSGI entry point, e.g.
+
+    gunicorn --chdir backend backend.asgi:application \
+        -k uvicorn_worker.UvicornWorker --workers 4
+
+Each worker then serves many dashboard requests concurrently through the
+async views under /api/async/ (gestao.async_views), while the sync views
+keep working (Django runs them in a thread pool). The streamed export and
+bulk import stay streamed: under ASGI they hand Django an async iterator
+(gestao.views.streaming_response) instead of one it would first read into
+memory whole. Set
+GESTAO_ASYNC_PARALLEL_QUERIES=1 to also run the independent queries of a
+request on separate database connections.
 """
 
 import os
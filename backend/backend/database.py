@@ -0,0 +1,97 @@
+"""
+Database profiles for the DATABASES setting.
+
+- Postgres (DATABASE_URL set): persistent connections with health checks,
+  or psycopg 3 connection pooling (Django 5.1+ "pool" option) when
+  DB_POOL=1.
+- SQLite (local default): WAL journal, synchronous=NORMAL, mmap and a busy
+  timeout applied on every new connection, plus BEGIN IMMEDIATE so
+  concurrent writers wait for the lock instead of failing.
+
+Tunables come from environment variables, see the defaults below.
+"""
+import importlib.util
+import os
+
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA mmap_size={mmap_size}',
+    'PRAGMA cache_size=-{cache_kib}',
+    'PRAGMA temp_store=MEMORY',
+)
+
+
+def _env_bool(name, default=False):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+def sqlite_profile(path, tuned=True):
+    """
+    Returns the settings dict of a SQLite database. With tuned=False it is
+    Django's plain default (used as the benchmark reference).
+    """
+    database = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': path,
+    }
+    if not tuned:
+        return database
+    pragmas = '; '.join(SQLITE_PRAGMAS).format(
+        mmap_size=_env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        cache_kib=_env_int('SQLITE_CACHE_KIB', 64 * 1024),
+    )
+    database['OPTIONS'] = {
+        'init_command': pragmas,
+        # Segundos de espera pelo lock (busy timeout) antes de "database is locked"
+        'timeout': _env_int('SQLITE_BUSY_TIMEOUT', 20),
+        'transaction_mode': 'IMMEDIATE',
+    }
+    return database
+
+
+def postgres_profile(url):
+    """
+    Returns the settings dict of a Postgres database from a DATABASE_URL.
+    """
+    database = dj_database_url.parse(url, ssl_require=_env_bool('DB_SSL_REQUIRE', True))
+    if _env_bool('DB_POOL'):
+        if importlib.util.find_spec('psycopg_pool') is None:
+            raise ImproperlyConfigured("DB_POOL=1 requires psycopg 3 with the pool extra (psycopg[pool]).")
+        # Pooling replaces persistent connections: Django requires CONN_MAX_AGE = 0.
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': _env_int('DB_POOL_MIN_SIZE', 2),
+            'max_size': _env_int('DB_POOL_MAX_SIZE', 10),
+            'timeout': _env_int('DB_POOL_TIMEOUT', 10),
+        }
+    else:
+        database['CONN_MAX_AGE'] = _env_int('DB_CONN_MAX_AGE', 600)
+        database['CONN_HEALTH_CHECKS'] = True
+    if 'CI' in os.environ:
+        # Mesmo comportamento do django_heroku: testes usam o banco do CI
+        database['TEST'] = {'NAME': database['NAME']}
+    return database
+
+
+def database_settings(base_dir):
+    """
+    Builds DATABASES: Postgres from DATABASE_URL when set, otherwise the
+    local SQLite file (SQLITE_TUNED=0 turns the pragmas off).
+    """
+    url = os.environ.get('DATABASE_URL')
+    if url:
+        default = postgres_profile(url)
+    else:
+        default = sqlite_profile(base_dir / 'db.sqlite3', tuned=_env_bool('SQLITE_TUNED', True))
+    return {'default': default}
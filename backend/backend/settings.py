@@ -14,6 +14,10 @@ import os
 
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
+from .database import database_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -49,6 +53,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'gestao.middleware.RequestMetricsMiddleware',
+    'gestao.middleware.CompressionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -82,12 +88,8 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# Postgres (DATABASE_URL) or tuned SQLite, see backend/database.py
+DATABASES = database_settings(BASE_DIR)
 
 
 # Password validation
@@ -137,18 +139,94 @@ CORS_ALLOWED_ORIGINS = [
         "https://domu-two.vercel.app"
 ]
 
+# O frontend escolhe o condomínio pelo cabeçalho X-Condominium (gestao.tenancy)
+CORS_ALLOW_HEADERS = (*default_headers, 'x-condominium')
+
 # CORS_ALLOWED_ORIGIN_REGEXES = [
 #    r"^https://domu\w+\.vercel\.app$",
 # ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-         'rest_framework.authentication.TokenAuthentication',
+         'gestao.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ]
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; set REDIS_URL to share the cache between workers.
+
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Versioned cache of summary payloads (gestao.cache)
+GESTAO_CACHE_ALIAS = 'default'
+GESTAO_CACHE_TIMEOUT = 60 * 60
+
+# Cached token authentication (gestao.authentication): in-process LRU of
+# resolved tokens, optionally shared through a cache alias (e.g. 'default').
+# With several processes, set the alias: revoked tokens then stop working in
+# all of them at once instead of after up to the TTL.
+GESTAO_TOKEN_CACHE_SIZE = 1024
+GESTAO_TOKEN_CACHE_TTL = 60
+GESTAO_TOKEN_CACHE_SHARED_ALIAS = 'default' if REDIS_URL else None
+
+# Per-request SQL/timing instrumentation (Server-Timing header + /api/_metrics/)
+GESTAO_REQUEST_METRICS = os.environ.get('GESTAO_REQUEST_METRICS', '').lower() in ('1', 'true', 'yes')
+
+# Async dashboard views (gestao.async_views): run independent queries of a
+# request on separate connections instead of sequentially on one.
+GESTAO_ASYNC_PARALLEL_QUERIES = os.environ.get('GESTAO_ASYNC_PARALLEL_QUERIES', '').lower() in ('1', 'true', 'yes')
+
+# Delta sync feed (gestao.sync): changes stamped less than this many seconds
+# ago are sent but the token is not moved past them, since a transaction
+# holding a lower change number may still commit. Keep it above twice the
+# longest write transaction.
+GESTAO_SYNC_SETTLE_SECONDS = 120
+
+# Dashboard bundle endpoint (gestao.bundle): worker threads running the parts
+# of a bundle concurrently on Postgres (0 = one after the other).
+GESTAO_BUNDLE_WORKERS = int(os.environ.get('GESTAO_BUNDLE_WORKERS', 4))
+
+# Optional yearly partitioning of gestao_expense on Postgres (gestao.partitioning,
+# manage.py partition_expenses): partitions kept ready this many years ahead.
+GESTAO_EXPENSE_PARTITION_YEARS_AHEAD = 2
+
+# Expense admin changelist (gestao.admin): above this many rows the page count
+# comes from the Postgres planner's estimate instead of COUNT(*).
+GESTAO_ADMIN_EXACT_COUNT_LIMIT = 10000
+
+# Response compression (gestao.middleware.CompressionMiddleware): brotli when
+# the client accepts it and the package is installed (never for HTML, which
+# keeps Django's BREACH-padded gzip), gzip otherwise, for bodies of at least
+# this many bytes.
+GESTAO_COMPRESSION_MIN_SIZE = 1024
+GESTAO_BROTLI_QUALITY = 5
+
+# Background jobs (gestao.jobs, `manage.py run_worker`): jobs run at once per
+# worker, attempts per job, first retry delay in seconds (doubled on each
+# retry), how often a running job refreshes its lock and how long a job may
+# go without a refresh before it is considered lost.
+GESTAO_WORKER_CONCURRENCY = int(os.environ.get('GESTAO_WORKER_CONCURRENCY', 4))
+GESTAO_JOB_MAX_ATTEMPTS = 3
+GESTAO_JOB_RETRY_DELAY = 5
+GESTAO_JOB_HEARTBEAT = 60
+GESTAO_JOB_TIMEOUT = 15 * 60
+
 # Needs to be at the very EOF!!
-django_heroku.settings(locals())
+django_heroku.settings(locals(), databases=False)
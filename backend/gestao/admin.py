@@ -1,17 +1,143 @@
-from django.contrib import admin
+import json
 
-from .models import Expense, Category
+from django.conf import settings
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from . import fingerprints
+from .models import Condominium, Expense, Category, RecurringExpense
+
+
+def get_exact_count_limit():
+    return getattr(settings, 'GESTAO_ADMIN_EXACT_COUNT_LIMIT', 10000)
+
+
+def estimated_count(queryset):
+    """
+    Returns the planner's row estimate for a queryset on Postgres (table
+    statistics when it has no filters, EXPLAIN otherwise), or None where no
+    estimate is available.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    if queryset.query.where:
+        plan = json.loads(queryset.order_by().explain(format='json'))
+        return int(plan[0]['Plan']['Plan Rows'])
+    with connection.cursor() as cursor:
+        # Soma as partições quando a tabela é particionada (gestao.partitioning);
+        # reltuples vale -1 em tabelas nunca analisadas e no pai particionado.
+        cursor.execute(
+            'SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint FROM pg_class c '
+            'WHERE c.oid = to_regclass(%s) '
+            'OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))',
+            [queryset.model._meta.db_table] * 2,
+        )
+        return cursor.fetchone()[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that uses the planner's estimate instead of COUNT(*) once it
+    goes past GESTAO_ADMIN_EXACT_COUNT_LIMIT rows; small results (and every
+    result on SQLite) are still counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate > get_exact_count_limit():
+            return estimate
+        return super().count
+
+
+class DuplicateListFilter(admin.SimpleListFilter):
+    """
+    Narrows the changelist to expenses that share their fingerprint with
+    another expense of the same condominium (see gestao.fingerprints).
+    """
+    title = "possíveis duplicadas"
+    parameter_name = 'duplicate'
+
+    def lookups(self, request, model_admin):
+        return (('yes', "Sim"),)
+
+    def queryset(self, request, queryset):
+        if self.value() == 'yes':
+            return fingerprints.with_duplicates(queryset)
+        return queryset
+
+
+@admin.register(Condominium)
+class CondominiumAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'created_at')
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
+    filter_horizontal = ('members',)
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', )
+    list_display = ('name', 'condominium', 'monthly_budget')
+    list_filter = ('condominium',)
+    list_select_related = ('condominium',)
     search_fields = ('name', )
 
 @admin.register(Expense)
 class ExpenseAdmin(admin.ModelAdmin):
-    list_display = ("description", "amount", "date", "category", "id")
-    list_filter = ("date", "category")
-    search_fields = ("description", "category__name")
+    """
+    Changelist tuned for large expense tables: categories come in the same
+    query, page counts are estimated on Postgres, search is a prefix search
+    served by gestao_exp_desc_prefix_idx and the date hierarchy is cached
+    (see templates/admin/gestao/expense/change_list.html). Likely double
+    entries are flagged on save and listed by the "possíveis duplicadas"
+    filter, never rejected.
+    """
+    list_display = ("description", "amount", "date", "category", "condominium", "id")
+    list_filter = ("condominium", "date", "category", DuplicateListFilter)
+    list_select_related = ("category", "condominium")
+    search_fields = ("^description",)
+    search_help_text = "Busca pelo início da descrição."
     date_hierarchy = "date"
-    ordering = ("-date",)
+    # Mesma ordem do índice gestao_exp_date_id_desc_idx
+    ordering = ("-date", "-id")
+    raw_id_fields = ("category",)
+    paginator = EstimatedCountPaginator
+    # Sem o COUNT(*) da tabela inteira nem as contagens por filtro
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+
+    def get_search_results(self, request, queryset, search_term):
+        # O termo inteiro é um prefixo só (o admin dividiria em palavras)
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        return queryset.filter(description__istartswith=search_term), False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        matches = fingerprints.find_matches(obj.condominium_id, obj.fingerprint, exclude=obj.pk)
+        if matches:
+            self.message_user(
+                request,
+                f"Possível duplicada das despesas {', '.join(f'#{pk}' for pk in matches)} "
+                "(mesma descrição, valor e semana).",
+                messages.WARNING,
+            )
+
+
+@admin.register(RecurringExpense)
+class RecurringExpenseAdmin(admin.ModelAdmin):
+    """
+    Recurring expense templates; their expenses are created by
+    `manage.py generate_recurring_expenses`.
+    """
+    list_display = (
+        "description", "amount", "cadence", "category", "condominium", "start_date", "end_date", "generated_through",
+    )
+    list_filter = ("condominium", "cadence", "category")
+    list_select_related = ("category", "condominium")
+    search_fields = ("description",)
     raw_id_fields = ("category",)
+    readonly_fields = ("generated_through",)
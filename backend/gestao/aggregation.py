@@ -0,0 +1,379 @@
+"""
+Time-bucketed expense totals for the dashboard summaries.
+
+A SummaryQuery (granularity, date window, category subset, top-N) becomes
+a single grouped SQL query: whole-month windows at month, quarter or year
+granularity read the ExpenseMonthlyRollup table, anything finer scans
+Expense. Buckets are truncated by the database. The rows are then folded
+into a zero-filled category x bucket matrix of exact Decimals (a NumPy
+object array when NumPy is installed, nested lists otherwise), and output
+formats such as the Chart.js payload are rendered from that matrix.
+"""
+import datetime
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db.models import DateField, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Trunc
+from rest_framework.exceptions import ValidationError
+
+from .filters import TRUE_VALUES, parse_date, parse_ids
+from .models import Expense, ExpenseMonthlyRollup
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+GRANULARITIES = ('day', 'week', 'month', 'quarter', 'year')
+MONTHLY_GRANULARITIES = ('month', 'quarter', 'year')
+UNCATEGORIZED_LABEL = 'Sem Categoria'
+OTHERS_LABEL = 'Outros'
+ZERO = Decimal('0.00')
+# Colunas por resposta: ~13 anos por dia, ~95 por semana
+MAX_BUCKETS = 5000
+
+COLORS = (
+    'rgba(255, 99, 132, 0.7)', 'rgba(54, 162, 235, 0.7)', 'rgba(255, 206, 86, 0.7)',
+    'rgba(75, 192, 192, 0.7)', 'rgba(153, 102, 255, 0.7)', 'rgba(255, 159, 64, 0.7)',
+    'rgba(199, 199, 199, 0.7)', 'rgba(83, 102, 255, 0.7)',
+)
+
+
+def bucket_start(day, granularity):
+    """
+    First day of the bucket containing `day` (weeks start on Monday, like
+    the database's week truncation).
+    """
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - datetime.timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'quarter':
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    return day.replace(month=1, day=1)
+
+
+def next_bucket(start, granularity):
+    """
+    Start of the bucket after `start`'s, or None past datetime.date.max.
+    """
+    if granularity in ('day', 'week'):
+        days = 1 if granularity == 'day' else 7
+        if start > datetime.date.max - datetime.timedelta(days=days):
+            return None
+        return start + datetime.timedelta(days=days)
+    months = {'month': 1, 'quarter': 3, 'year': 12}[granularity]
+    month_index = start.year * 12 + start.month - 1 + months
+    if month_index // 12 > datetime.MAXYEAR:
+        return None
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def bucket_count(first, last, granularity):
+    """
+    How many buckets bucket_range(first, last, granularity) returns,
+    computed without building them.
+    """
+    first = bucket_start(first, granularity)
+    if last < first:
+        return 0
+    if granularity == 'day':
+        return (last - first).days + 1
+    if granularity == 'week':
+        return (last - first).days // 7 + 1
+    months = {'month': 1, 'quarter': 3, 'year': 12}[granularity]
+    elapsed = (last.year - first.year) * 12 + last.month - first.month
+    return elapsed // months + 1
+
+
+def check_bucket_count(first, last, granularity):
+    if bucket_count(first, last, granularity) > MAX_BUCKETS:
+        raise ValidationError({'granularity': (
+            f"The window spans more than {MAX_BUCKETS} {granularity} buckets; "
+            "narrow date_from/date_to or choose a coarser granularity."
+        )})
+
+
+def bucket_label(start, granularity):
+    if granularity == 'day':
+        return start.isoformat()
+    if granularity == 'week':
+        year, week, _ = start.isocalendar()
+        return f"{year}-W{week:02d}"
+    if granularity == 'month':
+        return start.strftime('%Y-%m')
+    if granularity == 'quarter':
+        return f"{start.year}-Q{(start.month - 1) // 3 + 1}"
+    return str(start.year)
+
+
+def bucket_range(first, last, granularity):
+    buckets = []
+    current = bucket_start(first, granularity)
+    while current is not None and current <= last:
+        buckets.append(current)
+        current = next_bucket(current, granularity)
+    return buckets
+
+
+@dataclass(frozen=True)
+class SummaryQuery:
+    """
+    What to aggregate: `start`/`end` are inclusive dates (None = unbounded),
+    `category_ids`/`uncategorized` select categories like the expense list
+    filters (nothing selected = all) and `top` keeps the N largest
+    categories, summing the rest into OTHERS_LABEL. `condominium_id` scopes
+    it to one condominium (None = all of them, for internal callers).
+    """
+    condominium_id: int = None
+    granularity: str = 'month'
+    start: datetime.date = None
+    end: datetime.date = None
+    category_ids: tuple = ()
+    uncategorized: bool = False
+    top: int = None
+
+    def __post_init__(self):
+        if self.granularity not in GRANULARITIES:
+            raise ValidationError({'granularity': f"Choose one of: {', '.join(GRANULARITIES)}."})
+        if self.start and self.end and self.start > self.end:
+            raise ValidationError({'date_to': "Must not be before date_from."})
+        if self.top is not None and self.top < 1:
+            raise ValidationError({'top': "Must be a positive integer."})
+        if self.start and self.end:
+            check_bucket_count(self.start, self.end, self.granularity)
+
+    @classmethod
+    def from_params(cls, params, condominium):
+        """
+        Builds a query on `condominium` from request query parameters:
+        granularity, date_from, date_to, category, uncategorized and top.
+        """
+        top = params.get('top')
+        if top:
+            try:
+                top = int(top)
+            except ValueError:
+                raise ValidationError({'top': "Must be a positive integer."})
+        return cls(
+            condominium_id=condominium.pk,
+            granularity=params.get('granularity', 'month'),
+            start=parse_date(params, 'date_from'),
+            end=parse_date(params, 'date_to'),
+            category_ids=tuple(sorted(set(parse_ids(params, 'category')))),
+            uncategorized=params.get('uncategorized', '').lower() in TRUE_VALUES,
+            top=top or None,
+        )
+
+    @property
+    def cache_variant(self):
+        categories = ','.join(map(str, self.category_ids))
+        return (f"{self.granularity}:{self.start or ''}:{self.end or ''}:"
+                f"{categories}:{int(self.uncategorized)}:{self.top or ''}")
+
+    def uses_rollup(self):
+        """
+        The monthly rollup answers the query when buckets are whole months
+        and the window starts and ends on month boundaries.
+        """
+        return (
+            self.granularity in MONTHLY_GRANULARITIES
+            and (self.start is None or self.start.day == 1)
+            and (self.end is None or (self.end + datetime.timedelta(days=1)).day == 1)
+        )
+
+    def _category_condition(self):
+        if self.category_ids and self.uncategorized:
+            return Q(category_id__in=self.category_ids) | Q(category__isnull=True)
+        if self.category_ids:
+            return Q(category_id__in=self.category_ids)
+        if self.uncategorized:
+            return Q(category__isnull=True)
+        return Q()
+
+    def get_queryset(self):
+        """
+        Returns (bucket, category label, total) rows, one per non-empty cell.
+        """
+        if self.uses_rollup():
+            queryset = ExpenseMonthlyRollup.objects.filter(count__gt=0)
+            date_field, amount_field = 'month', 'total'
+        else:
+            queryset = Expense.objects.all()
+            date_field, amount_field = 'date', 'amount'
+
+        if self.condominium_id is not None:
+            queryset = queryset.for_condominium(self.condominium_id)
+        if self.start:
+            queryset = queryset.filter(**{f'{date_field}__gte': self.start})
+        if self.end:
+            queryset = queryset.filter(**{f'{date_field}__lte': self.end})
+        queryset = queryset.filter(self._category_condition())
+
+        if date_field == 'month' and self.granularity == 'month':
+            bucket = F('month')
+        else:
+            bucket = Trunc(date_field, self.granularity, output_field=DateField())
+        # Agrupa pelo nome: uma categoria real chamada 'Sem Categoria' soma no mesmo grupo
+        return queryset.annotate(
+            bucket=bucket,
+            label=Coalesce('category__name', Value(UNCATEGORIZED_LABEL)),
+        ).values('bucket', 'label').annotate(
+            amount_total=Sum(amount_field)
+        ).values_list('bucket', 'label', 'amount_total').order_by()
+
+    def build(self, rows):
+        """
+        Folds the rows of get_queryset() into a zero-filled Series.
+        """
+        rows = [(bucket, label, total) for bucket, label, total in rows if total is not None]
+        if rows:
+            first = self.start or min(bucket for bucket, _, _ in rows)
+            last = self.end or max(bucket for bucket, _, _ in rows)
+        elif self.start and self.end:
+            first, last = self.start, self.end
+        else:
+            return Series(self.granularity)
+        # Uma ponta aberta vem dos dados, então só agora dá para contar
+        check_bucket_count(first, last, self.granularity)
+
+        buckets = bucket_range(first, last, self.granularity)
+        categories = sorted({label for _, label, _ in rows})
+        column = {bucket: index for index, bucket in enumerate(buckets)}
+        row = {label: index for index, label in enumerate(categories)}
+
+        values = _accumulate(
+            len(categories), len(buckets),
+            [row[label] for _, label, _ in rows],
+            [column[bucket_start(bucket, self.granularity)] for bucket, _, _ in rows],
+            [total for _, _, total in rows],
+        )
+        series = Series(self.granularity, buckets, categories, values)
+        if self.top is not None and len(categories) > self.top:
+            series = series.collapse(self.top)
+        return series
+
+
+def _accumulate(height, width, rows, columns, amounts):
+    # Uma soma por linha do banco; as células vazias já nascem zeradas
+    if np is not None:
+        matrix = np.full((height, width), ZERO, dtype=object)
+        np.add.at(matrix, (np.asarray(rows, dtype=int), np.asarray(columns, dtype=int)),
+                  np.asarray(amounts, dtype=object))
+        return matrix
+    matrix = [[ZERO] * width for _ in range(height)]
+    for row, column, amount in zip(rows, columns, amounts):
+        matrix[row][column] += amount
+    return matrix
+
+
+def _sum_rows(values, indexes, width):
+    if np is not None:
+        return values[list(indexes)].sum(axis=0) if indexes else np.full(width, ZERO, dtype=object)
+    return [sum(column, ZERO) for column in zip(*(values[i] for i in indexes))] or [ZERO] * width
+
+
+@dataclass
+class Series:
+    """
+    Zero-filled totals: values[i][j] is the total of categories[i] in the
+    bucket starting on buckets[j]. Categories are sorted by name, with
+    OTHERS_LABEL (when collapsed) last.
+    """
+    granularity: str
+    buckets: list = field(default_factory=list)
+    categories: list = field(default_factory=list)
+    values: object = field(default_factory=list)
+
+    @property
+    def labels(self):
+        return [bucket_label(bucket, self.granularity) for bucket in self.buckets]
+
+    @property
+    def totals(self):
+        if np is not None and len(self.categories):
+            return list(self.values.sum(axis=1))
+        return [sum(row, ZERO) for row in self.values]
+
+    def rows(self):
+        """
+        Yields (category, values as a list, total).
+        """
+        for category, values, total in zip(self.categories, self.values, self.totals):
+            yield category, list(values), total
+
+    def collapse(self, top):
+        """
+        Keeps the `top` largest categories and sums the others into one row.
+        """
+        totals = self.totals
+        ranked = sorted(range(len(self.categories)), key=lambda i: (-totals[i], self.categories[i]))
+        kept = sorted(ranked[:top], key=lambda i: self.categories[i])
+        rest = ranked[top:]
+        # Uma categoria real chamada 'Outros' entra no grupo agregado
+        kept_others = [i for i in kept if self.categories[i] == OTHERS_LABEL]
+        kept = [i for i in kept if i not in kept_others]
+        rest = rest + kept_others
+
+        width = len(self.buckets)
+        others = _sum_rows(self.values, rest, width)
+        if np is not None:
+            values = np.vstack([self.values[kept].reshape(len(kept), width), others.reshape(1, width)])
+        else:
+            values = [self.values[i] for i in kept] + [others]
+        categories = [self.categories[i] for i in kept] + [OTHERS_LABEL]
+        return Series(self.granularity, self.buckets, categories, values)
+
+
+def to_chartjs(series):
+    """
+    The dashboard's Chart.js payload: one stacked dataset per category and
+    the per-category totals (largest first) for the pie chart.
+    """
+    datasets = [
+        {
+            'label': category,  # Nome da categoria vai na legenda
+            'data': values,
+            'backgroundColor': COLORS[index % len(COLORS)],
+        }
+        for index, (category, values, _) in enumerate(series.rows())
+    ]
+    by_total = sorted(zip(series.categories, series.totals), key=lambda item: (-item[1], item[0]))
+    return {
+        'stacked_monthly_summary': {
+            'labels': series.labels,  # Buckets no eixo X
+            'datasets': datasets,  # Um dataset por categoria
+        },
+        'category_summary': {
+            'labels': [name for name, _ in by_total],
+            'totals': [total for _, total in by_total],
+        },
+    }
+
+
+def to_series(series):
+    """
+    Plain series with amounts as exact decimal strings.
+    """
+    return {
+        'granularity': series.granularity,
+        'buckets': [bucket.isoformat() for bucket in series.buckets],
+        'labels': series.labels,
+        'series': [
+            {
+                'category': category,
+                'values': [f"{value:.2f}" for value in values],
+                'total': f"{total:.2f}",
+            }
+            for category, values, total in series.rows()
+        ],
+    }
+
+
+FORMATS = {
+    'chartjs': to_chartjs,
+    'series': to_series,
+}
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class GestaoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gestao'
+
+    def ready(self):
+        from . import signals, tasks  # noqa: F401
+        from .partitioning import ensure_partitions_after_migrate
+
+        post_migrate.connect(ensure_partitions_after_migrate, sender=self)
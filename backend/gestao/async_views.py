@@ -0,0 +1,129 @@
+"""
+Native async variants of the dashboard endpoints.
+
+DRF's APIView is synchronous, so these are plain Django async views that
+reuse the query builders and payload builders of their sync counterparts
+in gestao.views, run DRF's configured authentication in a worker thread
+and share the versioned response cache. Served by an ASGI server (see
+backend/asgi.py) they free the worker while the database works, and the
+independent queries of a request are awaited together.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views import View
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .cache import acached_response
+from .tenancy import get_condominium
+from .views import ExpenseSummaryView, HomePageSummaryView
+
+
+def _authenticate(request):
+    drf_request = Request(
+        request,
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    return drf_request.user
+
+
+def _fetch_on_own_connection(queryset):
+    # Roda numa thread do executor, com conexão própria (respeita CONN_MAX_AGE)
+    close_old_connections()
+    try:
+        return list(queryset)
+    finally:
+        close_old_connections()
+
+
+async def _afetch(queryset):
+    return [row async for row in queryset]
+
+
+async def fetch_all(*querysets):
+    """
+    Evaluates independent querysets together. By default they go through
+    the async ORM on the request's connection; with
+    GESTAO_ASYNC_PARALLEL_QUERIES each one runs on its own thread and
+    connection, so the database executes them in parallel.
+    """
+    if getattr(settings, 'GESTAO_ASYNC_PARALLEL_QUERIES', False):
+        fetch = sync_to_async(_fetch_on_own_connection, thread_sensitive=False)
+        return await asyncio.gather(*(fetch(queryset) for queryset in querysets))
+    return await asyncio.gather(*(_afetch(queryset) for queryset in querysets))
+
+
+class AsyncAuthenticatedView(View):
+    """
+    Base async view enforcing DRF's authentication classes and the
+    IsAuthenticated permission used by the rest of the API, and resolving
+    the request's condominium (request.condominium, see gestao.tenancy).
+    """
+    http_method_names = ['get', 'head', 'options']
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            user = await sync_to_async(_authenticate)(request)
+        except APIException as exc:
+            return JsonResponse({'detail': str(exc.detail)}, status=exc.status_code)
+        if not user or not user.is_authenticated:
+            response = JsonResponse(
+                {'detail': "Authentication credentials were not provided."}, status=401
+            )
+            response['WWW-Authenticate'] = 'Token'
+            return response
+        request.user = user
+        try:
+            request.condominium = await sync_to_async(get_condominium)(request)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc.detail, dict) else {'detail': str(exc.detail)}
+            return JsonResponse(detail, status=exc.status_code)
+        return await super().dispatch(request, *args, **kwargs)
+
+
+class AsyncExpenseSummaryView(AsyncAuthenticatedView):
+    """
+    Async variant of ExpenseSummaryView (same payload and cache entries).
+    """
+    async def get(self, request, *args, **kwargs):
+        try:
+            query, output = ExpenseSummaryView.parse_params(request.GET, request.condominium)
+        except APIException as exc:
+            return JsonResponse(exc.detail, status=exc.status_code)
+
+        async def compute():
+            rows, = await fetch_all(query.get_queryset())
+            return ExpenseSummaryView.build_summary(query, rows, output)
+
+        try:
+            return await acached_response(
+                request, 'expense-summary', compute, variant=f"{query.cache_variant}:{output}",
+                condominium=request.condominium,
+            )
+        except APIException as exc:
+            # Janela aberta grande demais só aparece com os dados (SummaryQuery.build)
+            return JsonResponse(exc.detail, status=exc.status_code)
+
+
+class AsyncHomePageSummaryView(AsyncAuthenticatedView):
+    """
+    Async variant of HomePageSummaryView; the per-category totals and the
+    recent expenses are fetched concurrently.
+    """
+    async def get(self, request, *args, **kwargs):
+        now = timezone.now()
+        condominium = request.condominium
+
+        async def compute():
+            per_category, recent_expenses = await fetch_all(*HomePageSummaryView.get_queries(now, condominium))
+            return HomePageSummaryView.build_summary(now, per_category, recent_expenses)
+
+        return await acached_response(
+            request, 'homepage-summary', compute, variant=now.strftime('%Y-%m'), condominium=condominium
+        )
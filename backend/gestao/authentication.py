@@ -0,0 +1,167 @@
+"""
+Token authentication without a database round-trip per request.
+
+CachedTokenAuthentication is a drop-in replacement for DRF's
+TokenAuthentication that remembers resolved (user, token) pairs in a
+bounded, TTL-based in-process LRU, optionally backed by the shared Django
+cache. Deleting a token or saving/deleting its user evicts it (see
+gestao.signals). With a shared cache, an eviction also replaces a shared
+revocation version that every local hit is checked against, so the other
+processes drop their copies on their next request. Without one, other
+processes may keep a copy up to GESTAO_TOKEN_CACHE_TTL seconds.
+"""
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+SHARED_KEY = 'gestao:token:{digest}'
+REVOCATIONS_KEY = 'gestao:token-revocations'
+
+
+class TokenCache:
+    """
+    Thread-safe LRU of token key -> (user, token) with per-entry expiry.
+    With a shared cache, local entries are only valid under the revocation
+    version they were stored with (one shared cache read per hit).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'GESTAO_TOKEN_CACHE_SIZE', 1024)
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'GESTAO_TOKEN_CACHE_TTL', 60)
+
+    @property
+    def shared(self):
+        alias = getattr(settings, 'GESTAO_TOKEN_CACHE_SHARED_ALIAS', None)
+        return caches[alias] if alias else None
+
+    @staticmethod
+    def _shared_key(key):
+        # Never use the raw token as a cache key.
+        return SHARED_KEY.format(digest=hashlib.sha256(key.encode()).hexdigest())
+
+    @staticmethod
+    def _revocations(shared):
+        # Versão criada de novo se o cache a perdeu: invalida as cópias locais
+        if shared is None:
+            return None
+        version = shared.get(REVOCATIONS_KEY)
+        if version is None:
+            shared.add(REVOCATIONS_KEY, uuid.uuid4().hex, timeout=None)
+            version = shared.get(REVOCATIONS_KEY)
+        return version
+
+    def get(self, key):
+        shared = self.shared
+        # Lida antes do valor: uma revogação no meio do caminho invalida a cópia
+        version = self._revocations(shared)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, stored_version = entry
+                if expires_at > now and stored_version == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = shared.get(self._shared_key(key)) if shared is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+        self._store_local(key, value, version)
+        return value
+
+    def set(self, key, value):
+        shared = self.shared
+        self._store_local(key, value, self._revocations(shared))
+        if shared is not None:
+            shared.set(self._shared_key(key), value, timeout=self.ttl)
+
+    def _store_local(self, key, value, version):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def evict(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+        self._revoke([key])
+
+    def _revoke(self, keys):
+        # Apaga as cópias compartilhadas e só então troca a versão, para que
+        # os outros processos não recarreguem o que acabou de sair
+        shared = self.shared
+        if shared is not None:
+            shared.delete_many([self._shared_key(key) for key in keys])
+            shared.set(REVOCATIONS_KEY, uuid.uuid4().hex, timeout=None)
+
+    def evict_user(self, user_id, keys=()):
+        """
+        Drops every cached token of a user: all local entries plus the given
+        keys (the user's tokens in the database) from the shared cache.
+        """
+        with self._lock:
+            stale = [key for key, ((user, _), _, _) in self._entries.items() if user.pk == user_id]
+            for key in stale:
+                del self._entries[key]
+        self._revoke(set(keys) | set(stale))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.shared_hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that skips the Token + User query for tokens
+    resolved in the last GESTAO_TOKEN_CACHE_TTL seconds. Failed lookups are
+    never cached, so invalid or inactive credentials always hit the database.
+    """
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, (user, token))
+        return user, token
@@ -0,0 +1,8 @@
+"""
+Query-count, latency and memory benchmarks for the gestao API.
+
+The suite seeds synthetic ledgers (gestao.benchmarks.seed), replays every
+route listed in gestao.benchmarks.scenarios against them and compares the
+result with a stored baseline (gestao.benchmarks.runner). It is driven by
+`manage.py benchmark_api`.
+"""
@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+
+from django.utils.module_loading import import_string
+
+
+@dataclass
+class Comparison:
+    """
+    An optional side-by-side measurement run next to the scenarios, picked
+    by name (`benchmark_api --compare NAME`). `function` is the dotted path
+    of its compare_*() function, imported only when it runs (some of those
+    modules import the runner). Per-size comparisons run on every seeded
+    ledger, the others once per suite; `options` names the suite options
+    passed to the function as keyword arguments.
+    """
+    name: str
+    function: str
+    help: str
+    per_size: bool = False
+    options: tuple = ()
+
+    @property
+    def key(self):
+        # Chave no arquivo de resultados (a mesma de antes do registro)
+        return self.name.replace('-', '_')
+
+    def run(self, **suite_options):
+        return import_string(self.function)(**{name: suite_options[name] for name in self.options})
+
+
+COMPARISONS = [
+    Comparison('serialization', 'gestao.benchmarks.serialization.compare_serializers',
+               "list serializer throughput (rows/sec)", per_size=True),
+    Comparison('concurrency', 'gestao.benchmarks.concurrency.compare_concurrency',
+               "sync vs async dashboard views with --clients concurrent clients",
+               per_size=True, options=('concurrency',)),
+    Comparison('partitioning', 'gestao.benchmarks.partitioning.compare_partitioning',
+               "date-window queries on a plain vs partitioned table (Postgres)",
+               per_size=True, options=('iterations',)),
+    Comparison('renderers', 'gestao.benchmarks.renderers.compare_renderers',
+               "JSON, columnar JSON and MessagePack list bodies (size and time)", per_size=True),
+    Comparison('db-profiles', 'gestao.benchmarks.database.compare_profiles',
+               "default vs tuned SQLite settings under concurrent reads/writes"),
+    Comparison('forecast', 'gestao.benchmarks.forecast.compare_forecast',
+               "the forecast engine on 300 categories x 10 years of history"),
+    Comparison('recurring', 'gestao.benchmarks.recurring.compare_recurring',
+               "5 years of 2000 recurring expenses, batched vs one save each"),
+    Comparison('tenancy', 'gestao.benchmarks.tenancy.compare_tenancy',
+               "a 1000-expense condominium's reads alone and next to a 100000-expense one",
+               options=('iterations',)),
+    Comparison('duplicates', 'gestao.benchmarks.duplicates.compare_duplicates',
+               "duplicate-expense lookups and the grouped report against a pairwise search"),
+]
+
+COMPARISONS_BY_NAME = {comparison.name: comparison for comparison in COMPARISONS}
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .runner import BENCHMARK_USERNAME, percentile
+
+# Pairs of (sync route, async route) serving the same payload.
+ROUTE_PAIRS = (
+    ('expense-summary', 'expense-summary-async'),
+    ('homepage-summary', 'homepage-summary-async'),
+)
+
+# Bypass the response cache so every request does its database work.
+UNCACHED = override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'benchmark-nocache': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    },
+    GESTAO_CACHE_ALIAS='benchmark-nocache',
+)
+
+
+def _summarize(latencies, elapsed):
+    return {
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'requests_per_s': round(len(latencies) / elapsed, 1),
+    }
+
+
+def _run_sync(url, token, concurrency, requests):
+    def worker(count):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        latencies = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get(url)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url}: HTTP {response.status_code}")
+            latencies.append((time.perf_counter() - start) * 1000)
+        return latencies
+
+    per_worker = [requests // concurrency] * concurrency
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [value for chunk in pool.map(worker, per_worker) for value in chunk]
+    return _summarize(latencies, time.perf_counter() - started)
+
+
+async def _run_async(url, token, concurrency, requests):
+    client = AsyncClient()
+    headers = {'Authorization': f"Token {token}"}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            if response.status_code != 200:
+                raise RuntimeError(f"{url}: HTTP {response.status_code}")
+            return (time.perf_counter() - start) * 1000
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    return _summarize(latencies, time.perf_counter() - started)
+
+
+def compare_concurrency(concurrency=16, requests=256):
+    """
+    Fires `requests` requests, `concurrency` at a time, at the sync views
+    (one thread each, like sync workers) and at their async variants (one
+    event loop, like an ASGI worker), bypassing the response cache.
+    """
+    token = Token.objects.get(user__username=BENCHMARK_USERNAME).key
+    results = {}
+    with UNCACHED:
+        for sync_name, async_name in ROUTE_PAIRS:
+            results[sync_name] = {
+                'sync': _run_sync(reverse(sync_name), token, concurrency, requests),
+                'async': asyncio.run(_run_async(reverse(async_name), token, concurrency, requests)),
+            }
+    return results
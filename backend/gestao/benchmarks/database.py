@@ -0,0 +1,171 @@
+import datetime
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+
+from backend.database import sqlite_profile
+
+from .runner import percentile
+
+ALIAS = 'db-profile-benchmark'
+
+SCHEMA = (
+    "CREATE TABLE ledger (id INTEGER PRIMARY KEY AUTOINCREMENT, description TEXT NOT NULL,"
+    " amount NUMERIC NOT NULL, date DATE NOT NULL, category_id INTEGER)",
+    "CREATE INDEX ledger_date_idx ON ledger (date DESC, id DESC)",
+    "CREATE TABLE ledger_rollup (month DATE NOT NULL, category_id INTEGER NOT NULL,"
+    " total NUMERIC NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (month, category_id))",
+)
+READ_PAGE = "SELECT id, description, amount, date FROM ledger ORDER BY date DESC, id DESC LIMIT 50"
+READ_TOTALS = (
+    "SELECT category_id, SUM(amount), COUNT(*) FROM ledger WHERE date >= %s GROUP BY category_id"
+)
+
+
+class _registered:
+    """
+    Exposes a database settings dict as ALIAS in django.db.connections for
+    the duration of the block (every thread closes its own connection).
+    """
+
+    def __init__(self, database):
+        # configure_settings() fills in the defaults Django expects
+        self.database = connections.configure_settings({DEFAULT_DB_ALIAS: database})[DEFAULT_DB_ALIAS]
+
+    def __enter__(self):
+        connections.settings[ALIAS] = self.database
+
+    def __exit__(self, *exc_info):
+        connections[ALIAS].close()
+        del connections[ALIAS]
+        del connections.settings[ALIAS]
+
+
+def _seed(rows, categories):
+    start = datetime.date.today() - datetime.timedelta(days=365)
+    randomizer = random.Random(0)
+    with transaction.atomic(using=ALIAS), connections[ALIAS].cursor() as cursor:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+        cursor.executemany(
+            "INSERT INTO ledger (description, amount, date, category_id) VALUES (%s, %s, %s, %s)",
+            [
+                (f"Expense {i}", f"{randomizer.uniform(1, 500):.2f}",
+                 start + datetime.timedelta(days=randomizer.randrange(365)),
+                 randomizer.randrange(categories))
+                for i in range(rows)
+            ],
+        )
+
+
+def _write(cursor, randomizer, categories):
+    # Lê antes de escrever, como rollups.apply_delta(): em DEFERRED a promoção
+    # do lock de leitura para escrita é onde o SQLite costuma falhar.
+    day = datetime.date.today()
+    category = randomizer.randrange(categories)
+    amount = f"{randomizer.uniform(1, 500):.2f}"
+    month = day.replace(day=1)
+    cursor.execute(
+        "SELECT total FROM ledger_rollup WHERE month = %s AND category_id = %s", [month, category]
+    )
+    cursor.execute(
+        "INSERT INTO ledger (description, amount, date, category_id) VALUES (%s, %s, %s, %s)",
+        ["Benchmark", amount, day, category],
+    )
+    cursor.execute(
+        "INSERT INTO ledger_rollup (month, category_id, total, count) VALUES (%s, %s, %s, 1)"
+        " ON CONFLICT (month, category_id) DO UPDATE SET total = total + excluded.total,"
+        " count = count + 1",
+        [month, category, amount],
+    )
+
+
+def _worker(kind, deadline, categories, seed, report):
+    randomizer = random.Random(seed)
+    since = datetime.date.today() - datetime.timedelta(days=90)
+    latencies, errors = [], 0
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if kind == 'write':
+                    with transaction.atomic(using=ALIAS), connections[ALIAS].cursor() as cursor:
+                        _write(cursor, randomizer, categories)
+                else:
+                    with connections[ALIAS].cursor() as cursor:
+                        cursor.execute(READ_PAGE)
+                        cursor.fetchall()
+                        cursor.execute(READ_TOTALS, [since])
+                        cursor.fetchall()
+            except OperationalError:
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        connections[ALIAS].close()
+    report(kind, latencies, errors)
+
+
+def _summarize(latencies, errors, elapsed):
+    return {
+        'ops_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50), 3) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 3) if latencies else None,
+        'errors': errors,
+    }
+
+
+def run_profile(database, rows=20000, categories=20, readers=4, writers=2, duration=3.0):
+    """
+    Runs `readers` and `writers` threads, each on its own connection to
+    `database`, for `duration` seconds and returns throughput, latency and
+    the number of failed operations ("database is locked") per kind.
+    """
+    collected = {'read': ([], [0]), 'write': ([], [0])}
+    lock = threading.Lock()
+
+    def report(kind, latencies, errors):
+        with lock:
+            collected[kind][0].extend(latencies)
+            collected[kind][1][0] += errors
+
+    with _registered(database):
+        _seed(rows, categories)
+        connections[ALIAS].close()
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(target=_worker, args=(kind, deadline, categories, index, report))
+            for index, kind in enumerate(['read'] * readers + ['write'] * writers)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    return {
+        kind: _summarize(latencies, errors[0], elapsed)
+        for kind, (latencies, errors) in collected.items()
+    }
+
+
+def compare_profiles(rows=20000, categories=20, readers=4, writers=2, duration=3.0):
+    """
+    Concurrent read/write workload against a fresh SQLite file with Django's
+    default settings and with the tuned profile of backend.database (WAL,
+    synchronous=NORMAL, mmap, busy timeout, BEGIN IMMEDIATE).
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, tuned in (('default', False), ('tuned', True)):
+            database = sqlite_profile(Path(directory) / f"{name}.sqlite3", tuned=tuned)
+            results[name] = run_profile(
+                database, rows=rows, categories=categories,
+                readers=readers, writers=writers, duration=duration,
+            )
+    return results
@@ -0,0 +1,91 @@
+import random
+import time
+from collections import defaultdict
+
+from gestao import fingerprints
+from gestao.models import Expense
+
+from .runner import percentile
+from .seed import get_condominium, reset_ledger, seed_ledger
+
+
+def seed_duplicates(count, among, seed=0):
+    """
+    Copies `count` random expenses of the `among` queryset (same bill, other
+    spelling) so that there are duplicate groups to find. Returns the ids of
+    the copies.
+    """
+    rng = random.Random(seed)
+    originals = rng.sample(list(among.values('condominium_id', 'description', 'amount', 'date')), count)
+    copies = [
+        Expense(condominium_id=row['condominium_id'], description=row['description'].upper() + '.',
+                amount=row['amount'], date=row['date'])
+        for row in originals
+    ]
+    fingerprints.stamp(copies)
+    return [expense.pk for expense in Expense.objects.bulk_create(copies, batch_size=1000)]
+
+
+def pairwise_groups(queryset):
+    """
+    Reference search: compares every pair of expenses (normalized
+    description, amount and week) instead of using the stored fingerprint.
+    """
+    rows = list(queryset.order_by('id').values('id', 'condominium_id', 'description', 'amount', 'date'))
+    keys = [
+        (row['condominium_id'], fingerprints.normalize_description(row['description']),
+         row['amount'], fingerprints.date_bucket(row['date']))
+        for row in rows
+    ]
+    twins = defaultdict(set)
+    for i in range(len(rows)):
+        for j in range(i + 1, len(rows)):
+            if keys[i] == keys[j]:
+                twins[rows[i]['id']].add(rows[j]['id'])
+    return sum(1 for pk in twins if not any(pk in others for others in twins.values()))
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def compare_duplicates(size=100000, duplicates=500, sample=2000, lookups=200):
+    """
+    Times the create-time check (one find_matches() lookup) on a `size`
+    expense ledger with `duplicates` double entries, the grouped report over
+    all of it, and the grouped and pairwise searches over a `sample` of it
+    holding every copy. Empties the ledger before and after.
+    """
+    reset_ledger()
+    try:
+        seed_ledger(size)
+        # As cópias vêm das primeiras despesas para a amostra conter os pares
+        first = list(Expense.objects.order_by('id').values_list('id', flat=True)[:sample - duplicates])
+        copies = seed_duplicates(duplicates, Expense.objects.filter(id__in=first))
+        sample_queryset = Expense.objects.filter(id__in=first + copies)
+        condominium = get_condominium()
+        probes = list(Expense.objects.order_by('?').values_list('fingerprint', flat=True)[:lookups])
+        latencies = []
+        for fingerprint in probes:
+            _, elapsed = _timed(lambda: fingerprints.find_matches(condominium, fingerprint))
+            latencies.append(elapsed * 1000)
+        groups, grouped_s = _timed(lambda: sum(1 for _ in fingerprints.duplicate_groups()))
+        pairwise, pairwise_s = _timed(lambda: pairwise_groups(sample_queryset))
+        sample_grouped, sample_grouped_s = _timed(lambda: sum(1 for _ in fingerprints.duplicate_groups(sample_queryset)))
+    finally:
+        reset_ledger()
+    return {
+        'size': size,
+        'lookup_p50_ms': round(percentile(latencies, 0.50), 3),
+        'lookup_p95_ms': round(percentile(latencies, 0.95), 3),
+        'groups': groups,
+        'grouped_s': round(grouped_s, 3),
+        'sample': sample,
+        'sample_groups': sample_grouped,
+        'sample_pairwise_groups': pairwise,
+        'sample_grouped_s': round(sample_grouped_s, 3),
+        'sample_pairwise_s': round(pairwise_s, 3),
+        'speedup': round(pairwise_s / sample_grouped_s, 1) if sample_grouped_s else None,
+    }
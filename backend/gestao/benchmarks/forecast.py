@@ -0,0 +1,119 @@
+import calendar
+import math
+import random
+import time
+from decimal import Decimal
+
+from django.utils import timezone
+
+from gestao import fingerprints
+from gestao.forecast import ForecastQuery, month_from_index, month_index, project
+from gestao.models import Category, Expense, ExpenseMonthlyRollup
+
+from .seed import get_condominium, reset_ledger
+
+
+def project_per_category(history, history_months, month_to_date, budgets, as_of, window=3):
+    """
+    Reference implementation of gestao.forecast.project() with one Python
+    loop per category, for comparison. Returns (projected month end,
+    projected year end, over budget this month) per category.
+    """
+    progress = as_of.day / calendar.monthrange(as_of.year, as_of.month)[1]
+    months = [int(index) % 12 + 1 for index in history_months]
+    years = [int(index) // 12 for index in history_months]
+    results = []
+    for category, row in enumerate(history.tolist()):
+        overall = sum(row) / len(row) if row else 0.0
+        seasonal = []
+        for calendar_month in range(1, 13):
+            values = [value for value, month in zip(row, months) if month == calendar_month]
+            seasonal.append(sum(values) / len(values) / overall if values and overall else 1.0)
+        recent = list(zip(row[-window:], months[-window:]))
+        level = sum(
+            value / seasonal[month - 1] if seasonal[month - 1] > 0 else value for value, month in recent
+        ) / len(recent) if recent else 0.0
+
+        spent = float(month_to_date[category])
+        blended = spent + (1 - progress) * level * seasonal[as_of.month - 1]
+        month_end = spent + (1 - progress) * blended
+        earlier = sum(value for value, year in zip(row, years) if year == as_of.year)
+        year_end = earlier + month_end + sum(level * seasonal[month - 1] for month in range(as_of.month + 1, 13))
+        budget = float(budgets[category])
+        results.append((month_end, year_end, not math.isnan(budget) and month_end > budget))
+    return results
+
+
+def seed_history(categories=300, years=10, seed=0):
+    """
+    Writes `years` of complete months of rollup totals for `categories`
+    categories (with a yearly cycle, and a budget on two thirds of them)
+    plus a few expenses in the current month, in the benchmark condominium.
+    Returns the condominium.
+    """
+    rng = random.Random(seed)
+    current = month_index(timezone.localdate())
+    condominium = get_condominium()
+    category_objs = Category.objects.bulk_create([
+        Category(condominium=condominium, name=f"Categoria {i:04d}",
+                 monthly_budget=Decimal(rng.randint(500, 5000)) if i % 3 else None)
+        for i in range(categories)
+    ])
+    rollup_rows = []
+    for category in category_objs:
+        base = rng.uniform(200, 4000)
+        for index in range(current - years * 12, current):
+            cycle = 1 + 0.3 * math.sin(2 * math.pi * (index % 12) / 12)
+            total = Decimal(f"{base * cycle * rng.uniform(0.8, 1.2):.2f}")
+            rollup_rows.append(ExpenseMonthlyRollup(
+                condominium=condominium, month=month_from_index(index), category=category,
+                total=total, count=1,
+            ))
+    ExpenseMonthlyRollup.objects.bulk_create(rollup_rows, batch_size=5000)
+    expenses = [
+        Expense(condominium=condominium, description="Despesa do mês",
+                amount=Decimal(rng.randint(100, 300000)) / 100,
+                date=month_from_index(current), category=category)
+        for category in category_objs
+    ]
+    fingerprints.stamp(expenses)
+    Expense.objects.bulk_create(expenses)
+    return condominium
+
+
+def _best_ms(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return result, round(best * 1000, 3)
+
+
+def compare_forecast(categories=300, years=10, repeat=5):
+    """
+    Seeds `categories` x `years` of monthly history and times the forecast:
+    the load (three queries), the vectorized projection against the
+    per-category loop, and the whole payload. Empties the ledger after.
+    """
+    reset_ledger()
+    try:
+        condominium = seed_history(categories, years)
+        query = ForecastQuery(as_of=timezone.localdate(), months=years * 12, condominium_id=condominium.pk)
+        loaded, load_ms = _best_ms(query.load, repeat)
+        _, history, history_months, month_to_date, budgets = loaded
+        arguments = (history, history_months, month_to_date, budgets, query.as_of, query.window)
+        _, vectorized_ms = _best_ms(lambda: project(*arguments), repeat)
+        _, loop_ms = _best_ms(lambda: project_per_category(*arguments), repeat)
+        _, build_ms = _best_ms(query.build, repeat)
+    finally:
+        reset_ledger()
+    return {
+        'categories': categories,
+        'months': int(history.shape[1]),
+        'load_ms': load_ms,
+        'vectorized_ms': vectorized_ms,
+        'per_category_loop_ms': loop_ms,
+        'speedup': round(loop_ms / vectorized_ms, 1) if vectorized_ms else None,
+        'build_ms': build_ms,
+    }
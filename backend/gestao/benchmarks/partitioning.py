@@ -0,0 +1,90 @@
+import datetime
+import json
+import time
+
+from django.db import connection
+from django.utils import timezone
+
+from gestao import partitioning
+from gestao.aggregation import SummaryQuery
+from gestao.models import Expense
+from gestao.serializers import ExpenseRowSerializer
+from gestao.views import HomePageSummaryView
+
+from .runner import percentile
+from .seed import get_condominium
+
+
+def window_queries():
+    """
+    The date-bounded reads partitioning is meant to speed up.
+    """
+    now = timezone.now()
+    today = now.date()
+    condominium = get_condominium()
+    per_category, recent = HomePageSummaryView.get_queries(now, condominium)
+    return {
+        'homepage-per-category': per_category,
+        'recent-expenses': recent,
+        'summary-90d-daily': SummaryQuery(
+            condominium_id=condominium.pk, granularity='day', start=today - datetime.timedelta(days=90), end=today
+        ).get_queryset(),
+        'expense-list-window': ExpenseRowSerializer.rows(
+            Expense.objects.for_condominium(condominium).filter(date__gte=today - datetime.timedelta(days=30))
+        )[:50],
+    }
+
+
+def scanned_relations(queryset):
+    """
+    Expense tables (partitions) the planner keeps for a query, from EXPLAIN.
+    """
+    plan = json.loads(queryset.explain(format='json'))
+    relations = set()
+
+    def walk(node):
+        name = node.get('Relation Name', '')
+        if name.startswith(partitioning.TABLE):
+            relations.add(name)
+        for child in node.get('Plans', ()):
+            walk(child)
+
+    walk(plan[0]['Plan'])
+    return sorted(relations)
+
+
+def measure_windows(iterations=20):
+    results = {}
+    for name, queryset in window_queries().items():
+        latencies = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            list(queryset.all())
+            latencies.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            'p50_ms': round(percentile(latencies, 0.50), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'relations': len(scanned_relations(queryset)),
+        }
+    return results
+
+
+def compare_partitioning(iterations=20):
+    """
+    Measures the window queries on the plain expense table, converts it to
+    yearly partitions, measures again (also counting the partitions left
+    after pruning) and converts it back. PostgreSQL only.
+    """
+    if not partitioning.is_supported():
+        return {'skipped': f"requires PostgreSQL, not {connection.vendor}"}
+    was_partitioned = partitioning.is_partitioned()
+    if was_partitioned:
+        partitioning.revert()
+    try:
+        plain = measure_windows(iterations)
+        partitioning.convert()
+        partitioned = measure_windows(iterations)
+    finally:
+        if not was_partitioned:
+            partitioning.revert()
+    return {'plain': plain, 'partitioned': partitioned}
@@ -0,0 +1,96 @@
+import random
+import time
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from gestao.models import Category, Expense, RecurringExpense, RecurringExpenseOccurrence
+from gestao.recurring import add_months, generate, occurrence_dates
+
+from .seed import WORDS, get_condominium, reset_ledger
+
+CADENCES = [RecurringExpense.MONTHLY] * 8 + [RecurringExpense.QUARTERLY, RecurringExpense.YEARLY]
+
+
+def seed_templates(templates=2000, years=5, categories=20, seed=0):
+    """
+    Creates `templates` recurring expenses (mostly monthly) starting `years`
+    years ago, none of them generated yet.
+    """
+    rng = random.Random(seed)
+    first = add_months(timezone.localdate().replace(day=1), -12 * years)
+    condominium = get_condominium()
+    category_ids = [category.pk for category in Category.objects.bulk_create(
+        Category(condominium=condominium, name=f"Categoria {i:03d}") for i in range(categories)
+    )]
+    RecurringExpense.objects.bulk_create([
+        RecurringExpense(
+            condominium=condominium,
+            description=f"{rng.choice(WORDS)} {i}",
+            amount=Decimal(rng.randint(5000, 500000)) / 100,
+            category_id=rng.choice(category_ids),
+            cadence=rng.choice(CADENCES),
+            start_date=first.replace(day=rng.randint(1, 28)),
+        )
+        for i in range(templates)
+    ], batch_size=1000)
+
+
+def generate_per_occurrence(through):
+    """
+    Reference generator: one save() per expense and occurrence (with the
+    usual signals), for comparison with gestao.recurring.generate().
+    """
+    created = 0
+    for template in RecurringExpense.objects.order_by('pk'):
+        with transaction.atomic():
+            for day in occurrence_dates(template, through, after=template.generated_through):
+                expense = Expense.objects.create(
+                    condominium_id=template.condominium_id, description=template.description, amount=template.amount,
+                    date=day, category_id=template.category_id,
+                )
+                RecurringExpenseOccurrence.objects.create(
+                    template=template, period=day.replace(day=1), expense_id=expense.pk,
+                )
+                created += 1
+            template.generated_through = through
+            template.save(update_fields=['generated_through'])
+    return created
+
+
+def _timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def compare_recurring(templates=2000, years=5, sample=50):
+    """
+    Backfills `years` of `templates` recurring expenses with the batched
+    generator and times it, a second (no-op) run, and the save-per-occurrence
+    generator on `sample` templates. Empties the ledger before and after.
+    """
+    through = timezone.localdate()
+    reset_ledger()
+    try:
+        seed_templates(templates, years)
+        (_, created), batch_s = _timed(lambda: generate(through))
+        (_, repeated), rerun_s = _timed(lambda: generate(through))
+        reset_ledger()
+        seed_templates(sample, years)
+        sample_created, per_occurrence_s = _timed(lambda: generate_per_occurrence(through))
+    finally:
+        reset_ledger()
+    batch_ms = batch_s * 1000 / created if created else None
+    per_occurrence_ms = per_occurrence_s * 1000 / sample_created if sample_created else None
+    return {
+        'templates': templates,
+        'created': created,
+        'batch_s': round(batch_s, 3),
+        'rerun_created': repeated,
+        'rerun_s': round(rerun_s, 3),
+        'batch_ms_per_expense': round(batch_ms, 4) if batch_ms else None,
+        'per_occurrence_ms_per_expense': round(per_occurrence_ms, 4) if per_occurrence_ms else None,
+        'speedup': round(per_occurrence_ms / batch_ms, 1) if batch_ms and per_occurrence_ms else None,
+    }
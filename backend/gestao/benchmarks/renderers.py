@@ -0,0 +1,52 @@
+import gzip
+import time
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+from gestao.middleware import brotli
+from gestao.models import Expense
+from gestao.renderers import ColumnarJSONRenderer, MessagePackRenderer, msgpack
+from gestao.serializers import ExpenseRowSerializer
+
+
+def _best_ms(render, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = render()
+        best = min(best, time.perf_counter() - start)
+    return body, round(best * 1000, 3)
+
+
+def compare_renderers(limit=5000, repeat=3):
+    """
+    Renders one expense-list page of `limit` rows with each renderer and
+    reports render time and body size, raw and compressed (gzip, and brotli
+    when installed), against the default JSON.
+    """
+    rows = ExpenseRowSerializer.many(
+        ExpenseRowSerializer.rows(Expense.objects.order_by('-date', '-id'))[:limit]
+    )
+    if not rows:
+        return None
+    payload = {'next': None, 'previous': None, 'results': rows}
+    renderers = {'json': JSONRenderer(), 'columnar': ColumnarJSONRenderer()}
+    if msgpack is not None:
+        renderers['msgpack'] = MessagePackRenderer()
+
+    results = {'rows': len(rows)}
+    for name, renderer in renderers.items():
+        body, render_ms = _best_ms(lambda: renderer.render(payload), repeat)
+        result = {'render_ms': render_ms, 'bytes': len(body)}
+        compressed, result['gzip_ms'] = _best_ms(lambda: gzip.compress(body, compresslevel=6), repeat)
+        result['gzip_bytes'] = len(compressed)
+        if brotli is not None:
+            quality = getattr(settings, 'GESTAO_BROTLI_QUALITY', 5)
+            compressed, result['brotli_ms'] = _best_ms(lambda: brotli.compress(body, quality=quality), repeat)
+            result['brotli_bytes'] = len(compressed)
+        results[name] = result
+    baseline = results['json']['bytes']
+    for name in renderers:
+        results[name]['size_vs_json'] = round(results[name]['bytes'] / baseline, 3)
+    return results
@@ -0,0 +1,196 @@
+import datetime
+import math
+import platform
+import time
+import tracemalloc
+
+import django
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from gestao.cache import get_cache
+
+from .comparisons import COMPARISONS_BY_NAME
+from .scenarios import SCENARIOS, build_context
+from .seed import get_condominium, reset_ledger, seed_ledger
+
+BENCHMARK_USERNAME = 'benchmark'
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of a non-empty list.
+    """
+    ordered = sorted(values)
+    index = max(math.ceil(fraction * len(ordered)) - 1, 0)
+    return ordered[index]
+
+
+def authenticated_client():
+    """
+    APIClient carrying a real token, so authentication cost is measured too.
+    """
+    user = get_benchmark_user()
+    token, _ = Token.objects.get_or_create(user=user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def get_benchmark_user():
+    user, _ = get_user_model().objects.get_or_create(username=BENCHMARK_USERNAME)
+    return user
+
+
+def grant_access(condominium):
+    """
+    Makes the benchmark user a member of `condominium`.
+    """
+    condominium.members.add(get_benchmark_user())
+
+
+class QueryCounter:
+    """
+    Counts SQL statements through connection.execute_wrapper. Unlike
+    CaptureQueriesContext it is not affected by the reset_queries() that
+    runs at the start of every request.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def send(client, scenario, context):
+    kwargs = dict(scenario.headers)
+    if scenario.body is not None:
+        kwargs['data'] = scenario.body(context)
+        kwargs['content_type'] = scenario.content_type
+    response = getattr(client, scenario.method)(scenario.path(context), **kwargs)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{scenario.name}: HTTP {response.status_code}")
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def measure(client, scenario, context, iterations=20, warmup=2, warm_cache=False):
+    """
+    Runs one scenario and returns its p50/p95 latency (ms), SQL query count
+    and peak traced memory (KiB). Query count and memory come from a
+    separate instrumented run so they do not skew the timings.
+    """
+    cache = get_cache()
+
+    for _ in range(warmup):
+        send(client, scenario, context)
+
+    if not warm_cache:
+        cache.clear()
+    tracemalloc.start()
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        send(client, scenario, context)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies = []
+    for _ in range(iterations):
+        if not warm_cache:
+            cache.clear()
+        start = time.perf_counter()
+        send(client, scenario, context)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'queries': counter.count,
+        'peak_kib': round(peak / 1024, 1),
+    }
+
+
+def run_suite(sizes, categories=20, iterations=20, scenarios=None, warm_cache=False,
+              comparisons=(), concurrency=16, log=None):
+    """
+    Seeds a ledger of each size and measures every scenario against it,
+    plus the named `comparisons` (gestao.benchmarks.comparisons): the
+    per-size ones on every ledger, the others once at the end.
+    `concurrency` is the client count of the concurrency comparison. Runs
+    on the current default database, which it empties first.
+    """
+    scenarios = SCENARIOS if scenarios is None else scenarios
+    comparisons = [COMPARISONS_BY_NAME[name] for name in comparisons]
+    suite_options = {'iterations': iterations, 'concurrency': concurrency}
+    results = {
+        'meta': {
+            'vendor': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'iterations': iterations,
+            'categories': categories,
+            'warm_cache': warm_cache,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        'results': {},
+    }
+    client = authenticated_client()
+    for size in sizes:
+        reset_ledger()
+        started = time.perf_counter()
+        seed_ledger(size, categories=categories)
+        grant_access(get_condominium())
+        if log:
+            log(f"Seeded {size} expenses in {time.perf_counter() - started:.1f}s")
+        context = build_context()
+        by_scenario = {}
+        for scenario in scenarios:
+            by_scenario[scenario.name] = measure(
+                client, scenario, context, iterations=iterations, warm_cache=warm_cache
+            )
+            if log:
+                log(f"  {size:>9} {scenario.name:<24} {by_scenario[scenario.name]}")
+        results['results'][str(size)] = by_scenario
+        for comparison in comparisons:
+            if comparison.per_size:
+                result = comparison.run(**suite_options)
+                results.setdefault(comparison.key, {})[str(size)] = result
+                if log:
+                    log(f"  {size:>9} {comparison.name:<24} {result}")
+    for comparison in comparisons:
+        if not comparison.per_size:
+            results[comparison.key] = comparison.run(**suite_options)
+            if log:
+                log(f"  {comparison.name:<34} {results[comparison.key]}")
+    return results
+
+
+def compare(results, baseline, latency_threshold=0.25, min_delta_ms=2.0):
+    """
+    Returns a list of regressions of `results` against `baseline`: any growth
+    in query count, or a p95 latency more than `latency_threshold` (fraction)
+    and `min_delta_ms` above the baseline. Only sizes and scenarios present
+    in both runs are compared.
+    """
+    regressions = []
+    for size, scenarios in results['results'].items():
+        for name, current in scenarios.items():
+            previous = baseline.get('results', {}).get(size, {}).get(name)
+            if previous is None:
+                continue
+            if current['queries'] > previous['queries']:
+                regressions.append(
+                    f"{name} @ {size}: queries {previous['queries']} -> {current['queries']}"
+                )
+            allowed = previous['p95_ms'] * (1 + latency_threshold)
+            if current['p95_ms'] > allowed and current['p95_ms'] - previous['p95_ms'] > min_delta_ms:
+                regressions.append(
+                    f"{name} @ {size}: p95 {previous['p95_ms']:.1f}ms -> {current['p95_ms']:.1f}ms"
+                )
+    return regressions
@@ -0,0 +1,103 @@
+import datetime
+import json
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.db.models import Value
+from django.urls import reverse
+
+from gestao import sync
+from gestao.models import Category, Expense
+from gestao.pagination import cursor_position, encode_cursor_token
+
+
+@dataclass
+class Scenario:
+    """
+    One benchmarked request. `path` builds the URL from the context returned
+    by build_context(); `body` optionally builds a request body.
+    """
+    name: str
+    path: Callable[[dict], str]
+    method: str = 'get'
+    body: Callable[[dict], str] = None
+    content_type: str = None
+    headers: dict = field(default_factory=dict)
+
+
+def build_context():
+    """
+    Picks the ids and cursors the scenarios need from the seeded ledger.
+    """
+    total = Expense.objects.count()
+    deep_row = Expense.objects.order_by('-date', '-id')[max(int(total * 0.9) - 1, 0)]
+    today = datetime.date.today()
+    return {
+        'expense_id': Expense.objects.order_by('id').values_list('id', flat=True)[total // 2],
+        'category_id': Category.objects.order_by('id').values_list('id', flat=True).first(),
+        'deep_cursor': encode_cursor_token(cursor_position(deep_row, ('date', 'id'))),
+        'window_start': (today - datetime.timedelta(days=90)).isoformat(),
+        # Posição no feed com ~100 despesas alteradas depois dela
+        'sync_token': sync.encode_token(
+            Expense.objects.order_by('change_seq', 'id')
+            .values_list('change_seq', Value(sync.EXPENSES), 'id')[max(total - 101, 0)]
+        ),
+    }
+
+
+def _bulk_body(context, rows=100):
+    lines = ["description,amount,date,category"]
+    lines += [f"Importado {i},{i + 1}.00,{context['window_start']},Categoria 0000" for i in range(rows)]
+    return "\n".join(lines) + "\n"
+
+
+# O que o frontend busca ao abrir o dashboard, num request só
+DASHBOARD_BUNDLE = json.dumps({'parts': [
+    'homepage-summary', 'expense-summary', 'categories', {'resource': 'expenses', 'params': {'page_size': 20}},
+]})
+
+
+SCENARIOS = [
+    Scenario('expense-list', lambda ctx: reverse('expense-list-create')),
+    Scenario(
+        'expense-list-deep',
+        lambda ctx: f"{reverse('expense-list-create')}?cursor={ctx['deep_cursor']}",
+    ),
+    Scenario(
+        'expense-list-filtered',
+        lambda ctx: f"{reverse('expense-list-create')}?category={ctx['category_id']}&date_from={ctx['window_start']}",
+    ),
+    Scenario(
+        'expense-list-search',
+        lambda ctx: f"{reverse('expense-list-create')}?search=piscina&amount_min=100",
+    ),
+    Scenario('expense-detail', lambda ctx: reverse('expense-detail', args=[ctx['expense_id']])),
+    Scenario('expense-summary', lambda ctx: reverse('expense-summary')),
+    Scenario(
+        'expense-summary-weekly',
+        lambda ctx: f"{reverse('expense-summary')}?granularity=week&top=5&date_from={ctx['window_start']}",
+    ),
+    Scenario('homepage-summary', lambda ctx: reverse('homepage-summary')),
+    Scenario('sync-delta', lambda ctx: f"{reverse('sync')}?since={ctx['sync_token']}"),
+    Scenario(
+        'expense-export',
+        lambda ctx: f"{reverse('expense-export')}?date_from={ctx['window_start']}",
+    ),
+    Scenario('category-list', lambda ctx: reverse('category-list')),
+    Scenario('category-detail', lambda ctx: reverse('category-detail', args=[ctx['category_id']])),
+    # Write scenarios run last since they grow the ledger a little.
+    Scenario(
+        'expense-bulk-import',
+        lambda ctx: reverse('expense-bulk-import'),
+        method='post',
+        body=_bulk_body,
+        content_type='text/csv',
+    ),
+    Scenario(
+        'dashboard-bundle',
+        lambda ctx: reverse('dashboard-bundle'),
+        method='post',
+        body=lambda ctx: DASHBOARD_BUNDLE,
+        content_type='application/json',
+    ),
+]
@@ -0,0 +1,76 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.db import connection, transaction
+
+from gestao import fingerprints, rollups
+from gestao.models import (
+    Category, Condominium, Expense, ExpenseMonthlyRollup, RecurringExpense, RecurringExpenseOccurrence, Tombstone,
+)
+
+WORDS = (
+    "Limpeza", "Portaria", "Elevador", "Jardinagem", "Piscina", "Energia", "Água",
+    "Gás", "Pintura", "Seguro", "Salário", "Manutenção", "Material", "Taxa", "Reparo",
+)
+BENCHMARK_CONDOMINIUM = 'benchmark'
+
+
+def reset_ledger():
+    """
+    Empties the gestao tables without loading rows into Python (a plain
+    queryset delete would fetch every expense to send signals).
+    """
+    models = (
+        ExpenseMonthlyRollup, RecurringExpenseOccurrence, RecurringExpense, Expense, Tombstone, Category,
+        Condominium.members.through, Condominium,
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}")
+
+
+def get_condominium(slug=BENCHMARK_CONDOMINIUM):
+    """
+    The condominium the benchmarks seed into, created on first use.
+    """
+    condominium, _ = Condominium.objects.get_or_create(slug=slug, defaults={'name': slug.title()})
+    return condominium
+
+
+def seed_ledger(size, categories=20, years=5, batch_size=5000, seed=0, condominium=None):
+    """
+    Creates `size` expenses spread over the last `years` years across
+    `categories` categories (about 10% uncategorized) with bulk_create, in
+    `condominium` (default: the benchmark one), and rebuilds the monthly
+    rollup. Returns the list of category ids.
+    """
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    span_days = 365 * years
+    condominium = condominium or get_condominium()
+
+    category_objs = Category.objects.bulk_create(
+        [Category(condominium=condominium, name=f"Categoria {i:04d}") for i in range(categories)]
+    )
+    category_ids = [category.pk for category in category_objs]
+
+    batch = []
+    for i in range(size):
+        batch.append(Expense(
+            condominium=condominium,
+            description=f"{rng.choice(WORDS)} {rng.choice(WORDS).lower()} #{i}",
+            amount=Decimal(rng.randint(100, 500000)) / 100,
+            date=today - datetime.timedelta(days=rng.randrange(span_days)),
+            category_id=rng.choice(category_ids) if rng.random() > 0.1 else None,
+        ))
+        if len(batch) >= batch_size:
+            fingerprints.stamp(batch)
+            Expense.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        fingerprints.stamp(batch)
+        Expense.objects.bulk_create(batch)
+
+    rollups.rebuild()
+    return category_ids
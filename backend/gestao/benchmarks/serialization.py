@@ -0,0 +1,34 @@
+import time
+
+from gestao.models import Expense
+from gestao.serializers import ExpenseRowSerializer, ExpenseSerializer
+
+
+def _rows_per_second(render, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        render()
+        best = min(best, time.perf_counter() - start)
+    return round(rows / best) if best else None
+
+
+def compare_serializers(limit=5000, repeat=3):
+    """
+    Measures rows/sec (query included) of the DRF ExpenseSerializer against
+    the ExpenseRowSerializer fast path over the same `limit` expenses.
+    """
+    queryset = Expense.objects.order_by('-date', '-id')[:limit]
+    rows = len(queryset)
+    if not rows:
+        return None
+    drf = _rows_per_second(lambda: ExpenseSerializer(queryset.all(), many=True).data, rows, repeat)
+    fast = _rows_per_second(
+        lambda: ExpenseRowSerializer.many(ExpenseRowSerializer.rows(queryset.all())), rows, repeat
+    )
+    return {
+        'rows': rows,
+        'drf_rows_per_s': drf,
+        'fast_rows_per_s': fast,
+        'speedup': round(fast / drf, 2),
+    }
@@ -0,0 +1,43 @@
+from .runner import authenticated_client, grant_access, measure
+from .scenarios import SCENARIOS, build_context
+from .seed import get_condominium, reset_ledger, seed_ledger
+
+# Leituras que só enxergam o condomínio do request
+SCENARIO_NAMES = (
+    'expense-list', 'expense-list-deep', 'expense-list-filtered', 'expense-summary',
+    'expense-summary-weekly', 'homepage-summary', 'sync-delta', 'category-list',
+)
+
+
+def compare_tenancy(size=1000, neighbour_size=100000, categories=20, iterations=20):
+    """
+    Measures the tenant-scoped reads of a `size`-expense condominium alone,
+    then again after another condominium with `neighbour_size` expenses is
+    seeded into the same tables: with the tenant-leading indexes the second
+    run should cost the same. Empties the ledger before and after.
+    """
+    scenarios = [scenario for scenario in SCENARIOS if scenario.name in SCENARIO_NAMES]
+    client = authenticated_client()
+    reset_ledger()
+    try:
+        seed_ledger(size, categories=categories)
+        grant_access(get_condominium())
+        context = build_context()
+        alone = {scenario.name: measure(client, scenario, context, iterations=iterations) for scenario in scenarios}
+        seed_ledger(neighbour_size, categories=categories, seed=1, condominium=get_condominium('neighbour'))
+        shared = {scenario.name: measure(client, scenario, context, iterations=iterations) for scenario in scenarios}
+    finally:
+        reset_ledger()
+    return {
+        'size': size,
+        'neighbour_size': neighbour_size,
+        'scenarios': {
+            name: {
+                'alone_p50_ms': alone[name]['p50_ms'],
+                'shared_p50_ms': shared[name]['p50_ms'],
+                'ratio': round(shared[name]['p50_ms'] / alone[name]['p50_ms'], 2) if alone[name]['p50_ms'] else None,
+                'queries': shared[name]['queries'],
+            }
+            for name in alone
+        },
+    }
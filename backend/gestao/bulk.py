@@ -0,0 +1,118 @@
+"""
+Set-based bulk recategorization and deletion of expenses.
+
+The selected rows are locked and their ids read once; the change then runs
+as one UPDATE or DELETE per chunk of ids instead of a save()/delete() per
+expense. The monthly rollup is adjusted from a grouped aggregate of the
+same chunks, the sync feed gets new change numbers or tombstones, and the
+response cache is invalidated once.
+"""
+from django.db import connection, transaction
+from django.http import QueryDict
+from rest_framework.exceptions import ValidationError
+
+from . import cache, rollups, sync
+from .filters import ExpenseFilterBackend
+from .models import Expense, Tombstone
+
+# Ids por comando: fica abaixo do limite de parâmetros do SQLite
+CHUNK_SIZE = 500
+
+
+def _chunks(ids):
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def get_selection(data, condominium):
+    """
+    Returns the expenses of `condominium` chosen by a validated
+    ExpenseBulkActionSerializer payload: its `ids`, or its `filter` applied
+    as the list's query params.
+    """
+    expenses = Expense.objects.for_condominium(condominium)
+    if 'ids' in data:
+        return expenses.filter(pk__in=data['ids'])
+    params = QueryDict(mutable=True)
+    for name, value in data['filter'].items():
+        values = value if isinstance(value, list) else [value]
+        params.setlist(name, ['true' if v is True else 'false' if v is False else str(v) for v in values])
+    conditions = ExpenseFilterBackend().get_conditions(params)
+    if not conditions:
+        raise ValidationError({'filter': "The filter must select a subset of the expenses."})
+    return expenses.filter(conditions)
+
+
+def select_ids(queryset, lock=True):
+    """
+    Returns the ids of the selected expenses, locking the rows (where the
+    database supports it) for the rest of the transaction.
+    """
+    return [pk for pk, _ in _select_rows(queryset, lock)]
+
+
+def _select_rows(queryset, lock=True):
+    if lock:
+        queryset = queryset.select_for_update()
+    return list(queryset.order_by('pk').values_list('pk', 'condominium_id'))
+
+
+def _bump_versions(totals):
+    for condominium_id in {condominium_id for condominium_id, _, _ in totals}:
+        cache.bump_data_version(condominium_id)
+
+
+def _grouped_totals(ids):
+    totals = {}
+    for chunk in _chunks(ids):
+        for key, (total, count) in rollups.grouped_totals(Expense.objects.filter(pk__in=chunk)).items():
+            previous_total, previous_count = totals.get(key, (0, 0))
+            totals[key] = (previous_total + total, previous_count + count)
+    return totals
+
+
+def recategorize(queryset, category_id, dry_run=False):
+    """
+    Moves the selected expenses to `category_id` (None = uncategorized).
+    Returns the affected ids; with dry_run nothing is written.
+    """
+    if dry_run:
+        return select_ids(queryset, lock=False)
+    with transaction.atomic():
+        ids = select_ids(queryset)
+        if not ids:
+            return ids
+        totals = _grouped_totals(ids)
+        rollups.move_totals(totals, category_id)
+        for chunk in _chunks(ids):
+            sync.touch(Expense.objects.filter(pk__in=chunk), category_id=category_id)
+        _bump_versions(totals)
+    return ids
+
+
+def delete(queryset, dry_run=False):
+    """
+    Deletes the selected expenses without loading them into Python (a
+    queryset delete would fetch every row to send signals). Returns the
+    affected ids; with dry_run nothing is written.
+    """
+    if dry_run:
+        return select_ids(queryset, lock=False)
+    table = connection.ops.quote_name(Expense._meta.db_table)
+    with transaction.atomic():
+        rows = _select_rows(queryset)
+        ids = [pk for pk, _ in rows]
+        if not ids:
+            return ids
+        totals = _grouped_totals(ids)
+        rollups.apply_totals(totals, sign=-1)
+        Tombstone.objects.bulk_create(
+            Tombstone(condominium_id=condominium_id, model=Tombstone.EXPENSE, object_id=pk, change_seq=number)
+            for (pk, condominium_id), number in zip(rows, sync.allocate(len(rows)))
+        )
+        with connection.cursor() as cursor:
+            for chunk in _chunks(ids):
+                placeholders = ', '.join(['%s'] * len(chunk))
+                cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", chunk)
+        _bump_versions(totals)
+    return ids
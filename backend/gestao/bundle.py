@@ -0,0 +1,191 @@
+"""
+Batched reads for the dashboard: several GET endpoints in one request.
+
+A bundle names the sub-resources it wants (with their query parameters);
+each one is served by the regular view, called in-process with a GET
+sub-request, so payloads, filters and the response cache behave exactly
+as on their own URLs. Authentication, middleware and connection setup are
+paid once, and every part reads the same transaction snapshot
+(REPEATABLE READ on Postgres; on SQLite a BEGIN DEFERRED read transaction,
+not the BEGIN IMMEDIATE that backend/database.py configures for writers,
+so a bundle never takes the write lock), so the numbers agree with each
+other.
+
+On Postgres, independent parts run concurrently on worker connections
+that import the bundle's exported snapshot (SET TRANSACTION SNAPSHOT);
+elsewhere, or with GESTAO_BUNDLE_WORKERS = 0, they run one after the
+other on the request's connection.
+"""
+import copy
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.http import QueryDict
+from django.urls import resolve, reverse
+from rest_framework.exceptions import ValidationError
+
+# Recursos disponíveis no bundle -> nome da rota (somente leitura)
+RESOURCES = {
+    'homepage-summary': 'homepage-summary',
+    'expense-summary': 'expense-summary',
+    'expense-forecast': 'expense-forecast',
+    'expenses': 'expense-list-create',
+    'categories': 'category-list',
+    'sync': 'sync',
+}
+MAX_PARTS = 10
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_workers():
+    return getattr(settings, 'GESTAO_BUNDLE_WORKERS', 4)
+
+
+def _get_executor():
+    # Threads reaproveitadas entre requests, cada uma com sua conexão
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(get_workers(), thread_name_prefix='gestao-bundle')
+        return _executor
+
+
+def parse_parts(payload):
+    """
+    Validates a bundle body, {"parts": [{"resource": ..., "name": ...,
+    "params": {...}}, ...]}, and returns (name, resource, params) triples.
+    """
+    parts = payload.get('parts') if isinstance(payload, dict) else None
+    if not isinstance(parts, list) or not parts:
+        raise ValidationError({'parts': "Provide a non-empty list of parts."})
+    if len(parts) > MAX_PARTS:
+        raise ValidationError({'parts': f"At most {MAX_PARTS} parts per bundle."})
+
+    parsed, names = [], set()
+    for index, part in enumerate(parts):
+        if isinstance(part, str):
+            part = {'resource': part}
+        if not isinstance(part, dict) or part.get('resource') not in RESOURCES:
+            raise ValidationError({'parts': f"Part {index}: resource must be one of: {', '.join(RESOURCES)}."})
+        name = part.get('name')
+        if name is None:
+            name = part['resource']
+        elif not isinstance(name, str) or not name:
+            raise ValidationError({'parts': f"Part {index}: name must be a non-empty string."})
+        params = part.get('params') or {}
+        if not isinstance(params, dict):
+            raise ValidationError({'parts': f"Part {index}: params must be an object."})
+        if name in names:
+            raise ValidationError({'parts': f"Part {index}: duplicate name {name!r}."})
+        names.add(name)
+        parsed.append((name, part['resource'], params))
+    return parsed
+
+
+def _subrequest(request, path, params):
+    query = urlencode(params, doseq=True)
+    sub = copy.copy(request)
+    sub.method = 'GET'
+    sub.path = sub.path_info = path
+    sub.META = {
+        **request.META,
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': '0',
+    }
+    # Cada parte sempre traz os dados (nunca 304)
+    sub.META.pop('HTTP_IF_NONE_MATCH', None)
+    sub.GET = QueryDict(query)
+    return sub
+
+
+def _serve(request, resource, params):
+    path = reverse(RESOURCES[resource])
+    match = resolve(path)
+    start = time.perf_counter()
+    response = match.func(_subrequest(request, path, params), *match.args, **match.kwargs)
+    return {
+        'status': response.status_code,
+        'data': getattr(response, 'data', None),
+        'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+    }
+
+
+def _serve_in_snapshot(snapshot_id, request, resource, params):
+    close_old_connections()
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+            cursor.execute('SET TRANSACTION SNAPSHOT %s', [snapshot_id])
+            return _serve(request, resource, params)
+    finally:
+        close_old_connections()
+
+
+@contextmanager
+def _read_transaction(outermost):
+    if connection.vendor != 'sqlite' or not outermost:
+        with transaction.atomic():
+            yield
+        return
+    # O transaction_mode 'IMMEDIATE' vale para a conexão toda; só este BEGIN
+    # precisa ser DEFERRED (lido na abertura da conexão, por isso o ensure antes)
+    connection.ensure_connection()
+    mode, connection.transaction_mode = connection.transaction_mode, 'DEFERRED'
+    try:
+        with transaction.atomic():
+            connection.transaction_mode = mode
+            yield
+    finally:
+        connection.transaction_mode = mode
+
+
+@contextmanager
+def _snapshot():
+    """
+    Opens the bundle's read transaction; yields the exported snapshot id
+    when worker connections can share it (Postgres), else None.
+    """
+    outermost = not connection.in_atomic_block
+    with _read_transaction(outermost):
+        snapshot_id = None
+        if connection.vendor == 'postgresql' and outermost:
+            with connection.cursor() as cursor:
+                cursor.execute('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY')
+                if get_workers():
+                    cursor.execute('SELECT pg_export_snapshot()')
+                    snapshot_id = cursor.fetchone()[0]
+        yield snapshot_id
+
+
+def run_bundle(request, parts):
+    """
+    Serves every (name, resource, params) part against one snapshot and
+    returns {'parts': {name: {status, data, duration_ms}}, 'duration_ms',
+    'concurrent'}.
+    """
+    start = time.perf_counter()
+    with _snapshot() as snapshot_id:
+        concurrent = snapshot_id is not None and len(parts) > 1
+        if concurrent:
+            executor = _get_executor()
+            futures = {
+                name: executor.submit(_serve_in_snapshot, snapshot_id, request, resource, params)
+                for name, resource, params in parts
+            }
+            results = {name: future.result() for name, future in futures.items()}
+        else:
+            results = {name: _serve(request, resource, params) for name, resource, params in parts}
+    return {
+        'parts': results,
+        'duration_ms': round((time.perf_counter() - start) * 1000, 3),
+        'concurrent': concurrent,
+    }
@@ -0,0 +1,149 @@
+"""
+Versioned response cache for the read-heavy gestao endpoints.
+
+Computed payloads are stored under a key that embeds the condominium and
+its data version. Any write to one of its expenses or categories replaces
+that version, which orphans all of the condominium's cached payloads at
+once (and nobody else's): readers never see stale totals and nothing has to
+be deleted. The version also doubles as the ETag, so a client that already
+holds the current payload gets a 304 without anything being recomputed.
+A database-wide version, replaced on every write, covers views that span
+condominiums (the admin).
+
+Works with any Django cache backend (local-memory by default); set
+GESTAO_CACHE_ALIAS to point it at a shared cache.
+"""
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+VERSION_KEY = 'gestao:data-version:{scope}'
+PAYLOAD_KEY = 'gestao:payload:{scope}:{name}:{variant}:{version}'
+# Escopo da versão que muda a cada escrita, de qualquer condomínio
+ALL_CONDOMINIUMS = 'all'
+
+
+def get_scope(condominium=None):
+    """
+    The cache scope of a condominium (instance or id); None is the whole
+    database.
+    """
+    if condominium is None:
+        return ALL_CONDOMINIUMS
+    return str(getattr(condominium, 'pk', condominium))
+
+
+def get_cache():
+    return caches[getattr(settings, 'GESTAO_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'GESTAO_CACHE_TIMEOUT', 60 * 60)
+
+
+def get_data_version(condominium=None):
+    """
+    Returns the current data version of a condominium (None: of the whole
+    database), creating one if the cache lost it.
+    """
+    cache = get_cache()
+    key = VERSION_KEY.format(scope=get_scope(condominium))
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _replace_versions(scopes):
+    get_cache().set_many({VERSION_KEY.format(scope=scope): uuid.uuid4().hex for scope in scopes}, timeout=None)
+
+
+def bump_data_version(condominium):
+    """
+    Invalidates the cached payloads of a condominium (and the database-wide
+    ones). Called for each write to Expense or Category; the second bump
+    after commit stops a reader that ran before the commit from caching
+    pre-commit data under the new version.
+    """
+    scopes = (get_scope(condominium), ALL_CONDOMINIUMS)
+    _replace_versions(scopes)
+    transaction.on_commit(lambda: _replace_versions(scopes))
+
+
+def _etag(scope, name, variant, version):
+    return quote_etag(f"{name}-{scope}-{variant}-{version}")
+
+
+def _client_has(request, etag):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if not if_none_match:
+        return False
+    # Comparação fraca: a compressão (CompressionMiddleware) devolve W/"..."
+    etags = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(if_none_match)]
+    return etag in etags or if_none_match.strip() == '*'
+
+
+def cached_response(request, name, compute, variant='', *, condominium):
+    """
+    Returns a Response with the payload produced by compute() for
+    `condominium`, served from the cache when its data version has not
+    changed, or a 304 when the client's If-None-Match already names the
+    current version.
+    """
+    scope = get_scope(condominium)
+    version = get_data_version(condominium)
+    etag = _etag(scope, name, variant, version)
+    headers = {'ETag': etag}
+
+    if _client_has(request, etag):
+        response = Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    else:
+        cache = get_cache()
+        key = PAYLOAD_KEY.format(scope=scope, name=name, variant=variant, version=version)
+        data = cache.get(key)
+        if data is None:
+            data = compute()
+            cache.set(key, data, timeout=get_timeout())
+        response = Response(data, headers=headers)
+
+    # Clients may keep the payload but must revalidate it on every use.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+async def acached_response(request, name, compute, variant='', *, condominium):
+    """
+    Async counterpart of cached_response() for plain Django async views:
+    `compute` is a coroutine function and the payload is rendered with DRF's
+    JSONRenderer so both variants produce the same bytes.
+    """
+    cache = get_cache()
+    scope = get_scope(condominium)
+    version = await cache.aget(VERSION_KEY.format(scope=scope))
+    if version is None:
+        version = await sync_to_async(get_data_version)(condominium)
+    etag = _etag(scope, name, variant, version)
+
+    if _client_has(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        key = PAYLOAD_KEY.format(scope=scope, name=name, variant=variant, version=version)
+        data = await cache.aget(key)
+        if data is None:
+            data = await compute()
+            await cache.aset(key, data, timeout=get_timeout())
+        response = HttpResponse(JSONRenderer().render(data), content_type='application/json')
+
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
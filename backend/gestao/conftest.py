@@ -0,0 +1,35 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from gestao.models import Condominium
+
+
+@pytest.fixture
+def condominium(db):
+    return Condominium.objects.create(name="Residencial Aurora", slug="aurora")
+
+
+@pytest.fixture
+def user(db, condominium):
+    """Síndico do condomínio `condominium` (o único dele)."""
+    user = get_user_model().objects.create_user(username="sindico", password="senha-segura")
+    condominium.members.add(user)
+    return user
+
+
+@pytest.fixture
+def api_client(user):
+    """APIClient já autenticado (as views exigem IsAuthenticated)."""
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Evita que payloads cacheados vazem de um teste para outro."""
+    cache.clear()
+    yield
+    cache.clear()
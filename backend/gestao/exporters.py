@@ -0,0 +1,60 @@
+"""
+Streaming export of expenses as CSV or NDJSON.
+
+Rows are pulled with values_list().iterator(), which uses a server-side
+cursor on Postgres, and are encoded a chunk at a time, so an export of any
+size runs in constant memory and the first bytes go out immediately.
+"""
+import csv
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_FIELDS = ('id', 'description', 'amount', 'date', 'category_id', 'category_name')
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def iter_export_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    return queryset \
+        .values_list('id', 'description', 'amount', 'date', 'category_id', 'category__name') \
+        .iterator(chunk_size=chunk_size)
+
+
+def _chunked(lines, lines_per_chunk):
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= lines_per_chunk:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def iter_csv(rows, lines_per_chunk=500):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    yield from _chunked(
+        (writer.writerow((*row[:3], row[3].isoformat(), *row[4:])) for row in rows),
+        lines_per_chunk,
+    )
+
+
+def iter_ndjson(rows, lines_per_chunk=500):
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    yield from _chunked(
+        (encoder.encode(dict(zip(EXPORT_FIELDS, row))) + '\n' for row in rows),
+        lines_per_chunk,
+    )
+
+
+ENCODERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+}
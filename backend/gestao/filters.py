@@ -0,0 +1,98 @@
+import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+
+def parse_date(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: "Enter a valid date (YYYY-MM-DD)."})
+
+
+def parse_ids(params, name):
+    values = [v for item in params.getlist(name) for v in item.split(',') if v.strip()]
+    try:
+        return [int(v) for v in values]
+    except ValueError:
+        raise ValidationError({name: "Enter one or more integer ids."})
+
+
+def parse_decimal(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        result = Decimal(value)
+    except InvalidOperation:
+        raise ValidationError({name: "Enter a valid number."})
+    if not result.is_finite():
+        raise ValidationError({name: "Enter a valid number."})
+    return result
+
+
+class ExpenseFilterBackend(BaseFilterBackend):
+    """
+    Filters expense querysets from query parameters:
+
+    - date_from / date_to: inclusive date range (YYYY-MM-DD)
+    - category: one or more category ids, comma separated
+    - uncategorized: true to include (or, alone, select) expenses without category
+    - amount_min / amount_max: inclusive amount range
+    - search: case-insensitive substring of the description
+
+    Date and category conditions are range reads on the (date, id) and
+    (category, date) indexes, amounts use the amount index and, on
+    Postgres, the search uses a trigram index on UPPER(description).
+    """
+
+    params = (
+        'date_from', 'date_to', 'category', 'uncategorized', 'amount_min', 'amount_max', 'search',
+    )
+
+    def filter_queryset(self, request, queryset, view):
+        conditions = self.get_conditions(request.query_params)
+        return queryset.filter(conditions) if conditions else queryset
+
+    def get_conditions(self, params):
+        """
+        Returns the Q object for the given query parameters (empty when no
+        filter applies).
+        """
+        conditions = Q()
+
+        date_from = parse_date(params, 'date_from')
+        if date_from:
+            conditions &= Q(date__gte=date_from)
+        date_to = parse_date(params, 'date_to')
+        if date_to:
+            conditions &= Q(date__lte=date_to)
+
+        category_ids = parse_ids(params, 'category')
+        uncategorized = params.get('uncategorized', '').lower() in TRUE_VALUES
+        if category_ids and uncategorized:
+            conditions &= Q(category_id__in=category_ids) | Q(category__isnull=True)
+        elif category_ids:
+            conditions &= Q(category_id__in=category_ids)
+        elif uncategorized:
+            conditions &= Q(category__isnull=True)
+
+        amount_min = parse_decimal(params, 'amount_min')
+        if amount_min is not None:
+            conditions &= Q(amount__gte=amount_min)
+        amount_max = parse_decimal(params, 'amount_max')
+        if amount_max is not None:
+            conditions &= Q(amount__lte=amount_max)
+
+        search = params.get('search', '').strip()
+        if search:
+            conditions &= Q(description__icontains=search)
+        return conditions
@@ -0,0 +1,133 @@
+"""
+Duplicate-expense detection.
+
+Every Expense carries a fingerprint of its normalized description (case,
+accents, punctuation and spacing ignored), its amount and the week of its
+date, kept up to date on save (see gestao.signals) and by the bulk writers
+(stamp()). Two expenses of the same condominium with the same fingerprint
+are likely the same bill typed twice, so checking a new expense is one
+lookup on the (condominium, fingerprint) index, and listing every
+duplicate group is one grouped pass over it instead of comparing pairs.
+"""
+import datetime
+import hashlib
+import re
+import unicodedata
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from .models import Expense
+
+DEFAULT_BATCH_SIZE = 2000
+# Quantas despesas iguais uma verificação devolve
+MAX_MATCHES = 5
+
+_WORDS = re.compile(r'[0-9a-z]+')
+
+
+def normalize_description(text):
+    """
+    'Conta de Luz - JAN.' and 'conta de luz jan' both become 'conta de luz jan'.
+    """
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(_WORDS.findall(stripped.casefold()))
+
+
+def date_bucket(value):
+    """
+    The Monday of the week of `value`: a double entry typed with a date off
+    by a day or two usually lands in the same bucket.
+    """
+    return value - datetime.timedelta(days=value.weekday())
+
+
+def compute(description, amount, date):
+    """
+    The fingerprint of an expense's fields (`date` None = today, like the
+    model default).
+    """
+    amount = Expense._meta.get_field('amount').to_python(amount)
+    date = Expense._meta.get_field('date').to_python(date if date is not None else timezone.now())
+    key = f"{date_bucket(date).isoformat()}|{amount:.2f}|{normalize_description(description)}"
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def stamp(expenses):
+    """
+    Sets the fingerprint of (unsaved or about to be saved) expenses; bulk
+    writers call it since bulk_create skips the save signals.
+    """
+    for expense in expenses:
+        expense.fingerprint = compute(expense.description, expense.amount, expense.date)
+
+
+def find_matches(condominium, fingerprint, exclude=None, limit=MAX_MATCHES):
+    """
+    Ids of `condominium`'s expenses with `fingerprint` (except `exclude`),
+    oldest first: one lookup on gestao_exp_condo_fprint_idx.
+    """
+    matches = Expense.objects.for_condominium(condominium).filter(fingerprint=fingerprint)
+    if exclude is not None:
+        matches = matches.exclude(pk=exclude)
+    return list(matches.order_by('pk').values_list('pk', flat=True)[:limit])
+
+
+def with_duplicates(queryset):
+    """
+    Narrows an Expense queryset to the rows that have a twin (same
+    condominium and fingerprint) anywhere in the table.
+    """
+    twins = Expense.objects.filter(
+        condominium_id=OuterRef('condominium_id'), fingerprint=OuterRef('fingerprint'),
+    ).exclude(pk=OuterRef('pk'))
+    return queryset.filter(Exists(twins))
+
+
+def duplicate_groups(queryset=None):
+    """
+    Yields the groups (lists of dicts, oldest first) of expenses sharing a
+    condominium and a fingerprint, from one query: the database groups the
+    fingerprint index and only the rows of repeated fingerprints come back.
+    """
+    queryset = Expense.objects.all() if queryset is None else queryset
+    repeated = queryset.values('condominium_id', 'fingerprint') \
+        .annotate(count=Count('id')).filter(count__gt=1).values('fingerprint')
+    rows = queryset.filter(fingerprint__in=repeated) \
+        .order_by('condominium_id', 'fingerprint', 'id') \
+        .values('id', 'condominium_id', 'fingerprint', 'description', 'amount', 'date')
+    for _, group in groupby(rows.iterator(), key=lambda row: (row['condominium_id'], row['fingerprint'])):
+        group = list(group)
+        # O mesmo fingerprint pode se repetir só em outro condomínio
+        if len(group) > 1:
+            yield group
+
+
+def refresh(queryset=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Recomputes the stored fingerprints (after a change to the algorithm, or
+    for rows written around the ORM). Returns how many changed.
+    """
+    queryset = Expense.objects.all() if queryset is None else queryset
+    changed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .only('pk', 'description', 'amount', 'date', 'fingerprint')[:batch_size]
+        )
+        if not batch:
+            return changed
+        last_pk = batch[-1].pk
+        stale = []
+        for expense in batch:
+            fingerprint = compute(expense.description, expense.amount, expense.date)
+            if fingerprint != expense.fingerprint:
+                expense.fingerprint = fingerprint
+                stale.append(expense)
+        with transaction.atomic():
+            Expense.objects.bulk_update(stale, ['fingerprint'], batch_size=batch_size)
+        changed += len(stale)
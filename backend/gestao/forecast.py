@@ -0,0 +1,271 @@
+"""
+Per-category budgets, burn rate and spend projections.
+
+The category x month totals of the history window are loaded once (complete
+months from ExpenseMonthlyRollup, the current month as a month-to-date
+aggregate of Expense) into a float matrix, and every figure is computed for
+all categories at once with array operations:
+
+- month-to-date spend and daily burn rate;
+- the moving average of the last `window` complete months;
+- a seasonal index per calendar month: the category's average for that
+  month divided by its overall monthly average;
+- the projected month end: what was spent so far plus the rest of the
+  month at a blend of the current run rate and the seasonal baseline
+  (deseasonalized recent level x this month's index), trusting the run rate
+  more as the month goes by;
+- the projected year end: spend so far this year, the projected month end
+  and the seasonal baseline of the months left;
+- budget use and overrun flags against Category.monthly_budget (twelve
+  times that for the year).
+"""
+import calendar
+import datetime
+from dataclasses import dataclass
+
+import numpy as np
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .aggregation import UNCATEGORIZED_LABEL
+from .filters import parse_date
+from .models import Category, Expense, ExpenseMonthlyRollup
+
+DEFAULT_MONTHS = 36
+MAX_MONTHS = 240
+DEFAULT_WINDOW = 3
+CALENDAR_MONTHS = np.arange(1, 13)
+
+
+def month_index(day):
+    return day.year * 12 + day.month - 1
+
+
+def month_from_index(index):
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def _positive_int(params, name, default):
+    value = params.get(name)
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: "Must be a positive integer."})
+
+
+def project(history, history_months, month_to_date, budgets, as_of, window=DEFAULT_WINDOW):
+    """
+    Computes the forecast for every category at once.
+
+    `history` is a (categories x months) float array of complete months,
+    oldest first, whose columns are the month indexes in `history_months`
+    (see month_index); `month_to_date` and `budgets` (NaN = no budget) have
+    one entry per category. Returns a dict of per-category arrays.
+    """
+    categories, width = history.shape
+    days_in_month = calendar.monthrange(as_of.year, as_of.month)[1]
+    progress = as_of.day / days_in_month
+    calendar_months = history_months % 12 + 1
+
+    # Índice sazonal: média de cada mês do calendário / média mensal geral
+    in_month = (calendar_months[:, None] == CALENDAR_MONTHS[None, :]).astype(float)
+    occurrences = in_month.sum(axis=0)
+    overall = history.mean(axis=1, keepdims=True) if width else np.zeros((categories, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        seasonal_index = (history @ in_month) / occurrences / overall
+    seasonal_index = np.where(np.isfinite(seasonal_index), seasonal_index, 1.0)
+
+    recent = history[:, -window:]
+    if recent.shape[1]:
+        moving_average = recent.mean(axis=1)
+        # Nível sem sazonalidade: cada mês recente dividido pelo seu índice
+        recent_index = seasonal_index[:, calendar_months[-window:] - 1]
+        level = np.divide(recent, recent_index, out=recent.copy(), where=recent_index > 0).mean(axis=1)
+    else:
+        moving_average = level = np.zeros(categories)
+
+    baseline = level[:, None] * seasonal_index
+    run_rate = month_to_date / progress
+    blended = progress * run_rate + (1 - progress) * baseline[:, as_of.month - 1]
+    projected_month_end = month_to_date + (1 - progress) * blended
+
+    this_year = history_months // 12 == as_of.year
+    year_to_date = history[:, this_year].sum(axis=1) + month_to_date
+    projected_year_end = (
+        year_to_date - month_to_date + projected_month_end + baseline[:, as_of.month:].sum(axis=1)
+    )
+
+    has_budget = ~np.isnan(budgets)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        budget_used = np.where(has_budget, month_to_date / budgets, np.nan)
+    return {
+        'month_to_date': month_to_date,
+        'burn_rate': month_to_date / as_of.day,
+        'moving_average': moving_average,
+        'seasonal_index': seasonal_index[:, as_of.month - 1],
+        'projected_month_end': projected_month_end,
+        'year_to_date': year_to_date,
+        'projected_year_end': projected_year_end,
+        'budget_used': budget_used,
+        'over_budget_month': has_budget & (projected_month_end > budgets),
+        'over_budget_year': has_budget & (projected_year_end > budgets * 12),
+    }
+
+
+@dataclass(frozen=True)
+class ForecastQuery:
+    """
+    Forecast as of `as_of` from `months` complete months of history (at
+    least back to January, for the year to date) and a `window`-month
+    moving average, over `condominium_id`'s categories and expenses (None =
+    all condominiums, for internal callers).
+    """
+    as_of: datetime.date
+    months: int = DEFAULT_MONTHS
+    window: int = DEFAULT_WINDOW
+    condominium_id: int = None
+
+    def __post_init__(self):
+        if not 1 <= self.months <= MAX_MONTHS:
+            raise ValidationError({'months': f"Must be between 1 and {MAX_MONTHS}."})
+        if not 1 <= self.window <= self.months:
+            raise ValidationError({'window': "Must be between 1 and months."})
+        # A janela de histórico precisa caber em datetime.date (anos 1 a 9999)
+        first, _ = self.history_range()
+        if first < month_index(datetime.date.min) or self.as_of.year >= datetime.MAXYEAR:
+            raise ValidationError({'as_of': (
+                f"The {self.months}-month history before as_of must start in year 1 or later, "
+                f"and as_of must be before year {datetime.MAXYEAR}."
+            )})
+
+    @classmethod
+    def from_params(cls, params, condominium):
+        """
+        Builds a query on `condominium` from request query parameters:
+        as_of (default today), months and window.
+        """
+        return cls(
+            condominium_id=condominium.pk,
+            as_of=parse_date(params, 'as_of') or timezone.localdate(),
+            months=_positive_int(params, 'months', DEFAULT_MONTHS),
+            window=_positive_int(params, 'window', DEFAULT_WINDOW),
+        )
+
+    @property
+    def cache_variant(self):
+        return f"{self.as_of.isoformat()}:{self.months}:{self.window}"
+
+    def history_range(self):
+        """
+        (first, current) month indexes: history covers [first, current).
+        """
+        current = month_index(self.as_of)
+        return min(current - self.months, current - self.as_of.month + 1), current
+
+    def _scoped(self, model):
+        if self.condominium_id is None:
+            return model.objects.all()
+        return model.objects.for_condominium(self.condominium_id)
+
+    def load(self):
+        """
+        Returns (categories as (id, name) pairs, history matrix, history
+        month indexes, month-to-date vector, budgets), with one query each
+        for the categories, the rollup and the current month.
+        """
+        first, current = self.history_range()
+        categories = list(self._scoped(Category).order_by('name').values_list('id', 'name', 'monthly_budget'))
+        history_rows = list(
+            self._scoped(ExpenseMonthlyRollup).filter(
+                month__gte=month_from_index(first), month__lt=month_from_index(current), count__gt=0,
+            ).values_list('category_id', 'month', 'total')
+        )
+        current_rows = list(
+            self._scoped(Expense).filter(date__gte=month_from_index(current), date__lte=self.as_of)
+            .values('category_id').annotate(total=Sum('amount'))
+            .values_list('category_id', 'total').order_by()
+        )
+        if any(category_id is None for category_id, _, _ in history_rows) or \
+                any(category_id is None for category_id, _ in current_rows):
+            categories.append((None, UNCATEGORIZED_LABEL, None))
+
+        row = {category_id: index for index, (category_id, _, _) in enumerate(categories)}
+        history = np.zeros((len(categories), current - first))
+        if history_rows:
+            np.add.at(history, (
+                np.fromiter((row[category_id] for category_id, _, _ in history_rows), dtype=int),
+                np.fromiter((month_index(month) - first for _, month, _ in history_rows), dtype=int),
+            ), np.fromiter((total for _, _, total in history_rows), dtype=float))
+        month_to_date = np.zeros(len(categories))
+        if current_rows:
+            np.add.at(
+                month_to_date,
+                np.fromiter((row[category_id] for category_id, _ in current_rows), dtype=int),
+                np.fromiter((total for _, total in current_rows), dtype=float),
+            )
+        budgets = np.array([np.nan if budget is None else float(budget) for _, _, budget in categories])
+        return (
+            [(category_id, name) for category_id, name, _ in categories],
+            history, np.arange(first, current), month_to_date, budgets,
+        )
+
+    def build(self):
+        """
+        Loads the data and returns the forecast payload.
+        """
+        categories, history, history_months, month_to_date, budgets = self.load()
+        figures = project(history, history_months, month_to_date, budgets, self.as_of, self.window)
+        return to_payload(self, categories, budgets, figures)
+
+
+def _money(value):
+    return f"{value:.2f}"
+
+
+def to_payload(query, categories, budgets, figures):
+    """
+    The endpoint's payload: amounts as decimal strings, one entry per
+    category (sorted by name, uncategorized last) and the totals.
+    """
+    columns = {name: values.tolist() for name, values in figures.items()}
+    budget_list = budgets.tolist()
+    entries = []
+    for index, (category_id, name) in enumerate(categories):
+        budget = budget_list[index]
+        budget_used = columns['budget_used'][index]
+        entries.append({
+            'id': category_id,
+            'name': name,
+            'monthly_budget': None if budget != budget else _money(budget),
+            'month_to_date': _money(columns['month_to_date'][index]),
+            'burn_rate': _money(columns['burn_rate'][index]),
+            'moving_average': _money(columns['moving_average'][index]),
+            'seasonal_index': round(columns['seasonal_index'][index], 4),
+            'projected_month_end': _money(columns['projected_month_end'][index]),
+            'year_to_date': _money(columns['year_to_date'][index]),
+            'projected_year_end': _money(columns['projected_year_end'][index]),
+            'budget_used': None if budget_used != budget_used else round(budget_used, 4),
+            'over_budget_month': columns['over_budget_month'][index],
+            'over_budget_year': columns['over_budget_year'][index],
+        })
+    as_of = query.as_of
+    return {
+        'as_of': as_of.isoformat(),
+        'month': as_of.strftime('%Y-%m'),
+        'days_elapsed': as_of.day,
+        'days_in_month': calendar.monthrange(as_of.year, as_of.month)[1],
+        'history_months': query.months,
+        'window': query.window,
+        'categories': entries,
+        'totals': {
+            'monthly_budget': _money(np.nansum(budgets)),
+            'month_to_date': _money(figures['month_to_date'].sum()),
+            'projected_month_end': _money(figures['projected_month_end'].sum()),
+            'projected_year_end': _money(figures['projected_year_end'].sum()),
+            'over_budget_month': int(figures['over_budget_month'].sum()),
+            'over_budget_year': int(figures['over_budget_year'].sum()),
+        },
+    }
@@ -0,0 +1,152 @@
+"""
+Streaming bulk import of expenses from CSV or NDJSON.
+
+Rows are read lazily, validated and written in fixed-size batches, so
+memory stays flat regardless of the size of the input. Each batch resolves
+its category names against an in-memory name -> id map (creating missing
+categories once), is inserted with a single bulk_create inside its own
+transaction and is folded into the monthly rollup.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import cache, fingerprints, rollups, sync
+from .models import Category, Expense
+from .serializers import ExpenseImportSerializer
+
+CSV = 'csv'
+NDJSON = 'ndjson'
+
+CONTENT_TYPES = {
+    'text/csv': CSV,
+    'application/csv': CSV,
+    'application/x-ndjson': NDJSON,
+    'application/ndjson': NDJSON,
+    'application/jsonl': NDJSON,
+    'application/x-jsonlines': NDJSON,
+}
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def iter_text_lines(byte_lines, encoding='utf-8'):
+    """
+    Decodes an iterable of byte lines, dropping a leading BOM.
+    """
+    first = True
+    for line in byte_lines:
+        text = line.decode(encoding)
+        if first:
+            text = text.lstrip('\ufeff')
+            first = False
+        yield text
+
+
+def iter_records(lines, data_format):
+    """
+    Yields one dict per input row. Rows that cannot be parsed at all are
+    yielded as ValueError instances so they are reported, not fatal.
+    """
+    if data_format == CSV:
+        yield from csv.DictReader(lines)
+    elif data_format == NDJSON:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield ValueError("Invalid JSON line")
+                continue
+            if not isinstance(record, dict):
+                yield ValueError("Each line must be a JSON object")
+                continue
+            yield record
+    else:
+        raise ValueError(f"Unsupported import format: {data_format}")
+
+
+class ExpenseImporter:
+    """
+    Imports expense records into a condominium in batches (categories are
+    matched, and created, by name within it) and yields one result dict per
+    row:
+    {'row': n, 'status': 'created', 'id': pk} or
+    {'row': n, 'status': 'error', 'errors': {...}}.
+    """
+
+    def __init__(self, condominium, batch_size=DEFAULT_BATCH_SIZE):
+        self.condominium = condominium
+        self.batch_size = batch_size
+        self.category_ids = dict(Category.objects.for_condominium(condominium).values_list('name', 'id'))
+        self.created = 0
+        self.failed = 0
+
+    def run(self, records):
+        numbered = enumerate(records, start=1)
+        while True:
+            batch = list(islice(numbered, self.batch_size))
+            if not batch:
+                break
+            yield from self._import_batch(batch)
+
+    def _import_batch(self, batch):
+        results = {}
+        valid = []
+        for row, record in batch:
+            if isinstance(record, Exception):
+                results[row] = {'row': row, 'status': 'error', 'errors': {'non_field_errors': [str(record)]}}
+                continue
+            if 'category' not in record and 'category_name' in record:
+                record = {**record, 'category': record['category_name']}
+            serializer = ExpenseImportSerializer(data=record)
+            if serializer.is_valid():
+                valid.append((row, serializer.validated_data))
+            else:
+                results[row] = {'row': row, 'status': 'error', 'errors': serializer.errors}
+
+        with transaction.atomic():
+            self._create_missing_categories(data.get('category') for _, data in valid)
+            expenses = [
+                Expense(
+                    condominium=self.condominium,
+                    description=data['description'],
+                    amount=data['amount'],
+                    date=data.get('date') or timezone.localdate(),
+                    category_id=self.category_ids.get(data.get('category')),
+                )
+                for _, data in valid
+            ]
+            # bulk_create skips the save signals, so stamp the change sequence
+            # and fingerprint and feed the rollup directly.
+            sync.stamp(expenses)
+            fingerprints.stamp(expenses)
+            Expense.objects.bulk_create(expenses, batch_size=self.batch_size)
+            rollups.apply_changes(
+                (expense.condominium_id, expense.date, expense.category_id, expense.amount, 1)
+                for expense in expenses
+            )
+            if expenses:
+                cache.bump_data_version(self.condominium)
+
+        for (row, _), expense in zip(valid, expenses):
+            results[row] = {'row': row, 'status': 'created', 'id': expense.pk}
+        self.created += len(expenses)
+        self.failed += len(batch) - len(expenses)
+        for row, _ in batch:
+            yield results[row]
+
+    def _create_missing_categories(self, names):
+        missing = {name for name in names if name and name not in self.category_ids}
+        if not missing:
+            return
+        categories = [Category(condominium=self.condominium, name=name) for name in missing]
+        sync.stamp(categories)
+        Category.objects.bulk_create(categories, ignore_conflicts=True)
+        self.category_ids.update(
+            Category.objects.for_condominium(self.condominium).filter(name__in=missing).values_list('name', 'id')
+        )
@@ -0,0 +1,322 @@
+"""
+Database-backed background jobs, with no broker to run.
+
+Heavy operations are registered as tasks (@task, see gestao.tasks) and
+queued as Job rows; `manage.py run_worker` claims due jobs and runs them on
+a thread or process pool. Views that accept `Prefer: respond-async` (or
+?async=true) enqueue the work and answer 202 with the job's status URL
+instead of holding the request.
+
+On Postgres a job is claimed with SELECT ... FOR UPDATE SKIP LOCKED, so
+workers never wait on each other. Elsewhere the claim is a conditional
+UPDATE (status still 'queued'), which SQLite's single write lock makes
+exclusive. A failed job is retried with exponential backoff until it runs
+out of attempts. While a job runs its worker refreshes locked_at every
+GESTAO_JOB_HEARTBEAT seconds; a job whose worker disappeared (no heartbeat
+for GESTAO_JOB_TIMEOUT) is requeued. Each claim counts as an attempt, so a
+run only records its outcome while the job still holds its own claim
+(same worker and attempt): a run that was requeued and claimed again
+meanwhile cannot overwrite the newer one.
+"""
+import datetime
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, close_old_connections, connections, transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .filters import TRUE_VALUES
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+POOLS = ('thread', 'process')
+# Quantas vezes o claim sem SKIP LOCKED tenta de novo ao perder a corrida
+CLAIM_RETRIES = 5
+
+
+class JobFailed(Exception):
+    """
+    Raised by a task to fail its job at once, without further attempts.
+    """
+
+
+def task(name):
+    """
+    Registers the decorated function(payload) -> JSON result as task `name`.
+    """
+    def register(function):
+        TASKS[name] = function
+        return function
+    return register
+
+
+def get_max_attempts():
+    return getattr(settings, 'GESTAO_JOB_MAX_ATTEMPTS', 3)
+
+
+def get_retry_delay(attempts):
+    """
+    Seconds before the next attempt: GESTAO_JOB_RETRY_DELAY, doubled per
+    attempt already made.
+    """
+    return getattr(settings, 'GESTAO_JOB_RETRY_DELAY', 5) * 2 ** max(attempts - 1, 0)
+
+
+def get_timeout():
+    return getattr(settings, 'GESTAO_JOB_TIMEOUT', 15 * 60)
+
+
+def get_heartbeat():
+    return getattr(settings, 'GESTAO_JOB_HEARTBEAT', 60)
+
+
+def enqueue(name, payload=None, user=None, max_attempts=None):
+    """
+    Queues task `name` with a JSON payload and returns the Job.
+    """
+    if name not in TASKS:
+        raise ValueError(f"Unknown task {name!r}.")
+    return Job.objects.create(
+        task=name,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or get_max_attempts(),
+    )
+
+
+def wants_async(request):
+    """
+    True when the client asked for deferred processing, with RFC 7240's
+    `Prefer: respond-async` or ?async=true.
+    """
+    prefer = request.META.get('HTTP_PREFER', '')
+    if 'respond-async' in (token.strip().lower() for token in prefer.split(',')):
+        return True
+    return request.query_params.get('async', '').lower() in TRUE_VALUES
+
+
+def accepted_response(request, job, data):
+    """
+    202 response for a queued job, pointing at its status endpoint.
+    """
+    location = request.build_absolute_uri(reverse('job-detail', args=[job.pk]))
+    return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+
+def claim(worker, using=DEFAULT_DB_ALIAS):
+    """
+    Marks the next due queued job as running on `worker` and returns it, or
+    None when nothing is due.
+    """
+    now = timezone.now()
+    queued = Job.objects.using(using).filter(status=Job.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+    running = {'status': Job.RUNNING, 'attempts': F('attempts') + 1, 'locked_by': worker, 'locked_at': now}
+
+    if connections[using].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=using):
+            job_id = queued.select_for_update(skip_locked=True).values_list('pk', flat=True).first()
+            if job_id is None:
+                return None
+            Job.objects.using(using).filter(pk=job_id).update(**running)
+        return Job.objects.using(using).get(pk=job_id)
+
+    for _ in range(CLAIM_RETRIES):
+        job_id = queued.values_list('pk', flat=True).first()
+        if job_id is None:
+            return None
+        # Só um worker vê a linha ainda 'queued' no UPDATE; os outros tentam a próxima
+        if queued.filter(pk=job_id).update(**running):
+            return Job.objects.using(using).get(pk=job_id)
+    return None
+
+
+@contextmanager
+def _heartbeat(owned):
+    # Thread própria (e conexão própria): renova o locked_at enquanto a tarefa roda
+    stopping = threading.Event()
+
+    def beat():
+        try:
+            while not stopping.wait(get_heartbeat()):
+                try:
+                    owned.update(locked_at=timezone.now())
+                except DatabaseError:
+                    logger.exception("Could not refresh the lock of a running job")
+        finally:
+            connections[owned.db].close()
+
+    thread = threading.Thread(target=beat, name='gestao-job-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopping.set()
+        thread.join()
+
+
+def execute(job_id, using=DEFAULT_DB_ALIAS):
+    """
+    Runs a claimed job and records its outcome: the result, a retry after
+    the backoff delay, or the failure. Returns the job's new status (still
+    'running' when the job was claimed again while this run went on, whose
+    outcome is then dropped).
+    """
+    job = Job.objects.using(using).get(pk=job_id)
+    # O claim é identificado por worker + tentativa (cada claim soma uma)
+    owned = Job.objects.using(using).filter(
+        pk=job.pk, status=Job.RUNNING, locked_by=job.locked_by, attempts=job.attempts,
+    )
+    try:
+        with _heartbeat(owned):
+            result = TASKS[job.task](job.payload)
+    except Exception as exc:
+        logger.exception("Job %s (%s) failed on attempt %s", job.pk, job.task, job.attempts)
+        now = timezone.now()
+        if isinstance(exc, JobFailed) or job.attempts >= job.max_attempts:
+            outcome = {'status': Job.FAILED, 'finished_at': now}
+        else:
+            delay = datetime.timedelta(seconds=get_retry_delay(job.attempts))
+            outcome = {'status': Job.QUEUED, 'run_after': now + delay}
+        if not owned.update(error=traceback.format_exc(), locked_by='', locked_at=None, **outcome):
+            return _lost_claim(job)
+        return outcome['status']
+    if not owned.update(
+        status=Job.SUCCEEDED, result=result, error='', locked_by='', locked_at=None,
+        finished_at=timezone.now(),
+    ):
+        return _lost_claim(job)
+    return Job.SUCCEEDED
+
+
+def _lost_claim(job):
+    logger.warning("Job %s (%s) was claimed again during attempt %s; its outcome is dropped",
+                   job.pk, job.task, job.attempts)
+    return Job.RUNNING
+
+
+def run_next(worker, using=DEFAULT_DB_ALIAS):
+    """
+    Claims and runs one job in the calling thread; returns it (None when the
+    queue had nothing due).
+    """
+    job = claim(worker, using=using)
+    if job is not None:
+        execute(job.pk, using=using)
+        job.refresh_from_db()
+    return job
+
+
+def requeue_stale(timeout=None, using=DEFAULT_DB_ALIAS):
+    """
+    Gives jobs in 'running' whose lock was not refreshed for `timeout`
+    seconds (their worker died) back to the queue, or fails them when out
+    of attempts.
+    Returns how many jobs were touched.
+    """
+    cutoff = timezone.now() - datetime.timedelta(seconds=timeout or get_timeout())
+    stale = Job.objects.using(using).filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    reset = {'locked_by': '', 'locked_at': None, 'error': "Worker stopped responding."}
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished_at=timezone.now(), **reset
+    )
+    return failed + stale.update(status=Job.QUEUED, **reset)
+
+
+def _execute_pooled(job_id):
+    # Cada thread/processo do pool usa (e fecha) a própria conexão
+    close_old_connections()
+    try:
+        return execute(job_id)
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    """
+    Claims due jobs and runs up to `concurrency` of them at once on a
+    thread or process pool. run(burst=True) returns once the queue has
+    nothing due; otherwise it polls every `poll_interval` seconds until
+    stop() is called.
+    """
+    stale_check_interval = 60
+
+    def __init__(self, concurrency=4, pool='thread', poll_interval=1.0, name=None):
+        if pool not in POOLS:
+            raise ValueError(f"pool must be one of: {', '.join(POOLS)}.")
+        self.concurrency = max(1, concurrency)
+        self.pool = pool
+        self.poll_interval = poll_interval
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.processed = 0
+        self._stopping = threading.Event()
+
+    def stop(self):
+        self._stopping.set()
+
+    def _executor(self):
+        if self.pool == 'process':
+            # spawn: um fork herdaria as conexões abertas deste processo. O
+            # initializer precisa ser importável antes do setup (não este módulo).
+            return ProcessPoolExecutor(
+                self.concurrency, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+            )
+        return ThreadPoolExecutor(self.concurrency, thread_name_prefix='gestao-job')
+
+    def run(self, burst=False):
+        pending = set()
+        next_stale_check = 0.0
+        with self._executor() as executor:
+            while not self._stopping.is_set():
+                close_old_connections()
+                done = {future for future in pending if future.done()}
+                for future in done:
+                    self._collect(future)
+                pending -= done
+
+                clock = timezone.now().timestamp()
+                if clock >= next_stale_check:
+                    requeue_stale()
+                    next_stale_check = clock + self.stale_check_interval
+
+                claimed = False
+                while len(pending) < self.concurrency:
+                    job = claim(self.name)
+                    if job is None:
+                        break
+                    pending.add(executor.submit(_execute_pooled, job.pk))
+                    claimed = True
+
+                if burst and not claimed and not pending:
+                    break
+                if not claimed:
+                    if pending:
+                        wait(pending, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    else:
+                        self._stopping.wait(self.poll_interval)
+            # Termina os jobs em andamento antes de sair
+            for future in pending:
+                self._collect(future)
+        close_old_connections()
+        return self.processed
+
+    def _collect(self, future):
+        try:
+            future.result()
+        except Exception:
+            # O job continua 'running' e volta para a fila via requeue_stale()
+            logger.exception("Worker %s could not finish a job", self.name)
+        self.processed += 1
@@ -0,0 +1,82 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from gestao.benchmarks.comparisons import COMPARISONS
+from gestao.benchmarks.runner import compare, run_suite
+from gestao.benchmarks.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks every gestao API route against synthetic ledgers and compares "
+        "the results with a stored baseline. Runs on a throwaway test database "
+        "created from the configured one (SQLite by default, Postgres when "
+        "DATABASE_URL points to one)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', nargs='+', type=int, default=[1000, 100000, 1000000])
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument(
+            '--scenario', action='append', dest='scenarios',
+            choices=[scenario.name for scenario in SCENARIOS],
+            help="Only run the given scenario (repeatable).",
+        )
+        parser.add_argument('--warm-cache', action='store_true',
+                            help="Keep the response cache between requests.")
+        parser.add_argument(
+            '--compare', action='append', dest='comparisons', default=[], metavar='NAME',
+            choices=[comparison.name for comparison in COMPARISONS],
+            help="Also run a comparison (repeatable): " + "; ".join(
+                f"{comparison.name}: {comparison.help}" for comparison in COMPARISONS
+            ) + ".",
+        )
+        parser.add_argument('--clients', type=int, default=16,
+                            help="Concurrent clients of the concurrency comparison (default 16).")
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--baseline', help="Results file to compare against.")
+        parser.add_argument('--latency-threshold', type=float, default=0.25,
+                            help="Allowed p95 growth as a fraction (default 0.25).")
+        parser.add_argument('--keepdb', action='store_true')
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in SCENARIOS if not options['scenarios'] or s.name in options['scenarios']]
+        verbosity = options['verbosity']
+
+        setup_test_environment(debug=False)
+        old_config = setup_databases(verbosity, interactive=False, keepdb=options['keepdb'])
+        try:
+            results = run_suite(
+                options['sizes'],
+                categories=options['categories'],
+                iterations=options['iterations'],
+                scenarios=scenarios,
+                warm_cache=options['warm_cache'],
+                comparisons=options['comparisons'],
+                concurrency=options['clients'],
+                log=self.stdout.write if verbosity else None,
+            )
+        finally:
+            teardown_databases(old_config, verbosity, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        with open(options['output'], 'w') as output:
+            json.dump(results, output, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            with open(options['baseline']) as baseline_file:
+                baseline = json.load(baseline_file)
+            if baseline.get('meta', {}).get('vendor') != results['meta']['vendor']:
+                self.stderr.write("Warning: baseline was recorded on a different database vendor.")
+            regressions = compare(results, baseline, latency_threshold=options['latency_threshold'])
+            for regression in regressions:
+                self.stderr.write(regression)
+            if regressions:
+                raise CommandError(f"{len(regressions)} benchmark regression(s) against the baseline.")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
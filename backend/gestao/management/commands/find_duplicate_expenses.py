@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao import fingerprints, tenancy
+from gestao.models import Condominium, Expense
+
+
+class Command(BaseCommand):
+    help = (
+        "Lists the groups of expenses of a condominium that share description, amount "
+        "and week (the same fingerprint), in one grouped pass over the fingerprint index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--condominium', help="Only this condominium (slug or id).")
+        parser.add_argument('--refresh', action='store_true',
+                            help="Recompute the stored fingerprints before searching.")
+
+    def handle(self, *args, **options):
+        expenses = Expense.objects.all()
+        if options['condominium']:
+            condominium = Condominium.objects.filter(tenancy.named(options['condominium'])).first()
+            if condominium is None:
+                raise CommandError(f"Condominium {options['condominium']!r} not found.")
+            expenses = Expense.objects.for_condominium(condominium)
+
+        if options['refresh']:
+            changed = fingerprints.refresh(expenses)
+            self.stdout.write(f"Fingerprints refreshed: {changed} expense(s) changed.")
+
+        groups = expenses_in_groups = 0
+        for group in fingerprints.duplicate_groups(expenses):
+            groups += 1
+            expenses_in_groups += len(group)
+            self.stdout.write(f"condominium={group[0]['condominium_id']} fingerprint={group[0]['fingerprint']}")
+            for row in group:
+                self.stdout.write(f"  #{row['id']} {row['date']:%Y-%m-%d} {row['amount']} {row['description']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Found {groups} duplicate group(s) ({expenses_in_groups} expense(s))."
+        ))
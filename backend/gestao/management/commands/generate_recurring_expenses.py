@@ -0,0 +1,30 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao.recurring import DEFAULT_BATCH_SIZE, generate
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the expenses of every recurring expense occurrence due so far (or up to "
+        "--through). Safe to run repeatedly, e.g. daily from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--through', help="Generate occurrences up to this date (YYYY-MM-DD). Defaults to today.")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help="Templates per transaction.")
+
+    def handle(self, *args, **options):
+        through = None
+        if options['through']:
+            try:
+                through = datetime.date.fromisoformat(options['through'])
+            except ValueError:
+                raise CommandError("--through must be a date in YYYY-MM-DD format.")
+
+        processed, created = generate(through, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated {created} expense(s) from {processed} recurring template(s)."
+        ))
@@ -0,0 +1,58 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao.importers import CSV, DEFAULT_BATCH_SIZE, NDJSON, ExpenseImporter, iter_records
+from gestao.models import Condominium
+from gestao.tenancy import named
+
+
+class Command(BaseCommand):
+    help = "Imports expenses in bulk from a CSV or NDJSON file ('-' reads stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin.")
+        parser.add_argument(
+            '--format',
+            choices=[CSV, NDJSON],
+            help="Input format. Defaults to the file extension (.csv, .ndjson/.jsonl).",
+        )
+        parser.add_argument(
+            '--condominium',
+            required=True,
+            help="Slug or id of the condominium the expenses belong to.",
+        )
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        data_format = options['format'] or self._format_from_path(path)
+        if data_format is None:
+            raise CommandError("Could not infer the format from the file name; use --format.")
+
+        importer = ExpenseImporter(self._get_condominium(options['condominium']), batch_size=options['batch_size'])
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+        try:
+            for result in importer.run(iter_records(stream, data_format)):
+                if result['status'] == 'error':
+                    self.stderr.write(f"row {result['row']}: {result['errors']}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {importer.created} expense(s); {importer.failed} row(s) rejected."
+        ))
+
+    def _get_condominium(self, value):
+        condominium = Condominium.objects.filter(named(value)).first()
+        if condominium is None:
+            raise CommandError(f"Condominium {value!r} not found.")
+        return condominium
+
+    def _format_from_path(self, path):
+        if path.endswith('.csv'):
+            return CSV
+        if path.endswith(('.ndjson', '.jsonl')):
+            return NDJSON
+        return None
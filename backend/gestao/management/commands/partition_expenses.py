@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        "Manages the optional yearly partitioning of the expense table on PostgreSQL: "
+        "converts the plain table (--convert), converts it back (--revert) and creates "
+        "the partitions of the coming years."
+    )
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument('--convert', action='store_true',
+                            help="Rebuild the expense table as a partitioned table (locks it while copying).")
+        action.add_argument('--revert', action='store_true',
+                            help="Rebuild the partitioned expense table as a plain table.")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not partitioning.is_supported(using):
+            if options['convert'] or options['revert']:
+                raise CommandError("Expense partitioning requires PostgreSQL.")
+            self.stdout.write("Not on PostgreSQL: the expense table stays a plain table.")
+            return
+
+        if options['convert']:
+            if partitioning.convert(using):
+                self.stdout.write(self.style.SUCCESS("Expense table converted to yearly partitions."))
+            else:
+                self.stdout.write("Expense table is already partitioned.")
+        elif options['revert']:
+            if partitioning.revert(using):
+                self.stdout.write(self.style.SUCCESS("Expense table converted back to a plain table."))
+            else:
+                self.stdout.write("Expense table is not partitioned.")
+            return
+
+        if not partitioning.is_partitioned(using):
+            self.stdout.write("Expense table is not partitioned (use --convert).")
+            return
+        for name in partitioning.ensure_future_partitions(using=using):
+            self.stdout.write(f"Created partition {name}.")
+        for name, bounds in partitioning.list_partitions(using):
+            self.stdout.write(f"  {name}: {bounds}")
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestao import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the monthly/category expense rollup and checks it against a live aggregate."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check-only',
+            action='store_true',
+            help="Only compare the rollup with the live aggregate, without rebuilding it.",
+        )
+
+    def handle(self, *args, **options):
+        if not options['check_only']:
+            written = rollups.rebuild()
+            self.stdout.write(f"Rollup rebuilt: {written} month/category rows.")
+
+        mismatches = rollups.verify()
+        for condominium_id, month, category_id, expected, found in mismatches:
+            self.stderr.write(
+                f"condominium={condominium_id} {month:%Y-%m} category={category_id}: "
+                f"expected {expected}, found {found}"
+            )
+        if mismatches:
+            raise CommandError(f"Rollup diverges from Expense in {len(mismatches)} row(s).")
+        self.stdout.write(self.style.SUCCESS("Rollup matches the live aggregate."))
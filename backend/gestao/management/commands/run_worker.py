@@ -0,0 +1,45 @@
+import signal
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from gestao.jobs import POOLS, Worker
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs queued gestao background jobs (see gestao.jobs) on a thread or process "
+        "pool until stopped (SIGINT/SIGTERM finish the jobs in progress first)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int,
+                            default=getattr(settings, 'GESTAO_WORKER_CONCURRENCY', 4),
+                            help="Jobs run at the same time (default GESTAO_WORKER_CONCURRENCY).")
+        parser.add_argument('--pool', choices=POOLS, default='thread',
+                            help="Run jobs on threads (default) or on separate processes.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds between queue checks when idle.")
+        parser.add_argument('--burst', action='store_true',
+                            help="Exit once no queued job is due instead of waiting for more.")
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            concurrency=options['concurrency'],
+            pool=options['pool'],
+            poll_interval=options['poll_interval'],
+        )
+        previous = {
+            signum: signal.signal(signum, lambda *args: worker.stop())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+
+        self.stdout.write(
+            f"Worker {worker.name}: {worker.concurrency} {worker.pool}(s), polling every {worker.poll_interval}s."
+        )
+        try:
+            processed = worker.run(burst=options['burst'])
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        self.stdout.write(f"Worker {worker.name} stopped after {processed} job(s).")
@@ -0,0 +1,90 @@
+"""
+In-process request metrics aggregated per view, fed by
+gestao.middleware.RequestMetricsMiddleware and read by the /api/_metrics/
+endpoint. Each worker process keeps its own numbers.
+"""
+import bisect
+import threading
+
+# Upper bounds (ms) of the latency histogram buckets; the last one is open.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+
+
+class ViewStats:
+    """
+    Latency histogram plus query/DB-time totals for one view.
+    """
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.queries = 0
+        self.db_ms = 0.0
+        self.slowest_sql = None
+        self.slowest_sql_ms = 0.0
+
+    def add(self, record):
+        self.buckets[bisect.bisect_left(BUCKETS_MS, record['total_ms'])] += 1
+        self.count += 1
+        self.total_ms += record['total_ms']
+        self.max_ms = max(self.max_ms, record['total_ms'])
+        self.queries += record['queries']
+        self.db_ms += record['db_ms']
+        if record['slowest_sql_ms'] > self.slowest_sql_ms:
+            self.slowest_sql_ms = record['slowest_sql_ms']
+            self.slowest_sql = record['slowest_sql']
+
+    def percentile(self, fraction):
+        """
+        Upper bound of the bucket holding the given percentile.
+        """
+        target = fraction * self.count
+        seen = 0
+        for bound, hits in zip(BUCKETS_MS, self.buckets):
+            seen += hits
+            if seen >= target and hits:
+                return self.max_ms if bound == float('inf') else bound
+        return 0
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'avg_ms': round(self.total_ms / self.count, 3),
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'max_ms': round(self.max_ms, 3),
+            'avg_queries': round(self.queries / self.count, 2),
+            'avg_db_ms': round(self.db_ms / self.count, 3),
+            'slowest_sql': self.slowest_sql,
+            'slowest_sql_ms': round(self.slowest_sql_ms, 3),
+            'buckets': {
+                ('+Inf' if bound == float('inf') else str(bound)): hits
+                for bound, hits in zip(BUCKETS_MS, self.buckets)
+            },
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view_name, record):
+        with self._lock:
+            stats = self._views.get(view_name)
+            if stats is None:
+                stats = self._views[view_name] = ViewStats()
+            stats.add(record)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in sorted(self._views.items())}
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,186 @@
+import time
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+from .metrics import registry
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class QueryTimer:
+    """
+    connection.execute_wrapper hook that counts statements and keeps the
+    total and slowest execution time. Works with DEBUG off.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.total += elapsed
+            if elapsed > self.slowest:
+                self.slowest = elapsed
+                self.slowest_sql = sql
+
+
+class RequestMetricsMiddleware:
+    """
+    Opt-in (settings.GESTAO_REQUEST_METRICS) per-request instrumentation:
+    wall time, SQL count, DB time and slowest statement, exposed as a
+    Server-Timing header and aggregated per view in gestao.metrics.
+
+    DB work done while a streaming response is being consumed happens after
+    the headers are sent and is not included.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'GESTAO_REQUEST_METRICS', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - start) * 1000
+        db_ms = timer.total * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name or match._func_path) if match else 'unresolved'
+        registry.record(view_name, {
+            'total_ms': total_ms,
+            'queries': timer.count,
+            'db_ms': db_ms,
+            'slowest_sql': timer.slowest_sql,
+            'slowest_sql_ms': timer.slowest * 1000,
+        })
+
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.2f};desc="{timer.count} queries"',
+            f'app;dur={total_ms - db_ms:.2f}',
+            f'total;dur={total_ms:.2f}',
+        ])
+        return response
+
+
+def accepted_encodings(header):
+    """
+    Returns the content codings an Accept-Encoding header allows (q > 0).
+    """
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses of at least GESTAO_COMPRESSION_MIN_SIZE bytes
+    (streamed ones always) with brotli when the client accepts it and the
+    brotli package is installed, with gzip otherwise. Responses that are
+    already encoded, or that would not shrink, are left alone.
+
+    HTML (the admin) only ever gets Django's gzip, whose random padding
+    masks the CSRF token and reflected search terms from BREACH; brotli is
+    for the API's JSON, CSV and MessagePack bodies. Streamed bodies are
+    flushed after every chunk, so a client reading the bulk import's NDJSON
+    progress still sees each row as soon as it is written.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'GESTAO_COMPRESSION_MIN_SIZE', 1024)
+        self.brotli_quality = getattr(settings, 'GESTAO_BROTLI_QUALITY', 5)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        if response.has_header('Content-Encoding') or response.get('Content-Type', '').startswith('text/html'):
+            return super().process_response(request, response)
+        encodings = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in encodings:
+            coding = 'br'
+        elif response.streaming and 'gzip' in encodings:
+            coding = 'gzip'
+        else:
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self._astream(response.streaming_content, coding)
+            else:
+                response.streaming_content = self._stream(response.streaming_content, coding)
+            del response.headers['Content-Length']
+        else:
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Mesma regra do GZipMiddleware: o corpo mudou, a ETag passa a ser fraca
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = coding
+        return response
+
+    def _compressor(self, coding):
+        """
+        Returns (process, finish) for a stream: process() compresses a chunk
+        and flushes it, finish() ends the stream.
+        """
+        if coding == 'br':
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return (lambda chunk: compressor.process(chunk) + compressor.flush()), compressor.finish
+        # wbits=31: formato gzip (cabeçalho e CRC), não zlib puro
+        compressor = zlib.compressobj(wbits=31)
+        return (lambda chunk: compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)), compressor.flush
+
+    def _stream(self, chunks, coding):
+        process, finish = self._compressor(coding)
+        for chunk in chunks:
+            data = process(chunk)
+            if data:
+                yield data
+        yield finish()
+
+    async def _astream(self, chunks, coding):
+        process, finish = self._compressor(coding)
+        async for chunk in chunks:
+            data = process(chunk)
+            if data:
+                yield data
+        yield finish()
@@ -0,0 +1,52 @@
+# Generated by Django 5.2 on 2026-10-18 18:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_rollup(apps, schema_editor):
+    Expense = apps.get_model('gestao', 'Expense')
+    ExpenseMonthlyRollup = apps.get_model('gestao', 'ExpenseMonthlyRollup')
+    totals = Expense.objects \
+        .annotate(month=TruncMonth('date')) \
+        .values('month', 'category_id') \
+        .annotate(total=Sum('amount'), count=Count('id')) \
+        .order_by()
+    ExpenseMonthlyRollup.objects.bulk_create(
+        ExpenseMonthlyRollup(
+            month=item['month'],
+            category_id=item['category_id'],
+            total=item['total'],
+            count=item['count'],
+        )
+        for item in totals
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0002_category_expense_category'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='Primeiro dia do mês agregado')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('category', models.ForeignKey(blank=True, help_text='Categoria agregada (nulo = Sem Categoria)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='gestao.category')),
+            ],
+            options={
+                'verbose_name': 'Expense monthly rollup',
+                'verbose_name_plural': 'Expense monthly rollups',
+                'ordering': ['month'],
+                'constraints': [models.UniqueConstraint(fields=('month', 'category'), name='gestao_rollup_month_category_uniq'), models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('month',), name='gestao_rollup_month_uncategorized_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0003_expensemonthlyrollup'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='expense',
+            options={'ordering': ['-date', '-id'], 'verbose_name': 'Expense', 'verbose_name_plural': 'Expenses'},
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['-date', '-id'], name='gestao_exp_date_id_desc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['category', 'date'], name='gestao_exp_category_date_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2 on 2026-10-18 18:25
+
+from django.db import migrations, models
+
+# Django renders description__icontains on Postgres as
+# UPPER("description"::text) LIKE UPPER(%s); indexing that same expression
+# with gin_trgm_ops lets substring searches use the index.
+TRIGRAM_INDEX = 'gestao_exp_desc_trgm_idx'
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON gestao_expense '
+        'USING gin ((UPPER("description"::text)) gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0004_expense_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['amount'], name='gestao_exp_amount_idx'),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 5.2 on 2026-10-18 18:41
+
+from django.db import migrations, models
+
+# Postgres hands out change numbers from a sequence (no row lock shared by
+# all writers); other databases use the single ChangeCounter row.
+CHANGE_SEQUENCE = 'gestao_change_seq'
+
+
+def create_change_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'CREATE SEQUENCE IF NOT EXISTS {CHANGE_SEQUENCE}')
+    else:
+        apps.get_model('gestao', 'ChangeCounter').objects.using(
+            schema_editor.connection.alias
+        ).get_or_create(pk=1)
+
+
+def drop_change_sequence(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP SEQUENCE IF EXISTS {CHANGE_SEQUENCE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0005_expense_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(choices=[('expense', 'Expense'), ('category', 'Category')], max_length=20)),
+                ('object_id', models.BigIntegerField(help_text='Id do registro removido')),
+                ('change_seq', models.BigIntegerField(help_text='Posição da remoção no feed de sincronização')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['change_seq', 'id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Posição da última alteração no feed de sincronização (gestao.sync)'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Última alteração'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Posição da última alteração no feed de sincronização (gestao.sync)'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Última alteração'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['change_seq', 'id'], name='gestao_cat_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['change_seq', 'id'], name='gestao_exp_change_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['change_seq', 'id'], name='gestao_tombstone_seq_idx'),
+        ),
+        migrations.RunPython(create_change_sequence, drop_change_sequence),
+    ]
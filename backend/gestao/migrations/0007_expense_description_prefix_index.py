@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-18 19:02
+
+from django.db import migrations
+
+# description__istartswith (the admin's prefix search) is rendered as
+# UPPER("description"::text) LIKE UPPER(%s) on Postgres and as
+# "description" LIKE %s ESCAPE '\' on SQLite, whose LIKE ignores case; each
+# database gets the index its own expression can use.
+PREFIX_INDEX = 'gestao_exp_desc_prefix_idx'
+
+
+def create_prefix_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {PREFIX_INDEX} ON gestao_expense '
+            '((UPPER("description"::text)) text_pattern_ops)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {PREFIX_INDEX} ON gestao_expense (description COLLATE NOCASE)'
+        )
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {PREFIX_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0006_sync_change_sequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0008_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='monthly_budget',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Orçamento mensal da categoria (vazio = sem orçamento)', max_digits=12, null=True),
+        ),
+    ]
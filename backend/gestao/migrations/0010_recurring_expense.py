@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 20:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0009_category_monthly_budget'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecurringExpense',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(help_text='Descrição das despesas geradas', max_length=255)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Valor de cada ocorrência', max_digits=10)),
+                ('cadence', models.CharField(choices=[('monthly', 'Mensal'), ('bimonthly', 'Bimestral'), ('quarterly', 'Trimestral'), ('semiannual', 'Semestral'), ('yearly', 'Anual')], default='monthly', max_length=20)),
+                ('start_date', models.DateField(help_text='Primeira ocorrência; o dia do mês se repete (ou o último dia, em meses mais curtos)')),
+                ('end_date', models.DateField(blank=True, help_text='Nenhuma ocorrência depois desta data', null=True)),
+                ('generated_through', models.DateField(editable=False, help_text='Ocorrências até esta data já foram geradas', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('category', models.ForeignKey(blank=True, help_text='Categoria das despesas geradas', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurring_expenses', to='gestao.category')),
+            ],
+            options={
+                'verbose_name': 'Recurring expense',
+                'verbose_name_plural': 'Recurring expenses',
+                'ordering': ['description', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RecurringExpenseOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(help_text='Primeiro dia do mês da ocorrência')),
+                ('expense_id', models.BigIntegerField(help_text='Id da despesa gerada')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='gestao.recurringexpense')),
+            ],
+            options={
+                'ordering': ['template', 'period'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='recurringexpense',
+            constraint=models.CheckConstraint(condition=models.Q(('end_date__isnull', True), ('end_date__gte', models.F('start_date')), _connector='OR'), name='gestao_recurring_end_after_start', violation_error_message='A data final não pode ser anterior à inicial.'),
+        ),
+        migrations.AddConstraint(
+            model_name='recurringexpenseoccurrence',
+            constraint=models.UniqueConstraint(fields=('template', 'period'), name='gestao_recurring_period_uniq'),
+        ),
+    ]
@@ -0,0 +1,184 @@
+# Generated by Django 5.2 on 2026-10-18 20:30
+
+import importlib
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Modelos que passam a pertencer a um condomínio
+TENANT_MODELS = ('category', 'expense', 'expensemonthlyrollup', 'recurringexpense', 'tombstone')
+
+
+def assign_existing_rows(apps, schema_editor):
+    """
+    A database from before tenancy held a single building: its rows (and
+    its users, so they keep their access) go to one condominium.
+    """
+    using = schema_editor.connection.alias
+    if schema_editor.connection.vendor == 'postgresql':
+        # As FKs novas são DEFERRABLE: checadas já, os UPDATEs abaixo não deixam
+        # eventos pendentes que impediriam os ALTER TABLE ... SET NOT NULL seguintes
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+    models_with_rows = [
+        apps.get_model('gestao', name) for name in TENANT_MODELS
+        if apps.get_model('gestao', name).objects.using(using).exists()
+    ]
+    if not models_with_rows:
+        return
+    Condominium = apps.get_model('gestao', 'Condominium')
+    condominium = Condominium.objects.using(using).create(name="Condomínio", slug='condominio')
+    for model in models_with_rows:
+        model.objects.using(using).update(condominium=condominium)
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    condominium.members.set(User.objects.using(using).all())
+
+
+def recreate_prefix_index(apps, schema_editor):
+    # O SQLite recria a tabela de despesas ao mudar colunas, e o índice bruto da
+    # 0007 (fora do Meta.indexes) some junto; recria com a mesma função.
+    prefix_index = importlib.import_module('gestao.migrations.0007_expense_description_prefix_index')
+    prefix_index.create_prefix_index(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0010_recurring_expense'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Condominium',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Nome do condomínio', max_length=150)),
+                ('slug', models.SlugField(help_text='Identificador usado no cabeçalho X-Condominium', max_length=60, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Condomínio',
+                'verbose_name_plural': 'Condomínios',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RemoveConstraint(
+            model_name='expensemonthlyrollup',
+            name='gestao_rollup_month_category_uniq',
+        ),
+        migrations.RemoveConstraint(
+            model_name='expensemonthlyrollup',
+            name='gestao_rollup_month_uncategorized_uniq',
+        ),
+        migrations.RemoveIndex(
+            model_name='category',
+            name='gestao_cat_change_seq_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='gestao_exp_amount_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='expense',
+            name='gestao_exp_change_seq_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='tombstone',
+            name='gestao_tombstone_seq_idx',
+        ),
+        migrations.AlterField(
+            model_name='category',
+            name='name',
+            field=models.CharField(help_text='Nome da categoria (ex: Limpeza, Manutenção, Salários); único por condomínio', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='condominium',
+            name='members',
+            field=models.ManyToManyField(blank=True, help_text='Usuários com acesso aos dados do condomínio', related_name='condominiums', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='condominium',
+            field=models.ForeignKey(db_index=False, help_text='Condomínio dono da categoria', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='categories', to='gestao.condominium'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='condominium',
+            field=models.ForeignKey(db_index=False, help_text='Condomínio da despesa', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='expenses', to='gestao.condominium'),
+        ),
+        migrations.AddField(
+            model_name='expensemonthlyrollup',
+            name='condominium',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='gestao.condominium'),
+        ),
+        migrations.AddField(
+            model_name='recurringexpense',
+            name='condominium',
+            field=models.ForeignKey(help_text='Condomínio das despesas geradas', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='recurring_expenses', to='gestao.condominium'),
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='condominium',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='gestao.condominium'),
+        ),
+        migrations.RunPython(assign_existing_rows, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='category',
+            name='condominium',
+            field=models.ForeignKey(db_index=False, help_text='Condomínio dono da categoria', on_delete=django.db.models.deletion.PROTECT, related_name='categories', to='gestao.condominium'),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='condominium',
+            field=models.ForeignKey(db_index=False, help_text='Condomínio da despesa', on_delete=django.db.models.deletion.PROTECT, related_name='expenses', to='gestao.condominium'),
+        ),
+        migrations.AlterField(
+            model_name='expensemonthlyrollup',
+            name='condominium',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='gestao.condominium'),
+        ),
+        migrations.AlterField(
+            model_name='recurringexpense',
+            name='condominium',
+            field=models.ForeignKey(help_text='Condomínio das despesas geradas', on_delete=django.db.models.deletion.PROTECT, related_name='recurring_expenses', to='gestao.condominium'),
+        ),
+        migrations.AlterField(
+            model_name='tombstone',
+            name='condominium',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tombstones', to='gestao.condominium'),
+        ),
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(fields=['condominium', 'change_seq', 'id'], name='gestao_cat_condo_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['condominium', '-date', '-id'], name='gestao_exp_condo_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['condominium', 'amount'], name='gestao_exp_condo_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['condominium', 'change_seq', 'id'], name='gestao_exp_condo_seq_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['condominium', 'change_seq', 'id'], name='gestao_tomb_condo_seq_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='category',
+            constraint=models.UniqueConstraint(fields=('condominium', 'name'), name='gestao_cat_condo_name_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='expensemonthlyrollup',
+            constraint=models.UniqueConstraint(fields=('condominium', 'month', 'category'), name='gestao_rollup_condo_month_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='expensemonthlyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('condominium', 'month'), name='gestao_rollup_condo_uncat_uniq'),
+        ),
+        migrations.RunPython(recreate_prefix_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 20:55
+
+import importlib
+
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def fill_fingerprints(apps, schema_editor):
+    from gestao.fingerprints import compute
+
+    Expense = apps.get_model('gestao', 'Expense')
+    expenses = Expense.objects.using(schema_editor.connection.alias).order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(expenses.filter(pk__gt=last_pk).only('pk', 'description', 'amount', 'date')[:BATCH_SIZE])
+        if not batch:
+            return
+        last_pk = batch[-1].pk
+        for expense in batch:
+            expense.fingerprint = compute(expense.description, expense.amount, expense.date)
+        Expense.objects.using(schema_editor.connection.alias).bulk_update(batch, ['fingerprint'])
+
+
+def recreate_prefix_index(apps, schema_editor):
+    # Mesmo caso da 0011: a tabela pode ter sido recriada pelo SQLite
+    prefix_index = importlib.import_module('gestao.migrations.0007_expense_description_prefix_index')
+    prefix_index.create_prefix_index(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestao', '0011_condominium_tenancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='fingerprint',
+            field=models.CharField(default='', editable=False, help_text='Descrição normalizada + valor + semana, para achar lançamentos em dobro (gestao.fingerprints)', max_length=32),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['condominium', 'fingerprint'], name='gestao_exp_condo_fprint_idx'),
+        ),
+        migrations.RunPython(recreate_prefix_index, migrations.RunPython.noop),
+    ]
@@ -1,16 +1,89 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 
+
+class CondominiumQuerySet(models.QuerySet):
+    def for_condominium(self, condominium):
+        """
+        Rows of one condominium (instance or id); the tenant-leading
+        indexes all start with this column.
+        """
+        return self.filter(condominium=condominium)
+
+
+def validate_same_condominium(instance):
+    """
+    Model.clean() check (admin forms): the category of `instance` must
+    belong to its condominium.
+    """
+    if instance.category_id is not None and instance.condominium_id is not None \
+            and instance.category.condominium_id != instance.condominium_id:
+        raise ValidationError({'category': "A categoria pertence a outro condomínio."})
+
+
+class Condominium(models.Model):
+    """
+    A building managed in this database: the tenant every expense, category
+    and rollup row belongs to (see gestao.tenancy).
+    """
+    name = models.CharField(max_length=150, help_text="Nome do condomínio")
+    slug = models.SlugField(
+        max_length=60,
+        unique=True,
+        help_text="Identificador usado no cabeçalho X-Condominium"
+    )
+    members = models.ManyToManyField(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        related_name='condominiums',
+        help_text="Usuários com acesso aos dados do condomínio"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Condomínio"
+        verbose_name_plural = "Condomínios"
+
+
 class Category(models.Model):
     """
     Represents a expense category.
     """
+    condominium = models.ForeignKey(
+        Condominium,
+        on_delete=models.PROTECT,
+        related_name='categories',
+        # Coberta pela restrição única (condominium, name)
+        db_index=False,
+        help_text="Condomínio dono da categoria"
+    )
     name = models.CharField(
         max_length=100,
-        unique=True,
-        help_text="Nome da categoria (ex: Limpeza, Manutenção, Salários)"
+        help_text="Nome da categoria (ex: Limpeza, Manutenção, Salários); único por condomínio"
+    )
+    monthly_budget = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Orçamento mensal da categoria (vazio = sem orçamento)"
+    )
+    updated_at = models.DateTimeField(auto_now=True, help_text="Última alteração")
+    change_seq = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Posição da última alteração no feed de sincronização (gestao.sync)"
     )
-    
+
+    objects = CondominiumQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -18,11 +91,26 @@ class Category(models.Model):
         verbose_name = "Categoria"
         verbose_name_plural = "Categorias"
         ordering = ['name']
+        constraints = [
+            models.UniqueConstraint(fields=['condominium', 'name'], name='gestao_cat_condo_name_uniq'),
+        ]
+        indexes = [
+            # Serves the /api/sync/ feed of one condominium (change_seq, id).
+            models.Index(fields=['condominium', 'change_seq', 'id'], name='gestao_cat_condo_seq_idx'),
+        ]
 
 class Expense(models.Model):
     """
     Represents an expense recorded for the condominium.
     """
+    condominium = models.ForeignKey(
+        Condominium,
+        on_delete=models.PROTECT,
+        related_name='expenses',
+        # Coberta pelos índices compostos que começam pelo condomínio
+        db_index=False,
+        help_text="Condomínio da despesa"
+    )
     description = models.CharField(max_length=255, help_text="Description of the expense")
     amount = models.DecimalField(
         max_digits=10,
@@ -41,13 +129,274 @@ class Expense(models.Model):
         related_name='expenses',
         help_text="Categoria da despesa"
     )
+    updated_at = models.DateTimeField(auto_now=True, help_text="Última alteração")
+    change_seq = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Posição da última alteração no feed de sincronização (gestao.sync)"
+    )
+    fingerprint = models.CharField(
+        max_length=32,
+        default='',
+        editable=False,
+        help_text="Descrição normalizada + valor + semana, para achar lançamentos em dobro (gestao.fingerprints)"
+    )
+
+    objects = CondominiumQuerySet.as_manager()
 
     def __str__(self):
         formatted_amount = f"{self.amount:.2f}"
         category_str = f" ({self.category.name})" if self.category else ""
         return f"{self.description}{category_str} ({formatted_amount}) - {self.date.strftime('%Y-%m-%d')}"
 
+    def clean(self):
+        validate_same_condominium(self)
+
     class Meta:
-        ordering = ['-date']
+        ordering = ['-date', '-id']
         verbose_name = "Expense"
         verbose_name_plural = "Expenses"
+        indexes = [
+            # Serves the keyset pagination of one condominium's expense list (date, id).
+            models.Index(fields=['condominium', '-date', '-id'], name='gestao_exp_condo_date_id_idx'),
+            # Same order across condominiums, for the admin changelist.
+            models.Index(fields=['-date', '-id'], name='gestao_exp_date_id_desc_idx'),
+            # A category belongs to one condominium, so it already narrows to the tenant.
+            models.Index(fields=['category', 'date'], name='gestao_exp_category_date_idx'),
+            models.Index(fields=['condominium', 'amount'], name='gestao_exp_condo_amount_idx'),
+            # Serves the /api/sync/ feed of one condominium (change_seq, id).
+            models.Index(fields=['condominium', 'change_seq', 'id'], name='gestao_exp_condo_seq_idx'),
+            # Duplicate checks on create and the duplicate report (gestao.fingerprints).
+            models.Index(fields=['condominium', 'fingerprint'], name='gestao_exp_condo_fprint_idx'),
+            # On Postgres, migration 0005 also adds a trigram index for description search.
+            # The table may also be partitioned by year there (gestao.partitioning).
+            # Migration 0007 (any database) adds the prefix index used by the admin search.
+        ]
+
+class ExpenseMonthlyRollup(models.Model):
+    """
+    Materialized month x category totals, kept in sync with Expense by
+    gestao.rollups so the summary endpoint never scans the whole ledger.
+    """
+    condominium = models.ForeignKey(
+        Condominium, on_delete=models.CASCADE, related_name='monthly_rollups', db_index=False
+    )
+    month = models.DateField(help_text="Primeiro dia do mês agregado")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='monthly_rollups',
+        help_text="Categoria agregada (nulo = Sem Categoria)"
+    )
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    objects = CondominiumQuerySet.as_manager()
+
+    def __str__(self):
+        category_str = self.category.name if self.category else "Sem Categoria"
+        return f"{self.month.strftime('%Y-%m')} - {category_str}: {self.total:.2f} ({self.count})"
+
+    class Meta:
+        ordering = ['month']
+        verbose_name = "Expense monthly rollup"
+        verbose_name_plural = "Expense monthly rollups"
+        constraints = [
+            # Also the index of the summary's (condominium, month range) reads.
+            models.UniqueConstraint(
+                fields=['condominium', 'month', 'category'],
+                name='gestao_rollup_condo_month_uniq'
+            ),
+            # NULLs never collide in a plain unique index, so the
+            # "Sem Categoria" bucket needs its own partial constraint.
+            models.UniqueConstraint(
+                fields=['condominium', 'month'],
+                condition=models.Q(category__isnull=True),
+                name='gestao_rollup_condo_uncat_uniq'
+            ),
+        ]
+
+
+class Tombstone(models.Model):
+    """
+    Marks a deleted expense or category so that the sync feed can tell
+    clients to drop it.
+    """
+    EXPENSE = 'expense'
+    CATEGORY = 'category'
+    MODEL_CHOICES = [
+        (EXPENSE, 'Expense'),
+        (CATEGORY, 'Category'),
+    ]
+
+    condominium = models.ForeignKey(
+        Condominium, on_delete=models.CASCADE, related_name='tombstones', db_index=False
+    )
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField(help_text="Id do registro removido")
+    change_seq = models.BigIntegerField(help_text="Posição da remoção no feed de sincronização")
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = CondominiumQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.model} {self.object_id} removed at #{self.change_seq}"
+
+    class Meta:
+        ordering = ['change_seq', 'id']
+        indexes = [
+            models.Index(fields=['condominium', 'change_seq', 'id'], name='gestao_tomb_condo_seq_idx'),
+        ]
+
+
+class ChangeCounter(models.Model):
+    """
+    Single-row counter behind the change sequence on databases without
+    sequences (SQLite); Postgres uses the gestao_change_seq sequence.
+    """
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return str(self.value)
+
+
+class Job(models.Model):
+    """
+    A background job in the database-backed queue (gestao.jobs), run by
+    `manage.py run_worker`.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100, help_text="Nome da tarefa registrada em gestao.jobs")
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now, help_text="Não executa antes deste momento (novas tentativas)")
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    locked_by = models.CharField(max_length=100, blank=True, help_text="Worker que está executando o job")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='gestao_jobs',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # Serves the worker's claim query (next queued job due to run).
+            models.Index(fields=['status', 'run_after', 'id'], name='gestao_job_claim_idx'),
+        ]
+
+
+class RecurringExpense(models.Model):
+    """
+    Template of an expense that repeats on a fixed cadence (salaries,
+    cleaning and maintenance contracts), materialized into Expense rows by
+    gestao.recurring.
+    """
+    MONTHLY = 'monthly'
+    BIMONTHLY = 'bimonthly'
+    QUARTERLY = 'quarterly'
+    SEMIANNUAL = 'semiannual'
+    YEARLY = 'yearly'
+    CADENCE_CHOICES = [
+        (MONTHLY, 'Mensal'),
+        (BIMONTHLY, 'Bimestral'),
+        (QUARTERLY, 'Trimestral'),
+        (SEMIANNUAL, 'Semestral'),
+        (YEARLY, 'Anual'),
+    ]
+    CADENCE_MONTHS = {MONTHLY: 1, BIMONTHLY: 2, QUARTERLY: 3, SEMIANNUAL: 6, YEARLY: 12}
+
+    condominium = models.ForeignKey(
+        Condominium,
+        on_delete=models.PROTECT,
+        related_name='recurring_expenses',
+        help_text="Condomínio das despesas geradas"
+    )
+    description = models.CharField(max_length=255, help_text="Descrição das despesas geradas")
+    amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Valor de cada ocorrência")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='recurring_expenses',
+        help_text="Categoria das despesas geradas"
+    )
+    cadence = models.CharField(max_length=20, choices=CADENCE_CHOICES, default=MONTHLY)
+    start_date = models.DateField(
+        help_text="Primeira ocorrência; o dia do mês se repete (ou o último dia, em meses mais curtos)"
+    )
+    end_date = models.DateField(null=True, blank=True, help_text="Nenhuma ocorrência depois desta data")
+    generated_through = models.DateField(
+        null=True,
+        editable=False,
+        help_text="Ocorrências até esta data já foram geradas"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = CondominiumQuerySet.as_manager()
+
+    def __str__(self):
+        return f"{self.description} ({self.amount:.2f}, {self.get_cadence_display().lower()})"
+
+    def clean(self):
+        validate_same_condominium(self)
+
+    class Meta:
+        ordering = ['description', 'id']
+        verbose_name = "Recurring expense"
+        verbose_name_plural = "Recurring expenses"
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_date__isnull=True) | models.Q(end_date__gte=models.F('start_date')),
+                name='gestao_recurring_end_after_start',
+                violation_error_message="A data final não pode ser anterior à inicial.",
+            ),
+        ]
+
+
+class RecurringExpenseOccurrence(models.Model):
+    """
+    One materialized period of a RecurringExpense. The unique (template,
+    period) pair is what keeps the generator from creating an occurrence
+    twice.
+    """
+    template = models.ForeignKey(RecurringExpense, on_delete=models.CASCADE, related_name='occurrences')
+    period = models.DateField(help_text="Primeiro dia do mês da ocorrência")
+    # Sem FK: a tabela de despesas pode ser particionada (chave (id, date)) e
+    # as remoções em lote apagam direto no SQL.
+    expense_id = models.BigIntegerField(help_text="Id da despesa gerada")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.template_id} {self.period.strftime('%Y-%m')} -> expense {self.expense_id}"
+
+    class Meta:
+        ordering = ['template', 'period']
+        constraints = [
+            models.UniqueConstraint(fields=['template', 'period'], name='gestao_recurring_period_uniq'),
+        ]
@@ -0,0 +1,169 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor_token(position, reverse=False):
+    """
+    Encodes the ordering values of a boundary row as an opaque cursor.
+    """
+    payload = {'p': position}
+    if reverse:
+        payload['r'] = 1
+    return base64.urlsafe_b64encode(
+        json.dumps(payload, separators=(',', ':')).encode('ascii')
+    ).decode('ascii')
+
+
+def cursor_position(obj, fields):
+    """
+    Returns the JSON-friendly ordering values of obj (a model instance or a
+    .values() row) for a cursor.
+    """
+    position = []
+    for name in fields:
+        value = obj[name] if isinstance(obj, dict) else getattr(obj, name)
+        position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+    return position
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a unique ordering.
+
+    The cursor stores the ordering values of the row at the page boundary,
+    so every page is a `WHERE (date, id) < (...) ORDER BY date DESC, id DESC
+    LIMIT n` range read on the matching index: deep pages cost the same as
+    the first one and inserted rows never shift pages already handed out.
+    """
+    ordering = ('-date', '-id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self.descending = self.ordering[0].startswith('-')
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            cursor['position'] = self._clean_position(queryset.model, cursor['position'])
+        reverse = cursor is not None and cursor['reverse']
+        queryset = queryset.order_by(*self._ordering(reverse))
+        if cursor is not None:
+            queryset = queryset.filter(self._seek_filter(cursor['position'], reverse))
+
+        # Fetch one extra row to learn whether there is a page beyond this one.
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = cursor is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                value = int(request.query_params[self.page_size_query_param])
+                if value > 0:
+                    return min(value, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = payload['p']
+            if not isinstance(position, list) or len(position) != len(self.fields):
+                raise ValueError
+            return {'position': position, 'reverse': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position, reverse):
+        encoded = encode_cursor_token(position, reverse)
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _ordering(self, reverse):
+        descending = self.descending != reverse
+        return [f"-{name}" if descending else name for name in self.fields]
+
+    def _position(self, obj):
+        return cursor_position(obj, self.fields)
+
+    def _clean_position(self, model, position):
+        # Cursores forjados: null ou valores de outro tipo viram 404, não 500
+        if any(value is None for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            return [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, position)
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _seek_filter(self, position, reverse):
+        """
+        Builds the lexicographic "row comes after the cursor" condition,
+        e.g. date < d OR (date = d AND id < i) for a descending order.
+        """
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.fields, position):
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
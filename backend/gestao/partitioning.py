@@ -0,0 +1,229 @@
+"""
+Optional yearly range partitioning of the expense table on PostgreSQL.
+
+`manage.py partition_expenses --convert` rebuilds gestao_expense as a
+table partitioned by RANGE (date), with one partition per year and a
+DEFAULT partition for anything outside them, so date-bounded queries (the
+dashboard windows, the home page's two months) only touch the partitions
+of the years they ask for. The ORM is unaffected: the primary key becomes
+(id, date), since Postgres requires the partition key in it, and ids keep
+counting from where they were.
+
+Future partitions are created after every `migrate` (see GestaoConfig) and
+by `manage.py partition_expenses`, up to GESTAO_EXPENSE_PARTITION_YEARS_AHEAD
+years ahead. On other databases the table stays a plain table.
+"""
+import datetime
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, NotSupportedError, connections, transaction
+
+from .models import Expense
+
+TABLE = Expense._meta.db_table
+LEGACY_TABLE = f'{TABLE}_legacy'
+DEFAULT_PARTITION = f'{TABLE}_default'
+
+
+def partition_name(year):
+    return f'{TABLE}_y{year}'
+
+
+def partition_bounds(year):
+    """
+    Half-open [1 Jan year, 1 Jan year + 1) range of a yearly partition.
+    """
+    return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+
+
+def years_ahead():
+    return getattr(settings, 'GESTAO_EXPENSE_PARTITION_YEARS_AHEAD', 2)
+
+
+def is_supported(using=DEFAULT_DB_ALIAS):
+    return connections[using].vendor == 'postgresql'
+
+
+def is_partitioned(using=DEFAULT_DB_ALIAS):
+    if not is_supported(using):
+        return False
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(using=DEFAULT_DB_ALIAS):
+    """
+    Returns (partition name, bound expression) pairs, oldest first.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(%s) '
+            'ORDER BY c.relname',
+            [TABLE],
+        )
+        return cursor.fetchall()
+
+
+def _require_postgres(using):
+    if not is_supported(using):
+        raise NotSupportedError(
+            f"Expense partitioning requires PostgreSQL, not {connections[using].vendor}."
+        )
+
+
+def ensure_partitions(years, using=DEFAULT_DB_ALIAS):
+    """
+    Creates the yearly partitions missing among `years`. Rows already
+    stored for such a year in the DEFAULT partition are moved into it.
+    Returns the names of the partitions created.
+    """
+    _require_postgres(using)
+    existing = {name for name, _ in list_partitions(using)}
+    created = []
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for year in sorted(set(years)):
+            name = partition_name(year)
+            if name in existing:
+                continue
+            lower, upper = partition_bounds(year)
+            stranded = False
+            if DEFAULT_PARTITION in existing:
+                cursor.execute(
+                    f'SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE date >= %s AND date < %s)',
+                    [lower, upper],
+                )
+                stranded = cursor.fetchone()[0]
+            if stranded:
+                # Anexar falharia com linhas do ano na partição DEFAULT: move antes
+                cursor.execute(f'CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+                cursor.execute(
+                    f'WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE date >= %s AND date < %s '
+                    f'RETURNING *) INSERT INTO {name} SELECT * FROM moved',
+                    [lower, upper],
+                )
+                cursor.execute(
+                    f'ALTER TABLE {TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)',
+                    [lower, upper],
+                )
+            else:
+                cursor.execute(
+                    f'CREATE TABLE {name} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)',
+                    [lower, upper],
+                )
+            created.append(name)
+    return created
+
+
+def ensure_future_partitions(using=DEFAULT_DB_ALIAS, today=None):
+    """
+    Creates this year's partition and the next years_ahead() ones when the
+    table is partitioned; a no-op otherwise.
+    """
+    if not is_partitioned(using):
+        return []
+    year = (today or datetime.date.today()).year
+    return ensure_partitions(range(year, year + years_ahead() + 1), using=using)
+
+
+def _rebuild(partitioned, using):
+    # Copia a tabela para uma nova (particionada ou não) preservando ids,
+    # índices e chaves estrangeiras; tudo numa transação só.
+    connection = connections[using]
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f'LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE')
+        cursor.execute(
+            'SELECT 1 FROM pg_constraint WHERE contype = %s AND confrelid = to_regclass(%s)', ['f', TABLE]
+        )
+        if cursor.fetchone():
+            raise NotSupportedError(f"Other tables reference {TABLE}; it cannot be rebuilt in place.")
+        cursor.execute(
+            'SELECT pg_get_indexdef(indexrelid) FROM pg_index '
+            'WHERE indrelid = to_regclass(%s) AND NOT indisprimary',
+            [TABLE],
+        )
+        indexes = [definition for definition, in cursor.fetchall()]
+        cursor.execute(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+            'WHERE conrelid = to_regclass(%s) AND contype = %s',
+            [TABLE, 'f'],
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f'SELECT EXTRACT(YEAR FROM MIN(date))::int FROM {TABLE}')
+        first_year = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {LEGACY_TABLE}')
+        partition_clause = ' PARTITION BY RANGE (date)' if partitioned else ''
+        cursor.execute(
+            f'CREATE TABLE {TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS '
+            f'INCLUDING CONSTRAINTS INCLUDING STORAGE){partition_clause}'
+        )
+        # O default de id aponta para a sequência da tabela antiga, que sai junto com ela
+        cursor.execute(f'ALTER TABLE {TABLE} ALTER COLUMN id DROP DEFAULT')
+        if partitioned:
+            this_year = datetime.date.today().year
+            for year in range(min(first_year or this_year, this_year), this_year + years_ahead() + 1):
+                lower, upper = partition_bounds(year)
+                cursor.execute(
+                    f'CREATE TABLE {partition_name(year)} PARTITION OF {TABLE} '
+                    'FOR VALUES FROM (%s) TO (%s)',
+                    [lower, upper],
+                )
+            cursor.execute(f'CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT')
+        cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {LEGACY_TABLE}')
+        cursor.execute(f'DROP TABLE {LEGACY_TABLE}')
+
+        if partitioned:
+            # Colunas de identidade em tabelas particionadas só existem a partir
+            # do Postgres 17; uma sequência própria (como serial) funciona em todos.
+            cursor.execute(f'CREATE SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id')
+            cursor.execute(f"ALTER TABLE {TABLE} ALTER COLUMN id SET DEFAULT nextval('{TABLE}_id_seq')")
+        else:
+            cursor.execute(f'ALTER TABLE {TABLE} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+
+        primary_key = '(id, date)' if partitioned else '(id)'
+        cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY {primary_key}')
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+        # A sequência nova começa do 1: continua de onde a antiga parou
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}",
+            [TABLE],
+        )
+        cursor.execute(f'ANALYZE {TABLE}')
+
+
+def convert(using=DEFAULT_DB_ALIAS):
+    """
+    Rebuilds the plain expense table as a yearly partitioned one. Holds an
+    exclusive lock on the table while the rows are copied.
+    """
+    _require_postgres(using)
+    if is_partitioned(using):
+        return False
+    _rebuild(True, using)
+    return True
+
+
+def revert(using=DEFAULT_DB_ALIAS):
+    """
+    Rebuilds the partitioned expense table as a plain one.
+    """
+    _require_postgres(using)
+    if not is_partitioned(using):
+        return False
+    _rebuild(False, using)
+    return True
+
+
+def ensure_partitions_after_migrate(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """
+    post_migrate receiver: keeps future partitions in place on every deploy.
+    """
+    if is_supported(using):
+        ensure_future_partitions(using=using)
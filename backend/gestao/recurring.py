@@ -0,0 +1,132 @@
+"""
+Materialization of recurring expense templates (RecurringExpense).
+
+`manage.py generate_recurring_expenses` (or the 'recurring.generate' job)
+creates the Expense rows of every occurrence that fell due since the last
+run, for all templates in one pass: templates are read and locked in
+batches, and each batch's expenses go in with a single bulk_create next to
+one RecurringExpenseOccurrence per (template, period).
+
+Each template's generated_through watermark means a run only looks at the
+periods after it, so re-running is a no-op; the unique (template, period)
+constraint guarantees it even when two runs race. Deleting a generated
+expense does not bring it back.
+"""
+import calendar
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import cache, fingerprints, rollups, sync
+from .models import Expense, RecurringExpense, RecurringExpenseOccurrence
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def add_months(start, months):
+    """
+    The date `months` months after `start`, on the same day of the month or
+    the month's last day when it is shorter.
+    """
+    year, month = divmod(start.month - 1 + months, 12)
+    year += start.year
+    return datetime.date(year, month + 1, min(start.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def occurrence_dates(template, through, after=None):
+    """
+    Dates of `template`'s occurrences up to `through` (and its end date),
+    only those after `after` when given.
+    """
+    step = RecurringExpense.CADENCE_MONTHS[template.cadence]
+    start = template.start_date
+    last = through if template.end_date is None else min(through, template.end_date)
+    months = 0
+    if after is not None and after > start:
+        # Pula direto para a ocorrência do mês de `after`
+        months = ((after.year - start.year) * 12 + after.month - start.month) // step * step
+    dates = []
+    while True:
+        day = add_months(start, months)
+        if day > last:
+            return dates
+        if after is None or day > after:
+            dates.append(day)
+        months += step
+
+
+def generate(through=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Creates the expenses of every occurrence due up to `through` (default
+    today) that was not generated yet. Returns (templates processed,
+    expenses created).
+    """
+    through = through or timezone.localdate()
+    pending = RecurringExpense.objects.filter(start_date__lte=through).filter(
+        Q(generated_through__isnull=True) | Q(generated_through__lt=through)
+    ).order_by('pk')
+    processed = created = 0
+    condominium_ids = set()
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            # Um gerador concorrente espera pelo lote e depois vê o novo generated_through
+            batch = list(pending.filter(pk__gt=last_pk).select_for_update()[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            created += _generate_batch(batch, through, batch_size, condominium_ids)
+        processed += len(batch)
+    for condominium_id in condominium_ids:
+        cache.bump_data_version(condominium_id)
+    return processed, created
+
+
+def _generate_batch(templates, through, batch_size, condominium_ids):
+    due = [
+        (template, day)
+        for template in templates
+        for day in occurrence_dates(template, through, after=template.generated_through)
+    ]
+    if due:
+        # Períodos já gerados podem reaparecer se a data inicial mudou
+        existing = set(RecurringExpenseOccurrence.objects.filter(
+            template_id__in=[template.pk for template in templates],
+            period__gte=min(day for _, day in due).replace(day=1),
+        ).values_list('template_id', 'period'))
+        due = [(template, day) for template, day in due if (template.pk, day.replace(day=1)) not in existing]
+
+    expenses = []
+    occurrences = []
+    for template, day in due:
+        expenses.append(Expense(
+            condominium_id=template.condominium_id,
+            description=template.description,
+            amount=template.amount,
+            date=day,
+            category_id=template.category_id,
+        ))
+        occurrences.append(RecurringExpenseOccurrence(template_id=template.pk, period=day.replace(day=1)))
+
+    if expenses:
+        # bulk_create não dispara os sinais: numera, calcula o fingerprint e soma no rollup aqui
+        sync.stamp(expenses)
+        fingerprints.stamp(expenses)
+        Expense.objects.bulk_create(expenses, batch_size=batch_size)
+        for occurrence, expense in zip(occurrences, expenses):
+            occurrence.expense_id = expense.pk
+        RecurringExpenseOccurrence.objects.bulk_create(occurrences, batch_size=batch_size)
+        totals = defaultdict(lambda: [Decimal('0.00'), 0])
+        for expense in expenses:
+            total = totals[(expense.condominium_id, expense.date.replace(day=1), expense.category_id)]
+            total[0] += expense.amount
+            total[1] += 1
+            condominium_ids.add(expense.condominium_id)
+        rollups.add_totals(totals)
+    RecurringExpense.objects.filter(pk__in=[template.pk for template in templates]) \
+        .update(generated_through=through)
+    return len(expenses)
@@ -0,0 +1,100 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Declares text/csv for content negotiation. Views using it stream their own
+    body; render() only handles non-streamed payloads such as error details.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(data, cls=JSONEncoder, ensure_ascii=False).encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON (one object per line), see CSVRenderer.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return (json.dumps(data, cls=JSONEncoder, ensure_ascii=False) + '\n').encode(self.charset)
+
+
+def to_columnar(rows):
+    """
+    Turns a list of dicts into {'length': n, 'columns': {field: [values]}},
+    naming each field once instead of once per row.
+    """
+    columns = {name: [] for name in (rows[0] if rows else ())}
+    for row in rows:
+        for name, values in columns.items():
+            values.append(row[name])
+    return {'length': len(rows), 'columns': columns}
+
+
+def columnar_payload(data):
+    # Converte a lista de resultados (paginada ou não); o resto passa intacto
+    if isinstance(data, list) and all(isinstance(row, dict) for row in data):
+        return to_columnar(data)
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return {**data, 'results': to_columnar(data['results'])}
+    return data
+
+
+class ColumnarJSONRenderer(JSONRenderer):
+    """
+    JSON with list results laid out column by column (see to_columnar).
+    Opt-in: Accept: application/vnd.domu.columnar+json or ?format=columnar.
+    """
+    media_type = 'application/vnd.domu.columnar+json'
+    format = 'columnar'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(columnar_payload(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack encoding of the regular payload. Opt-in: Accept:
+    application/msgpack or ?format=msgpack; requires the msgpack package.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Decimal, datas e textos preguiçosos viram o mesmo que no JSON
+        return msgpack.packb(data, default=JSONEncoder().default, use_bin_type=True)
+
+
+def get_large_payload_renderers():
+    """
+    Renderers offered by endpoints with large list responses: the default
+    JSON ones first, then the opt-in compact formats available here.
+    """
+    renderers = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
+    if msgpack is not None:
+        renderers.append(MessagePackRenderer)
+    return renderers
@@ -0,0 +1,209 @@
+"""
+Incremental maintenance of ExpenseMonthlyRollup.
+
+Every change to an Expense is reduced to signed (condominium, month,
+category, amount) deltas that are folded into the rollup with a single
+UPDATE ... SET total = total + x. Category renames need no work because the rollup is
+keyed by category id; deleting a category moves its rows to the
+"Sem Categoria" bucket, mirroring the SET_NULL on Expense.category.
+"""
+import datetime
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from .models import Expense, ExpenseMonthlyRollup
+
+
+def month_start(value):
+    """
+    Returns the first day of the month for a date (or datetime) value.
+    """
+    value = Expense._meta.get_field('date').to_python(value)
+    return value.replace(day=1)
+
+
+def apply_delta(condominium_id, month, category_id, total, count):
+    """
+    Adds total/count to the rollup row for (condominium_id, month,
+    category_id), creating it when it does not exist yet.
+    """
+    if not total and not count:
+        return
+    rows = ExpenseMonthlyRollup.objects.filter(
+        condominium_id=condominium_id, month=month, category_id=category_id
+    )
+    with transaction.atomic():
+        updated = rows.update(total=F('total') + total, count=F('count') + count)
+        if updated:
+            return
+        try:
+            with transaction.atomic():
+                ExpenseMonthlyRollup.objects.create(
+                    condominium_id=condominium_id, month=month, category_id=category_id,
+                    total=total, count=count,
+                )
+        except IntegrityError:
+            # A concurrent writer created the row between our UPDATE and INSERT.
+            rows.update(total=F('total') + total, count=F('count') + count)
+
+
+def apply_changes(changes):
+    """
+    Folds an iterable of (condominium_id, date, category_id, amount, sign)
+    tuples into the rollup, issuing one write per distinct (condominium,
+    month, category).
+    """
+    deltas = defaultdict(lambda: [Decimal('0.00'), 0])
+    for condominium_id, date, category_id, amount, sign in changes:
+        delta = deltas[(condominium_id, month_start(date), category_id)]
+        delta[0] += sign * Decimal(amount)
+        delta[1] += sign
+    with transaction.atomic():
+        for (condominium_id, month, category_id), (total, count) in deltas.items():
+            apply_delta(condominium_id, month, category_id, total, count)
+
+
+def add_totals(totals):
+    """
+    Adds {(condominium_id, month, category_id): (total, count)} to the
+    rollup with one INSERT of the missing (empty) rows and one UPDATE per
+    row, instead of apply_delta()'s savepoints, for batch writers that touch
+    many new (month, category) pairs at once.
+    """
+    if not totals:
+        return
+    with transaction.atomic():
+        # Linhas criadas por um escritor concorrente são apenas ignoradas aqui
+        ExpenseMonthlyRollup.objects.bulk_create(
+            [
+                ExpenseMonthlyRollup(condominium_id=condominium_id, month=month, category_id=category_id)
+                for condominium_id, month, category_id in totals
+            ],
+            ignore_conflicts=True,
+        )
+        for (condominium_id, month, category_id), (total, count) in totals.items():
+            ExpenseMonthlyRollup.objects.filter(
+                condominium_id=condominium_id, month=month, category_id=category_id
+            ).update(total=F('total') + total, count=F('count') + count)
+
+
+def apply_totals(totals, sign=1):
+    """
+    Adds (sign=1) or removes (sign=-1) grouped_totals() output.
+    """
+    with transaction.atomic():
+        for (condominium_id, month, category_id), (total, count) in totals.items():
+            apply_delta(condominium_id, month, category_id, sign * total, sign * count)
+
+
+def move_totals(totals, category_id):
+    """
+    Moves grouped_totals() output from its categories to `category_id`,
+    as a bulk recategorization does.
+    """
+    with transaction.atomic():
+        for (condominium_id, month, source_category_id), (total, count) in totals.items():
+            if source_category_id == category_id:
+                continue
+            apply_delta(condominium_id, month, source_category_id, -total, -count)
+            apply_delta(condominium_id, month, category_id, total, count)
+
+
+def record_expense_change(old, new):
+    """
+    Applies the difference between two (condominium_id, date, category_id,
+    amount) snapshots of the same expense. Either side may be None (create / delete).
+    """
+    changes = []
+    if old is not None:
+        changes.append((*old, -1))
+    if new is not None:
+        changes.append((*new, 1))
+    apply_changes(changes)
+
+
+def move_category_to_uncategorized(category_id):
+    """
+    Merges every rollup row of a category into the "Sem Categoria" bucket.
+    """
+    with transaction.atomic():
+        rows = ExpenseMonthlyRollup.objects.select_for_update().filter(category_id=category_id)
+        for row in rows:
+            apply_delta(row.condominium_id, row.month, None, row.total, row.count)
+        rows.delete()
+
+
+def live_totals():
+    """
+    Aggregates the Expense table directly, keyed by (condominium_id, month,
+    category_id).
+    """
+    return grouped_totals(Expense.objects.all())
+
+
+def grouped_totals(queryset):
+    """
+    Aggregates an Expense queryset in the database, keyed by
+    (condominium_id, month, category_id), with (total, count) values.
+    """
+    query = queryset \
+        .annotate(month=TruncMonth('date')) \
+        .values('condominium_id', 'month', 'category_id') \
+        .annotate(total=Sum('amount'), count=Count('id')) \
+        .order_by()
+    result = {}
+    for item in query:
+        month = item['month']
+        if isinstance(month, datetime.datetime):
+            month = month.date()
+        result[(item['condominium_id'], month, item['category_id'])] = (item['total'], item['count'])
+    return result
+
+
+def rollup_totals():
+    """
+    Reads the rollup table, keyed by (condominium_id, month, category_id).
+    Empty rows left behind by deletions are skipped.
+    """
+    query = ExpenseMonthlyRollup.objects.filter(count__gt=0) \
+        .values_list('condominium_id', 'month', 'category_id', 'total', 'count')
+    return {
+        (condominium_id, month, category_id): (total, count)
+        for condominium_id, month, category_id, total, count in query
+    }
+
+
+def rebuild():
+    """
+    Recomputes the whole rollup from the Expense table.
+    Returns the number of rollup rows written.
+    """
+    totals = live_totals()
+    with transaction.atomic():
+        ExpenseMonthlyRollup.objects.all().delete()
+        ExpenseMonthlyRollup.objects.bulk_create(
+            ExpenseMonthlyRollup(
+                condominium_id=condominium_id, month=month, category_id=category_id, total=total, count=count
+            )
+            for (condominium_id, month, category_id), (total, count) in totals.items()
+        )
+    return len(totals)
+
+
+def verify():
+    """
+    Compares the rollup against a live aggregate.
+    Returns a list of (condominium_id, month, category_id, expected, found)
+    mismatches.
+    """
+    expected = live_totals()
+    found = rollup_totals()
+    mismatches = []
+    for key in sorted(set(expected) | set(found), key=lambda k: (k[0], k[1], k[2] or 0)):
+        if expected.get(key) != found.get(key):
+            mismatches.append((*key, expected.get(key), found.get(key)))
+    return mismatches
@@ -1,13 +1,39 @@
+from django.db.models import F
 from rest_framework import serializers
-from .models import Expense, Category
+from . import fingerprints
+from .filters import ExpenseFilterBackend
+from .models import Expense, Category, Condominium, Job
+
+class CondominiumSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Condominium
+        fields = ["id", "name", "slug"]
+
+class CondominiumCategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Category reference limited to the categories of the request's
+    condominium (the serializer context's `condominium`).
+    """
+    def get_queryset(self):
+        return Category.objects.for_condominium(self.context['condominium'])
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
-        fields = ["id", "name"]
+        fields = ["id", "name", "monthly_budget"]
+
+    def validate_name(self, value):
+        # O nome é único por condomínio, não mais na tabela toda
+        categories = Category.objects.for_condominium(self.context['condominium']).filter(name=value)
+        if self.instance is not None:
+            categories = categories.exclude(pk=self.instance.pk)
+        if categories.exists():
+            raise serializers.ValidationError("category with this name already exists.")
+        return value
 
 class ExpenseSerializer(serializers.ModelSerializer):
 
+    category = CondominiumCategoryField(required=False, allow_null=True)
     category_name = serializers.StringRelatedField(source="category", read_only=True)
 
     class Meta:
@@ -18,9 +44,121 @@ class ExpenseSerializer(serializers.ModelSerializer):
             "amount", 
             "date", 
             "category", 
-            "category_name"
+            "category_name",
         ]
 
-        extra_kwargs = {
-            "category": {"required": False, "allow_null": True}
+    def validate(self, attrs):
+        """
+        Looks up likely double entries (same fingerprint in the
+        condominium, see gestao.fingerprints); the write goes through and
+        its response lists them under possible_duplicates.
+        """
+        instance = self.instance
+        fields = {
+            name: attrs[name] if name in attrs else getattr(instance, name, None)
+            for name in ('description', 'amount', 'date')
         }
+        if instance is None:
+            condominium, exclude = self.context['condominium'], None
+        else:
+            condominium, exclude = instance.condominium_id, instance.pk
+        self.possible_duplicates = fingerprints.find_matches(
+            condominium, fingerprints.compute(**fields), exclude=exclude,
+        )
+        return attrs
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Só nas respostas de escrita; a listagem segue igual à ExpenseRowSerializer
+        possible_duplicates = getattr(self, 'possible_duplicates', None)
+        if possible_duplicates is not None:
+            data['possible_duplicates'] = possible_duplicates
+        return data
+
+class ExpenseRowSerializer:
+    """
+    Read-only fast path producing exactly ExpenseSerializer's output from
+    plain .values() rows. The category name comes from the same joined
+    query, and only amount and date need formatting, so there is no
+    per-field to_representation dispatch and no per-row category lookup.
+    """
+    fields = ('id', 'description', 'amount', 'date', 'category')
+
+    @classmethod
+    def rows(cls, queryset):
+        """
+        Narrows an Expense queryset to the joined .values() rows this serializer reads.
+        """
+        return queryset.values(*cls.fields, category_name=F('category__name'))
+
+    @staticmethod
+    def to_representation(row):
+        amount = row['amount']
+        date = row['date']
+        # Mesmo formato dos campos DecimalField/DateField do DRF
+        row['amount'] = None if amount is None else f"{amount:.2f}"
+        row['date'] = None if date is None else date.isoformat()
+        return row
+
+    @classmethod
+    def many(cls, rows):
+        to_representation = cls.to_representation
+        return [to_representation(row) for row in rows]
+
+class ExpenseImportSerializer(serializers.Serializer):
+    """
+    Validates one row of a bulk import. The category is given by name and
+    resolved (or created) by the importer.
+    """
+    description = serializers.CharField(max_length=255)
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+    date = serializers.DateField(required=False, allow_null=True)
+    category = serializers.CharField(max_length=100, required=False, allow_blank=True, allow_null=True)
+
+
+class ExpenseBulkActionSerializer(serializers.Serializer):
+    """
+    Selects the expenses of a bulk action: an explicit id list or a filter
+    object taking the expense list's query parameters (see
+    ExpenseFilterBackend). `dry_run` only reports what would be affected.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), required=False, allow_empty=False, max_length=10000
+    )
+    filter = serializers.DictField(required=False, allow_empty=False)
+    dry_run = serializers.BooleanField(default=False)
+
+    def validate_filter(self, value):
+        unknown = sorted(set(value) - set(ExpenseFilterBackend.params))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown filter parameter(s): {', '.join(unknown)}.")
+        return value
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('filter' in attrs):
+            raise serializers.ValidationError("Provide either ids or filter.")
+        return attrs
+
+
+class ExpenseRecategorizeSerializer(ExpenseBulkActionSerializer):
+    """
+    Bulk action moving the selected expenses to `category` (null = uncategorized).
+    """
+    category = CondominiumCategoryField(allow_null=True)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            "id",
+            "task",
+            "status",
+            "attempts",
+            "max_attempts",
+            "result",
+            "error",
+            "created_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,141 @@
+from django.conf import settings
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from . import cache, fingerprints, rollups, sync, tenancy
+from .authentication import token_cache
+from .models import Category, Condominium, Expense, Tombstone
+
+# Campos do usuário que mudam o que um token em cache autoriza
+CREDENTIAL_FIELDS = ('password', 'is_active', 'is_staff', 'is_superuser')
+
+
+def _snapshot(expense):
+    """
+    Returns the (condominium_id, date, category_id, amount) tuple that the
+    rollup tracks.
+    """
+    amount = Expense._meta.get_field('amount').to_python(expense.amount)
+    return (expense.condominium_id, expense.date, expense.category_id, amount)
+
+
+@receiver(pre_save, sender=Expense)
+def remember_previous_expense(sender, instance, raw=False, **kwargs):
+    instance._rollup_previous = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._rollup_previous = sender.objects.filter(pk=instance.pk) \
+        .values_list('condominium_id', 'date', 'category_id', 'amount') \
+        .first()
+
+
+@receiver(post_save, sender=Expense)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_rollup_previous', None)
+    rollups.record_expense_change(previous, _snapshot(instance))
+
+
+@receiver(post_delete, sender=Expense)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    rollups.record_expense_change(_snapshot(instance), None)
+
+
+@receiver(pre_delete, sender=Category)
+def move_rollup_to_uncategorized(sender, instance, **kwargs):
+    # Expense.category is SET_NULL, which runs as a bulk UPDATE without
+    # per-expense signals, so the category's totals are moved here instead.
+    rollups.move_category_to_uncategorized(instance.pk)
+    # Pelo mesmo motivo, as despesas da categoria entram no feed aqui
+    sync.touch(Expense.objects.filter(category_id=instance.pk))
+
+
+@receiver(pre_save, sender=Category)
+def remember_previous_category_name(sender, instance, raw=False, **kwargs):
+    instance._previous_name = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    instance._previous_name = sender.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Category)
+def touch_expenses_on_rename(sender, instance, created, raw=False, **kwargs):
+    # As despesas do feed trazem category_name: renomear a categoria muda todas elas
+    previous = getattr(instance, '_previous_name', None)
+    if not raw and previous is not None and previous != instance.name:
+        sync.touch(Expense.objects.filter(category_id=instance.pk))
+
+
+@receiver(pre_save, sender=Expense)
+def stamp_fingerprint(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fingerprints.stamp([instance])
+
+
+@receiver(pre_save, sender=Expense)
+@receiver(pre_save, sender=Category)
+def stamp_change_sequence(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync.stamp([instance])
+
+
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Category)
+def record_tombstone(sender, instance, **kwargs):
+    model = Tombstone.EXPENSE if sender is Expense else Tombstone.CATEGORY
+    sync.record_deletion(model, instance.pk, instance.condominium_id, using=instance._state.db)
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_cached_responses(sender, instance, raw=False, **kwargs):
+    if not raw:
+        cache.bump_data_version(instance.condominium_id)
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.evict(instance.key)
+
+
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def remember_credential_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    # O last_login de cada login (update_fields=['last_login']) não pode
+    # derrubar os tokens em cache de todos os processos
+    if instance._state.adding or instance.pk is None:
+        changed = False
+    elif raw:
+        changed = True
+    elif update_fields is not None and not set(update_fields) & set(CREDENTIAL_FIELDS):
+        changed = False
+    else:
+        previous = sender.objects.filter(pk=instance.pk).values_list(*CREDENTIAL_FIELDS).first()
+        changed = previous != tuple(getattr(instance, field) for field in CREDENTIAL_FIELDS)
+    instance._credentials_changed = changed
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def evict_tokens_on_credential_change(sender, instance, **kwargs):
+    if getattr(instance, '_credentials_changed', True):
+        evict_user_tokens(sender, instance)
+
+
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def evict_user_tokens(sender, instance, **kwargs):
+    # Covers deactivation, password and privilege changes and deletion.
+    keys = Token.objects.filter(user_id=instance.pk).values_list('key', flat=True)
+    token_cache.evict_user(instance.pk, keys)
+    # is_staff decide a quais condomínios o usuário tem acesso
+    tenancy.invalidate_access()
+
+
+@receiver(post_save, sender=Condominium)
+@receiver(post_delete, sender=Condominium)
+@receiver(m2m_changed, sender=Condominium.members.through)
+def invalidate_condominium_access(sender, **kwargs):
+    if kwargs.get('action', 'post_').startswith('post_'):
+        tenancy.invalidate_access()
@@ -0,0 +1,58 @@
+"""
+Tasks the background worker can run (see gestao.jobs).
+"""
+import datetime
+
+from . import bulk, recurring, rollups
+from .jobs import JobFailed, task
+from .models import Category
+
+
+def _result(payload, ids):
+    return {'dry_run': payload['dry_run'], 'count': len(ids), 'ids': ids}
+
+
+@task('expenses.recategorize')
+def recategorize_expenses(payload):
+    """
+    Bulk recategorization; payload as ExpenseRecategorizeSerializer's data,
+    with the category and the condominium as pks.
+    """
+    category_id = payload['category']
+    condominium_id = payload['condominium']
+    if category_id is not None and \
+            not Category.objects.for_condominium(condominium_id).filter(pk=category_id).exists():
+        raise JobFailed(f"Category {category_id} no longer exists.")
+    selection = bulk.get_selection(payload, condominium_id)
+    ids = bulk.recategorize(selection, category_id, dry_run=payload['dry_run'])
+    return _result(payload, ids)
+
+
+@task('expenses.delete')
+def delete_expenses(payload):
+    """
+    Bulk deletion; payload as ExpenseBulkActionSerializer's data, with the
+    condominium as a pk.
+    """
+    selection = bulk.get_selection(payload, payload['condominium'])
+    return _result(payload, bulk.delete(selection, dry_run=payload['dry_run']))
+
+
+@task('rollups.rebuild')
+def rebuild_rollups(payload):
+    """
+    Recomputes ExpenseMonthlyRollup from the expense table.
+    """
+    rollups.rebuild()
+    return {'mismatches': len(rollups.verify())}
+
+
+@task('recurring.generate')
+def generate_recurring_expenses(payload):
+    """
+    Materializes the recurring expenses due up to payload['through'] (an
+    ISO date; default today).
+    """
+    through = payload.get('through')
+    processed, created = recurring.generate(datetime.date.fromisoformat(through) if through else None)
+    return {'templates': processed, 'created': created}
@@ -0,0 +1,49 @@
+"""
+Admin template tags for the gestao changelists.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+
+from gestao import cache
+
+register = template.Library()
+
+DATE_HIERARCHY_KEY = 'gestao:admin-dates:{model}:{params}:{version}'
+# Parâmetro do list_filter por condomínio
+CONDOMINIUM_PARAM = 'condominium__id__exact'
+
+
+def cached_date_hierarchy(cl):
+    """
+    Django's date_hierarchy() (MIN/MAX and DISTINCT dates over the filtered
+    changelist) cached per filter set under the data version, so it only
+    hits the table again after a write (to the filtered condominium, when
+    the changelist is narrowed to one).
+    """
+    params = hashlib.sha256(urlencode(sorted(cl.params.items())).encode()).hexdigest()
+    version = cache.get_data_version(cl.params.get(CONDOMINIUM_PARAM) or None)
+    key = DATE_HIERARCHY_KEY.format(model=cl.opts.label_lower, params=params, version=version)
+    store = cache.get_cache()
+    context = store.get(key)
+    if context is None:
+        context = date_hierarchy(cl)
+        # Os títulos podem ser traduções preguiçosas: guarda o texto
+        if context and context.get('back'):
+            context['back']['title'] = str(context['back']['title'])
+        store.set(key, context, timeout=cache.get_timeout())
+    return context
+
+
+@register.tag(name='cached_date_hierarchy')
+def cached_date_hierarchy_tag(parser, token):
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=cached_date_hierarchy,
+        template_name='date_hierarchy.html',
+        takes_context=False,
+    )
@@ -0,0 +1,141 @@
+"""
+Multi-condominium tenancy.
+
+One database serves many buildings: every expense, category, rollup row,
+tombstone and recurring template belongs to a Condominium, and every API
+request acts on exactly one of them, named by the X-Condominium header (id
+or slug) or, without it, the caller's only condominium. Members reach their
+own condominiums; staff reach any.
+
+Views read and write through the tenant-scoped managers
+(Model.objects.for_condominium()), so every query leads with the tenant and
+is served by the (condominium, ...) indexes: its cost follows that
+condominium's rows, not the size of the shared tables. Cached payloads are
+keyed and versioned per condominium as well (see gestao.cache).
+
+Resolving the condominium costs no query in the steady state: successful
+resolutions are cached per (user, header value) under a version that any
+change to a condominium or to its members replaces (see gestao.signals).
+"""
+import uuid
+
+from django.db import transaction
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+
+from . import cache
+from .models import Condominium
+
+HEADER = 'HTTP_X_CONDOMINIUM'
+# Resolvido uma vez por request (as partes de um bundle reaproveitam)
+REQUEST_ATTRIBUTE = '_gestao_condominium'
+VERSION_KEY = 'gestao:condominium-access-version'
+RESOLVED_KEY = 'gestao:condominium:{user}:{value}:{version}'
+
+
+def available_to(user):
+    """
+    The condominiums a user may act on.
+    """
+    if user.is_staff:
+        return Condominium.objects.all()
+    return Condominium.objects.filter(members=user)
+
+
+def named(value):
+    """
+    Lookup matching the condominium named by `value`: its slug or its id.
+    """
+    lookup = Q(slug=value)
+    if value.isdigit():
+        lookup |= Q(pk=int(value))
+    return lookup
+
+
+def resolve(user, value=''):
+    """
+    Returns the condominium named by `value` (id or slug) among those
+    available to `user`, or their only one when `value` is empty.
+    """
+    available = available_to(user)
+    if value:
+        condominium = available.filter(named(value)).first()
+        if condominium is None:
+            raise NotFound("Condominium not found.")
+        return condominium
+    candidates = list(available[:2])
+    if len(candidates) == 1:
+        return candidates[0]
+    if not candidates:
+        raise PermissionDenied("You do not have access to any condominium.")
+    raise ValidationError({'condominium': "Choose a condominium with the X-Condominium header."})
+
+
+def _access_version():
+    store = cache.get_cache()
+    version = store.get(VERSION_KEY)
+    if version is None:
+        store.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = store.get(VERSION_KEY)
+    return version
+
+
+def _replace_access_version():
+    cache.get_cache().set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def invalidate_access():
+    """
+    Forgets every cached resolution; called when a condominium, its members
+    or a user change (now and again after commit, as in gestao.cache).
+    """
+    _replace_access_version()
+    transaction.on_commit(_replace_access_version)
+
+
+def resolve_cached(user, value=''):
+    """
+    resolve() served from the cache when the same user named the same
+    condominium since the last change to the condominiums or memberships.
+    Failures are never cached.
+    """
+    store = cache.get_cache()
+    key = RESOLVED_KEY.format(user=user.pk, value=value, version=_access_version())
+    condominium = store.get(key)
+    if condominium is None:
+        condominium = resolve(user, value)
+        store.set(key, condominium, timeout=cache.get_timeout())
+    return condominium
+
+
+def get_condominium(request):
+    """
+    The condominium a (Django or DRF) request acts on.
+    """
+    http_request = getattr(request, '_request', request)
+    condominium = getattr(http_request, REQUEST_ATTRIBUTE, None)
+    if condominium is None:
+        condominium = resolve_cached(request.user, http_request.META.get(HEADER, '').strip())
+        setattr(http_request, REQUEST_ATTRIBUTE, condominium)
+    return condominium
+
+
+class CondominiumScopedMixin:
+    """
+    For the API views: `self.condominium` is the request's condominium,
+    get_queryset() narrows the view's queryset to it, serializers get it in
+    their context and new objects are saved into it.
+    """
+
+    @property
+    def condominium(self):
+        return get_condominium(self.request)
+
+    def get_queryset(self):
+        return super().get_queryset().for_condominium(self.condominium)
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'condominium': self.condominium}
+
+    def perform_create(self, serializer):
+        serializer.save(condominium=self.condominium)
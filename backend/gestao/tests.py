@@ -9,9 +9,10 @@ from .models import Expense # Importa seu modelo
 # Marca todos os testes neste arquivo para terem acesso ao BD Django
 pytestmark = pytest.mark.django_db
 
-def test_expense_model_creation_and_str():
+def test_expense_model_creation_and_str(condominium):
     """Testa a criação de uma instância de Expense e seu método __str__."""
     expense = Expense.objects.create(
+        condominium=condominium,
         description="Teste Gasto Modelo",
         amount=Decimal("99.99"),
         # date usa o default=timezone.now
@@ -22,11 +23,12 @@ def test_expense_model_creation_and_str():
     assert "Teste Gasto Modelo" in str(expense)
     assert "99.99" in str(expense) # Assumindo que amount está no __str__
 
-def test_expense_list_api_endpoint():
+def test_expense_list_api_endpoint(user, condominium):
     """Testa se o endpoint da API de listagem de despesas funciona."""
     client = APIClient() # Cliente para fazer requisições à API
+    client.force_authenticate(user=user) # As views exigem IsAuthenticated
     # Cria uma despesa de exemplo no banco de dados de teste
-    Expense.objects.create(description="Teste Gasto API", amount=Decimal("50.00"))
+    Expense.objects.create(condominium=condominium, description="Teste Gasto API", amount=Decimal("50.00"))
 
     # Obtém a URL usando o nome que definimos em gestao/urls.py
     url = reverse('expense-list-create')
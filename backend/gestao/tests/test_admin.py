@@ -0,0 +1,69 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from gestao.admin import EstimatedCountPaginator
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def expenses(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    return [
+        Expense.objects.create(condominium=condominium, description=description, amount=Decimal("10.00"),
+                               date=date(2025, month, 5), category=limpeza)
+        for month, description in [(1, "Conta de luz"), (2, "Conta de água"), (3, "Limpeza da piscina")]
+    ]
+
+
+def _changelist_queries(client, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse('admin:gestao_expense_changelist'), params or {})
+    assert response.status_code == 200
+    return response, [query['sql'] for query in queries.captured_queries]
+
+
+def test_changelist_joins_categories_and_skips_full_count(admin_client, expenses):
+    response, queries = _changelist_queries(admin_client)
+
+    assert response.context['cl'].result_count == 3
+    expense_queries = [sql for sql in queries if 'gestao_expense' in sql]
+    # Uma contagem só (sem a da tabela inteira) e nenhuma busca de categoria por linha
+    assert sum('COUNT(*)' in sql for sql in expense_queries) == 1
+    assert any('JOIN "gestao_category"' in sql for sql in expense_queries)
+    assert not any('WHERE "gestao_category"."id" =' in sql for sql in queries)
+
+
+def test_date_hierarchy_is_cached_until_a_write(admin_client, expenses, condominium):
+    _, first = _changelist_queries(admin_client)
+    assert any('MIN(' in sql for sql in first)
+
+    response, second = _changelist_queries(admin_client)
+    assert not any('MIN(' in sql or 'DISTINCT' in sql for sql in second)
+    assert b'2025' in response.content
+
+    Expense.objects.create(condominium=condominium, description="Obra", amount=Decimal("1.00"), date=date(2024, 6, 1))
+    response, third = _changelist_queries(admin_client)
+    assert any('MIN(' in sql for sql in third)
+    assert b'2024' in response.content
+
+
+def test_search_matches_the_whole_term_as_a_prefix(admin_client, expenses):
+    response, _ = _changelist_queries(admin_client, {'q': 'conta de'})
+    found = {expense.description for expense in response.context['cl'].result_list}
+    assert found == {"Conta de luz", "Conta de água"}
+
+    response, _ = _changelist_queries(admin_client, {'q': 'luz'})
+    assert list(response.context['cl'].result_list) == []
+
+
+def test_paginator_counts_exactly_without_planner_estimates(expenses):
+    paginator = EstimatedCountPaginator(Expense.objects.order_by('-date', '-id'), 2)
+    assert paginator.count == 3
+    assert paginator.num_pages == 2
@@ -0,0 +1,118 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from gestao import aggregation
+from gestao.aggregation import OTHERS_LABEL, SummaryQuery
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def engine(request, monkeypatch):
+    # Os dois caminhos (NumPy e listas) precisam dar o mesmo resultado
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(aggregation, 'np', None)
+    return request.param
+
+
+@pytest.fixture
+def ledger(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    obras = Category.objects.create(condominium=condominium, name="Obras")
+    agua = Category.objects.create(condominium=condominium, name="Água")
+    for description, amount, day, category in [
+        ("Produtos", "0.10", date(2025, 1, 6), limpeza),
+        ("Produtos", "0.20", date(2025, 1, 7), limpeza),
+        ("Pintura", "1000.00", date(2025, 3, 20), obras),
+        ("Conta", "50.00", date(2025, 4, 2), agua),
+        ("Taxa", "7.00", date(2025, 4, 3), None),
+    ]:
+        Expense.objects.create(condominium=condominium, description=description, amount=Decimal(amount), date=day, category=category)
+    return {'limpeza': limpeza, 'obras': obras, 'agua': agua}
+
+
+def run(query):
+    return query.build(list(query.get_queryset()))
+
+
+def test_monthly_series_is_zero_filled_and_exact(engine, ledger):
+    series = run(SummaryQuery())
+
+    assert series.labels == ['2025-01', '2025-02', '2025-03', '2025-04']
+    rows = {category: (values, total) for category, values, total in series.rows()}
+    assert rows['Limpeza'] == ([Decimal("0.30"), 0, 0, 0], Decimal("0.30"))
+    assert rows['Sem Categoria'][0] == [0, 0, 0, Decimal("7.00")]
+
+
+def test_week_and_quarter_buckets(engine, ledger):
+    weekly = run(SummaryQuery(granularity='week', start=date(2025, 1, 1), end=date(2025, 1, 31)))
+    assert weekly.labels == ['2025-W01', '2025-W02', '2025-W03', '2025-W04', '2025-W05']
+    assert dict((c, v) for c, v, _ in weekly.rows())['Limpeza'][1] == Decimal("0.30")
+
+    quarterly = run(SummaryQuery(granularity='quarter'))
+    assert quarterly.labels == ['2025-Q1', '2025-Q2']
+    assert dict((c, t) for c, _, t in quarterly.rows())['Obras'] == Decimal("1000.00")
+
+
+def test_window_and_category_subset(engine, ledger):
+    query = SummaryQuery(
+        granularity='day', start=date(2025, 4, 1), end=date(2025, 4, 3),
+        category_ids=(ledger['agua'].pk,), uncategorized=True,
+    )
+    series = run(query)
+
+    assert not query.uses_rollup()
+    assert series.categories == ['Sem Categoria', 'Água']
+    assert series.labels == ['2025-04-01', '2025-04-02', '2025-04-03']
+
+
+def test_top_n_collapses_the_rest_into_others(engine, ledger):
+    series = run(SummaryQuery(top=2))
+
+    assert series.categories == ['Obras', 'Água', OTHERS_LABEL]
+    assert dict((c, t) for c, _, t in series.rows())[OTHERS_LABEL] == Decimal("7.30")
+
+
+def test_summary_view_accepts_parameters(api_client, ledger):
+    url = reverse('expense-summary')
+
+    response = api_client.get(url, {'granularity': 'year', 'output': 'series', 'top': 1})
+    assert response.status_code == 200
+    assert response.data['labels'] == ['2025']
+    assert [s['category'] for s in response.data['series']] == ['Obras', OTHERS_LABEL]
+    assert response.data['series'][1]['total'] == "57.30"
+
+    assert api_client.get(url, {'granularity': 'hour'}).status_code == 400
+    assert api_client.get(url, {'output': 'xml'}).status_code == 400
+
+
+def test_bucket_count_is_bounded(api_client, ledger):
+    url = reverse('expense-summary')
+
+    # Janela fechada: recusada antes de consultar o banco
+    huge = api_client.get(url, {'granularity': 'day', 'date_from': '1000-01-01', 'date_to': '9998-12-31'})
+    assert huge.status_code == 400
+    assert 'granularity' in huge.data
+    # Janela aberta: a outra ponta vem dos dados
+    assert api_client.get(url, {'granularity': 'day', 'date_from': '1000-01-01'}).status_code == 400
+    assert api_client.get(url, {'granularity': 'week', 'date_to': '9999-12-31'}).status_code == 400
+    response = api_client.get(url, {'granularity': 'day', 'date_to': '2025-12-31', 'output': 'series'})
+    assert response.status_code == 200
+    assert response.data['buckets'][0] == '2025-01-06'
+
+
+def test_buckets_stop_at_the_last_representable_date():
+    assert aggregation.next_bucket(date(9999, 12, 27), 'week') is None
+    assert aggregation.next_bucket(date(9999, 10, 1), 'quarter') is None
+    assert aggregation.bucket_range(date(9999, 12, 1), date.max, 'week') == [
+        date(9999, 11, 29), date(9999, 12, 6), date(9999, 12, 13), date(9999, 12, 20), date(9999, 12, 27),
+    ]
+    assert aggregation.bucket_count(date(9999, 12, 1), date.max, 'week') == 5
+    series = SummaryQuery(granularity='year', start=date(9990, 1, 1), end=date.max).build([])
+    assert series.labels == [str(year) for year in range(9990, 10000)]
@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def auth_headers(user):
+    token = Token.objects.create(user=user)
+    return {'Authorization': f"Token {token.key}"}
+
+
+@pytest.fixture
+def ledger(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Produtos", amount=Decimal("10.50"), date=date(2025, 1, 10), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"), category=limpeza)
+
+
+@pytest.mark.parametrize("sync_name,async_name", [
+    ('expense-summary', 'expense-summary-async'),
+    ('homepage-summary', 'homepage-summary-async'),
+])
+def test_async_views_match_sync_payload(api_client, auth_headers, ledger, sync_name, async_name):
+    expected = api_client.get(reverse(sync_name), HTTP_ACCEPT='application/json')
+    # Limpa o cache para que a variante assíncrona recalcule o payload
+    cache.clear()
+
+    response = async_to_sync(AsyncClient().get)(reverse(async_name), headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.content == expected.content
+
+
+def test_async_views_require_authentication(ledger):
+    response = async_to_sync(AsyncClient().get)(reverse('expense-summary-async'))
+    assert response.status_code == 401
+
+
+def test_async_view_honours_if_none_match(auth_headers, ledger):
+    client = AsyncClient()
+    first = async_to_sync(client.get)(reverse('homepage-summary-async'), headers=auth_headers)
+
+    response = async_to_sync(client.get)(
+        reverse('homepage-summary-async'), headers={**auth_headers, 'If-None-Match': first['ETag']}
+    )
+    assert response.status_code == 304
+
+
+def test_async_summary_rejects_too_many_buckets(auth_headers, ledger):
+    response = async_to_sync(AsyncClient().get)(
+        reverse('expense-summary-async'), {'granularity': 'day', 'date_from': '1000-01-01'}, headers=auth_headers,
+    )
+    assert response.status_code == 400
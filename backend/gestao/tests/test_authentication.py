@@ -0,0 +1,113 @@
+import pytest
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from gestao.authentication import TokenCache, token_cache
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def token(user):
+    token_cache.clear()
+    yield Token.objects.create(user=user)
+    token_cache.clear()
+
+
+def _client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+    return client
+
+
+def test_second_request_skips_the_token_query(token, django_assert_num_queries):
+    client = _client(token)
+    url = reverse('category-list')
+    client.get(url)
+
+    # Só a consulta de categorias: o token veio do cache
+    with django_assert_num_queries(1):
+        assert client.get(url).status_code == 200
+    assert token_cache.stats()['hits'] == 1
+    assert token_cache.stats()['misses'] == 1
+
+
+def test_deleting_the_token_revokes_access(token):
+    client = _client(token)
+    url = reverse('category-list')
+    assert client.get(url).status_code == 200
+
+    token.delete()
+
+    assert client.get(url).status_code == 401
+
+
+def test_deactivating_the_user_revokes_access(token, user):
+    client = _client(token)
+    url = reverse('category-list')
+    assert client.get(url).status_code == 200
+
+    user.is_active = False
+    user.save()
+
+    assert client.get(url).status_code == 401
+
+
+def test_lru_is_bounded(settings, token, user):
+    settings.GESTAO_TOKEN_CACHE_SIZE = 2
+    for key in ("a", "b", "c"):
+        token_cache.set(key, (user, token))
+
+    assert token_cache.get("a") is None
+    assert token_cache.get("c") == (user, token)
+    assert token_cache.stats()['evictions'] == 1
+
+
+@pytest.mark.parametrize('revoke', ['token', 'user'])
+def test_revocation_reaches_other_processes(settings, token, user, revoke):
+    settings.GESTAO_TOKEN_CACHE_SHARED_ALIAS = 'default'
+    cache.clear()
+    other = Token.objects.create(user=User.objects.create_user(username="outro", password="x"))
+    # Dois workers: cada um com seu LRU, o cache compartilhado no meio
+    first, second = TokenCache(), TokenCache()
+    first.set(token.key, (user, token))
+    first.set(other.key, (other.user, other))
+    assert second.get(token.key) == (user, token)
+    assert second.get(other.key) == (other.user, other)
+    assert second.get(token.key) == (user, token)
+    assert second.stats()['hits'] == 1
+
+    if revoke == 'token':
+        first.evict(token.key)
+    else:
+        first.evict_user(user.pk, [token.key])
+
+    assert second.get(token.key) is None
+    # As cópias dos outros tokens voltam do cache compartilhado
+    assert second.get(other.key) == (other.user, other)
+    assert second.stats()['shared_hits'] == 3
+
+
+def test_logging_in_keeps_the_cached_tokens(settings, token, user):
+    settings.GESTAO_TOKEN_CACHE_SHARED_ALIAS = 'default'
+    other = TokenCache()
+    token_cache.set(token.key, (user, token))
+    assert other.get(token.key) == (user, token)
+
+    # login() só grava o last_login; outras edições do perfil também não revogam
+    user.last_login = timezone.now()
+    user.save(update_fields=['last_login'])
+    user.first_name = "Síndico"
+    user.save()
+
+    assert token_cache.stats()['size'] == 1
+    assert other.get(token.key) == (user, token)
+    assert other.stats()['hits'] == 1
+
+    user.set_password("outra-senha")
+    user.save()
+    assert other.get(token.key) is None
@@ -0,0 +1,53 @@
+import pytest
+from django.utils.module_loading import import_string
+
+from gestao.benchmarks.comparisons import COMPARISONS
+from gestao.benchmarks.runner import compare, percentile, run_suite
+from gestao.benchmarks.scenarios import SCENARIOS
+
+
+def test_percentile_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 0.5) == 3
+    assert percentile(values, 0.95) == 5
+
+
+def test_compare_flags_query_growth_and_latency_regressions():
+    baseline = {'results': {'1000': {
+        'expense-list': {'p50_ms': 5, 'p95_ms': 10.0, 'queries': 3, 'peak_kib': 1},
+        'expense-summary': {'p50_ms': 5, 'p95_ms': 10.0, 'queries': 2, 'peak_kib': 1},
+    }}}
+    results = {'results': {'1000': {
+        'expense-list': {'p50_ms': 5, 'p95_ms': 10.5, 'queries': 4, 'peak_kib': 1},
+        'expense-summary': {'p50_ms': 5, 'p95_ms': 20.0, 'queries': 2, 'peak_kib': 1},
+        'homepage-summary': {'p50_ms': 5, 'p95_ms': 99.0, 'queries': 9, 'peak_kib': 1},
+    }}}
+
+    regressions = compare(results, baseline, latency_threshold=0.25)
+
+    assert regressions == [
+        "expense-list @ 1000: queries 3 -> 4",
+        "expense-summary @ 1000: p95 10.0ms -> 20.0ms",
+    ]
+
+
+@pytest.mark.django_db
+def test_run_suite_measures_every_scenario():
+    results = run_suite([30], categories=3, iterations=2)
+
+    measured = results['results']['30']
+    assert set(measured) == {scenario.name for scenario in SCENARIOS}
+    assert all(item['queries'] >= 1 for item in measured.values())
+
+
+def test_every_comparison_points_to_its_function():
+    for comparison in COMPARISONS:
+        assert callable(import_string(comparison.function)), comparison.name
+
+
+@pytest.mark.django_db
+def test_run_suite_runs_the_named_comparisons_per_size():
+    results = run_suite([30], categories=3, iterations=1, scenarios=[], comparisons=['serialization'])
+
+    assert set(results['serialization']) == {'30'}
+    assert 'renderers' not in results
@@ -0,0 +1,70 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from gestao import rollups, sync
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def ledger(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    obras = Category.objects.create(condominium=condominium, name="Obras")
+    expenses = [
+        Expense.objects.create(condominium=condominium, description=f"Importado {i}", amount=Decimal("10.00"),
+                               date=date(2025, 1 + i % 2, 10), category=limpeza)
+        for i in range(4)
+    ]
+    keep = Expense.objects.create(condominium=condominium, description="Manual", amount=Decimal("7.00"), date=date(2025, 1, 3))
+    return {'limpeza': limpeza, 'obras': obras, 'expenses': expenses, 'keep': keep}
+
+
+def test_recategorize_by_ids_updates_rollup_cache_and_feed(api_client, ledger, settings):
+    # O token do feed avança logo (gestao.sync espera as alterações assentarem)
+    settings.GESTAO_SYNC_SETTLE_SECONDS = 0
+    ids = [e.pk for e in ledger['expenses'][:3]]
+    summary_etag = api_client.get(reverse('expense-summary'))['ETag']
+    token = api_client.get(reverse('sync')).data['next']
+
+    response = api_client.post(reverse('expense-bulk-recategorize'), {
+        'ids': ids, 'category': ledger['obras'].pk,
+    }, format='json')
+
+    assert response.status_code == 200
+    assert response.data == {'dry_run': False, 'count': 3, 'ids': ids}
+    assert Expense.objects.filter(category=ledger['obras']).count() == 3
+    assert rollups.verify() == []
+    assert api_client.get(reverse('expense-summary'))['ETag'] != summary_etag
+    changed = api_client.get(reverse('sync'), {'since': token}).data['expenses']
+    assert sorted(e['id'] for e in changed) == ids
+
+
+def test_delete_by_filter_with_dry_run(api_client, ledger, condominium):
+    url = reverse('expense-bulk-delete')
+    body = {'filter': {'search': "importado", 'date_from': "2025-01-01"}}
+
+    preview = api_client.post(url, {**body, 'dry_run': True}, format='json')
+    assert preview.data['count'] == 4
+    assert Expense.objects.count() == 5
+
+    response = api_client.post(url, body, format='json')
+
+    assert response.data['ids'] == preview.data['ids']
+    assert list(Expense.objects.values_list('pk', flat=True)) == [ledger['keep'].pk]
+    assert rollups.verify() == []
+    deleted = sync.changes_since(condominium)['deleted']['expenses']
+    assert sorted(deleted) == sorted(preview.data['ids'])
+
+
+def test_bulk_actions_reject_ambiguous_or_unbounded_selections(api_client, ledger):
+    url = reverse('expense-bulk-delete')
+
+    assert api_client.post(url, {}, format='json').status_code == 400
+    assert api_client.post(url, {'ids': [1], 'filter': {'search': "x"}}, format='json').status_code == 400
+    assert api_client.post(url, {'filter': {'serch': "x"}}, format='json').status_code == 400
+    assert api_client.post(url, {'filter': {'search': " "}}, format='json').status_code == 400
+    assert Expense.objects.count() == 5
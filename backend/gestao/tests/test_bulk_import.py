@@ -0,0 +1,81 @@
+import json
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from gestao import rollups
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+def _post(api_client, body, content_type):
+    response = api_client.generic('POST', reverse('expense-bulk-import'), body, content_type=content_type)
+    assert response.status_code == 200
+    return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+
+def test_bulk_import_csv_reports_each_row(api_client, condominium):
+    Category.objects.create(condominium=condominium, name="Limpeza")
+    body = (
+        "description,amount,date,category\n"
+        "Produtos,10.50,2025-01-10,Limpeza\n"
+        "Portão,abc,2025-01-11,Manutenção\n"
+        "Pintura,300.00,2025-01-12,Manutenção\n"
+        "Taxa,5.00,2025-01-13,\n"
+    )
+
+    lines = _post(api_client, body, 'text/csv')
+
+    assert [line.get('status') for line in lines[:4]] == ['created', 'error', 'created', 'created']
+    assert 'amount' in lines[1]['errors']
+    assert lines[-1] == {'summary': {'created': 3, 'errors': 1}}
+    assert Category.objects.filter(name="Manutenção").count() == 1
+    assert Expense.objects.get(pk=lines[2]['id']).category.name == "Manutenção"
+    assert Expense.objects.get(pk=lines[3]['id']).category is None
+    assert rollups.verify() == []
+
+
+def test_bulk_import_ndjson(api_client):
+    body = '{"description": "Luz", "amount": "80.00", "date": "2025-02-01", "category_name": "Contas"}\nnão é json\n'
+
+    lines = _post(api_client, body, 'application/x-ndjson')
+
+    assert lines[0]['status'] == 'created'
+    assert lines[1]['status'] == 'error'
+    assert Expense.objects.get().amount == Decimal("80.00")
+
+
+def test_bulk_import_rejects_unknown_content_type(api_client):
+    response = api_client.post(reverse('expense-bulk-import'), {'a': 1}, format='json')
+    assert response.status_code == 415
+
+
+def test_import_expenses_command(tmp_path, condominium):
+    path = tmp_path / "extrato.csv"
+    path.write_text("description,amount,date,category\nÁgua,42.00,2025-03-01,Contas\n", encoding='utf-8')
+
+    call_command('import_expenses', str(path), condominium='aurora', batch_size=1)
+
+    expense = Expense.objects.get()
+    assert (expense.description, expense.category.name) == ("Água", "Contas")
+
+
+def test_bulk_import_stays_streamed_under_asgi(user):
+    token = Token.objects.create(user=user)
+    body = "description,amount,date\nLuz,80.00,2025-02-01\nÁgua,20.00,2025-02-02\n"
+
+    async def post():
+        response = await AsyncClient().post(reverse('expense-bulk-import'), body, content_type='text/csv',
+                                            headers={'Authorization': f"Token {token.key}"})
+        assert response.is_async
+        return [json.loads(line) async for line in response.streaming_content]
+
+    lines = async_to_sync(post)()
+    assert [line.get('status') for line in lines[:2]] == ['created', 'created']
+    assert lines[-1] == {'summary': {'created': 2, 'errors': 0}}
@@ -0,0 +1,101 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+def test_bundle_returns_every_part_with_timings(api_client, condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Produtos", amount=Decimal("10.00"), date=date(2025, 1, 5), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"), date=date(2025, 2, 5))
+
+    response = api_client.post(reverse('dashboard-bundle'), {'parts': [
+        'homepage-summary',
+        'categories',
+        {'resource': 'expenses', 'params': {'page_size': 1}},
+        {'resource': 'expense-summary', 'name': 'yearly', 'params': {'granularity': 'year'}},
+    ]}, format='json')
+
+    assert response.status_code == 200
+    parts = response.data['parts']
+    assert set(parts) == {'homepage-summary', 'categories', 'expenses', 'yearly'}
+    assert all(part['status'] == 200 and part['duration_ms'] >= 0 for part in parts.values())
+    assert [c['name'] for c in parts['categories']['data']] == ["Limpeza"]
+    assert len(parts['expenses']['data']['results']) == 1
+    assert parts['yearly']['data']['stacked_monthly_summary']['labels'] == ['2025']
+    # Mesmo payload que a rota própria
+    assert parts['homepage-summary']['data'] == api_client.get(reverse('homepage-summary')).data
+
+
+def test_bundle_reports_part_errors_and_rejects_bad_specs(api_client):
+    url = reverse('dashboard-bundle')
+    response = api_client.post(url, {'parts': [
+        {'resource': 'expense-summary', 'params': {'granularity': 'hour'}},
+    ]}, format='json')
+    assert response.status_code == 200
+    assert response.data['parts']['expense-summary']['status'] == 400
+
+    assert api_client.post(url, {'parts': ['admin']}, format='json').status_code == 400
+    assert api_client.post(url, {'parts': []}, format='json').status_code == 400
+    assert api_client.post(url, {'parts': ['categories', 'categories']}, format='json').status_code == 400
+    for name in (['a'], {'a': 1}, '', 7):
+        response = api_client.post(url, {'parts': [{'resource': 'categories', 'name': name}]}, format='json')
+        assert response.status_code == 400
+
+
+def test_bundle_requires_authentication(client):
+    assert client.post(reverse('dashboard-bundle'), {'parts': ['categories']},
+                       content_type='application/json').status_code == 401
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite', reason="SQLite only")
+@pytest.mark.django_db(transaction=True)
+def test_sqlite_bundle_reads_without_the_write_lock(api_client, condominium):
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"), date=date(2025, 2, 5))
+    mode = connection.transaction_mode
+    assert mode == 'IMMEDIATE'
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post(reverse('dashboard-bundle'), {'parts': ['homepage-summary', 'categories']}, format='json')
+
+    assert response.status_code == 200
+    begins = [query['sql'] for query in queries.captured_queries if query['sql'].startswith('BEGIN')]
+    assert begins == ['BEGIN DEFERRED']
+    # As escritas seguintes continuam com o modo configurado
+    assert connection.transaction_mode == mode
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason="Postgres only")
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_parts_match_a_sequential_run(api_client, condominium, settings):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Produtos", amount=Decimal("10.00"), date=date(2025, 1, 5), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"), date=date(2025, 2, 5))
+    body = {'parts': [
+        'homepage-summary',
+        'categories',
+        'sync',
+        {'resource': 'expenses', 'params': {'page_size': 1}},
+        {'resource': 'expense-summary', 'params': {'granularity': 'year'}},
+    ]}
+    url = reverse('dashboard-bundle')
+
+    settings.GESTAO_BUNDLE_WORKERS = 4
+    concurrent = api_client.post(url, body, format='json').data
+    # Sem o cache de respostas a rodada sequencial recalcula tudo
+    cache.clear()
+    settings.GESTAO_BUNDLE_WORKERS = 0
+    sequential = api_client.post(url, body, format='json').data
+
+    assert concurrent['concurrent'] is True and sequential['concurrent'] is False
+    for name, part in concurrent['parts'].items():
+        assert part['status'] == 200
+        assert part['data'] == sequential['parts'][name]['data']
@@ -0,0 +1,36 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+def test_summary_is_served_from_cache_until_a_write(api_client, django_assert_num_queries, condominium):
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"), date=date(2025, 1, 5))
+    url = reverse('expense-summary')
+    first = api_client.get(url)
+
+    with django_assert_num_queries(0):
+        assert api_client.get(url).data == first.data
+
+    Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Água", amount=Decimal("20.00"), date=date(2025, 1, 6))
+    fresh = api_client.get(url)
+    assert fresh['ETag'] != first['ETag']
+    assert fresh.data['category_summary']['totals'] == [Decimal("100.00")]
+
+
+def test_if_none_match_returns_304_without_queries(api_client, django_assert_num_queries, condominium):
+    url = reverse('homepage-summary')
+    etag = api_client.get(url)['ETag']
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+    Expense.objects.create(condominium=condominium, description="Gás", amount=Decimal("30.00"))
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -0,0 +1,117 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from gestao import fingerprints
+from gestao.importers import ExpenseImporter
+from gestao.models import Condominium, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def bill(condominium):
+    return Expense.objects.create(condominium=condominium, description="Conta de Luz - JAN.",
+                                  amount=Decimal("350.00"), date=date(2025, 1, 7))
+
+
+def test_fingerprint_ignores_case_accents_punctuation_and_day_of_week():
+    fingerprint = fingerprints.compute("Conta de Água - JAN.", Decimal("350.00"), date(2025, 1, 6))
+
+    assert fingerprints.normalize_description("  Conta de Água - JAN. ") == "conta de agua jan"
+    assert fingerprints.compute("conta de agua jan", "350", "2025-01-12") == fingerprint
+    # Outra semana ou outro valor já é outra despesa
+    assert fingerprints.compute("conta de agua jan", "350", "2025-01-13") != fingerprint
+    assert fingerprints.compute("conta de agua jan", "350.01", "2025-01-06") != fingerprint
+
+
+def test_fingerprint_is_kept_up_to_date_on_save(bill):
+    assert bill.fingerprint == fingerprints.compute("conta de luz jan", "350.00", date(2025, 1, 7))
+
+    bill.amount = Decimal("351.00")
+    bill.save()
+    bill.refresh_from_db()
+    assert bill.fingerprint == fingerprints.compute("conta de luz jan", "351.00", date(2025, 1, 7))
+
+
+def test_api_saves_and_flags_a_likely_duplicate(api_client, bill):
+    url = reverse('expense-list-create')
+
+    response = api_client.post(url, {'description': "conta de luz jan", 'amount': "350.00", 'date': "2025-01-09"})
+    assert response.status_code == 201
+    assert response.data['possible_duplicates'] == [bill.pk]
+    assert Expense.objects.count() == 2
+
+    other = api_client.post(url, {'description': "Conta de água", 'amount': "350.00", 'date': "2025-01-09"})
+    assert other.data['possible_duplicates'] == []
+    # A listagem não ganha o campo (mesma saída da ExpenseRowSerializer)
+    assert all('possible_duplicates' not in e for e in api_client.get(url).data['results'])
+
+
+def test_api_checks_updates_against_the_other_expenses(api_client, bill, condominium):
+    other = Expense.objects.create(condominium=condominium, description="Conta de água",
+                                   amount=Decimal("120.00"), date=date(2025, 1, 7))
+    url = reverse('expense-detail', args=[other.pk])
+
+    assert api_client.patch(url, {'amount': "120.00"}).data['possible_duplicates'] == []
+    response = api_client.patch(url, {'description': "Conta de luz, jan", 'amount': "350.00"})
+    assert response.status_code == 200
+    assert response.data['possible_duplicates'] == [bill.pk]
+
+
+def test_other_condominiums_are_not_duplicates(api_client, bill):
+    neighbour = Condominium.objects.create(name="Edifício Boreal", slug="boreal")
+    Expense.objects.create(condominium=neighbour, description="Aluguel", amount=Decimal("900.00"),
+                           date=date(2025, 1, 7))
+
+    response = api_client.post(reverse('expense-list-create'), {
+        'description': "Aluguel", 'amount': "900.00", 'date': "2025-01-07",
+    })
+
+    assert response.data['possible_duplicates'] == []
+    assert list(fingerprints.duplicate_groups()) == []
+
+
+def test_bulk_writers_stamp_the_fingerprint(condominium, bill):
+    importer = ExpenseImporter(condominium)
+    results = list(importer.run([{'description': "CONTA DE LUZ JAN", 'amount': "350.00", 'date': "2025-01-10"}]))
+
+    imported = Expense.objects.get(pk=results[0]['id'])
+    assert imported.fingerprint == bill.fingerprint
+    assert fingerprints.find_matches(condominium, bill.fingerprint, exclude=bill.pk) == [imported.pk]
+
+
+def test_find_duplicate_expenses_command(condominium, bill):
+    twin = Expense.objects.create(condominium=condominium, description="conta de luz jan",
+                                  amount=Decimal("350.00"), date=date(2025, 1, 8))
+    Expense.objects.create(condominium=condominium, description="Conta de luz fev",
+                           amount=Decimal("350.00"), date=date(2025, 2, 7))
+    # Linhas gravadas por fora do ORM ficam sem fingerprint até o --refresh
+    Expense.objects.filter(pk=twin.pk).update(fingerprint='')
+    stdout = StringIO()
+
+    call_command('find_duplicate_expenses', condominium='aurora', refresh=True, stdout=stdout)
+
+    output = stdout.getvalue()
+    assert "Fingerprints refreshed: 1 expense(s) changed." in output
+    assert f"#{bill.pk} 2025-01-07 350.00 Conta de Luz - JAN." in output
+    assert f"#{twin.pk} 2025-01-08 350.00 conta de luz jan" in output
+    assert "Found 1 duplicate group(s) (2 expense(s))." in output
+
+
+def test_admin_flags_duplicates_without_rejecting_them(admin_client, condominium, bill):
+    response = admin_client.post(reverse('admin:gestao_expense_add'), {
+        'condominium': condominium.pk, 'description': "Conta de luz jan", 'amount': "350.00",
+        'date': "2025-01-08",
+    }, follow=True)
+
+    assert response.status_code == 200
+    assert any(f"#{bill.pk}" in str(message) for message in response.context['messages'])
+    assert Expense.objects.count() == 2
+
+    changelist = admin_client.get(reverse('admin:gestao_expense_changelist'), {'duplicate': 'yes'})
+    assert changelist.context['cl'].result_count == 2
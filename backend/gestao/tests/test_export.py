@@ -0,0 +1,66 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def ledger(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Produtos, diversos", amount=Decimal("10.50"), date=date(2025, 1, 10), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"), date=date(2025, 2, 1))
+    Expense.objects.create(condominium=condominium, description="Rodo", amount=Decimal("7.00"), date=date(2025, 3, 5), category=limpeza)
+    return limpeza
+
+
+def _body(response):
+    assert response.status_code == 200
+    return b''.join(response.streaming_content).decode()
+
+
+def test_export_csv_streams_filtered_rows(api_client, ledger):
+    url = reverse('expense-export') + f'?category={ledger.pk}&date_to=2025-02-28'
+    response = api_client.get(url)
+
+    assert response['Content-Type'].startswith('text/csv')
+    assert _body(response).splitlines() == [
+        'id,description,amount,date,category_id,category_name',
+        f'{Expense.objects.get(description__startswith="Produtos").pk},"Produtos, diversos",10.50,2025-01-10,{ledger.pk},Limpeza',
+    ]
+
+
+def test_export_ndjson(api_client, ledger):
+    response = api_client.get(reverse('expense-export') + '?format=ndjson&date_from=2025-02-01')
+
+    rows = [json.loads(line) for line in _body(response).splitlines()]
+    assert [row['description'] for row in rows] == ['Rodo', 'Luz']
+    assert rows[1]['category_name'] is None
+    assert rows[1]['amount'] == "80.00"
+
+
+def test_export_rejects_invalid_date(api_client):
+    response = api_client.get(reverse('expense-export') + '?date_from=ontem')
+    assert response.status_code == 400
+
+
+def test_export_stays_streamed_under_asgi(user, ledger):
+    token = Token.objects.create(user=user)
+
+    async def export():
+        response = await AsyncClient().get(reverse('expense-export'), headers={'Authorization': f"Token {token.key}"})
+        # Iterador assíncrono: o Django não precisa juntar tudo numa lista antes de enviar
+        assert response.is_async
+        return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+    lines = async_to_sync(export)().splitlines()
+    assert lines[0] == 'id,description,amount,date,category_id,category_name'
+    assert len(lines) == 4
@@ -0,0 +1,44 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def ledger(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    obras = Category.objects.create(condominium=condominium, name="Obras")
+    Expense.objects.create(condominium=condominium, description="Produtos de limpeza", amount=Decimal("10.00"), date=date(2025, 1, 10), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Pintura do hall", amount=Decimal("900.00"), date=date(2025, 2, 1), category=obras)
+    Expense.objects.create(condominium=condominium, description="Conta de luz", amount=Decimal("80.00"), date=date(2025, 3, 5))
+    return {'limpeza': limpeza, 'obras': obras}
+
+
+def _descriptions(api_client, query):
+    response = api_client.get(reverse('expense-list-create') + query)
+    assert response.status_code == 200
+    return [item['description'] for item in response.data['results']]
+
+
+def test_filter_by_category_and_uncategorized(api_client, ledger):
+    assert _descriptions(api_client, f"?category={ledger['obras'].pk}") == ["Pintura do hall"]
+    assert _descriptions(api_client, "?uncategorized=true") == ["Conta de luz"]
+    assert _descriptions(api_client, f"?category={ledger['limpeza'].pk}&uncategorized=1") == [
+        "Conta de luz", "Produtos de limpeza",
+    ]
+
+
+def test_filter_by_amount_date_and_search(api_client, ledger):
+    assert _descriptions(api_client, "?amount_min=50&amount_max=100") == ["Conta de luz"]
+    assert _descriptions(api_client, "?date_from=2025-01-15&date_to=2025-02-28") == ["Pintura do hall"]
+    assert _descriptions(api_client, "?search=LIMPEZA") == ["Produtos de limpeza"]
+
+
+def test_invalid_amount_is_rejected(api_client):
+    response = api_client.get(reverse('expense-list-create') + "?amount_min=muito")
+    assert response.status_code == 400
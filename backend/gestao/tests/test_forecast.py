@@ -0,0 +1,100 @@
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+import pytest
+from django.urls import reverse
+
+from gestao import rollups
+from gestao.benchmarks.forecast import project_per_category
+from gestao.forecast import month_index, project
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+def test_project_uses_seasonal_level_and_run_rate():
+    # Set a Dez de 2025 com 10, 20, 30, 40: índices 0.4, 0.8, 1.2, 1.6 e nível 25
+    history = np.array([[10.0, 20.0, 30.0, 40.0], [0.0, 0.0, 0.0, 0.0]])
+    months = np.arange(month_index(date(2025, 9, 1)), month_index(date(2026, 1, 1)))
+    figures = project(history, months, np.array([5.0, 0.0]), np.array([50.0, np.nan]), date(2026, 1, 10))
+
+    progress = 10 / 31
+    month_end = 5 + (1 - progress) * (5 + (1 - progress) * 25)
+    assert figures['moving_average'][0] == pytest.approx(30)
+    assert figures['projected_month_end'][0] == pytest.approx(month_end)
+    # Resto do ano: fev-ago sem histórico (índice 1) e set-dez sazonais
+    assert figures['projected_year_end'][0] == pytest.approx(month_end + 7 * 25 + 25 * 4.0)
+    assert figures['budget_used'][0] == pytest.approx(0.1)
+    assert np.isnan(figures['budget_used'][1])
+    assert figures['projected_month_end'][1] == 0
+    assert not figures['over_budget_month'].any()
+
+
+def test_project_matches_the_per_category_loop():
+    rng = np.random.default_rng(0)
+    history = rng.uniform(0, 1000, size=(40, 30))
+    history[3] = 0
+    history[5, ::12] = 0
+    months = np.arange(month_index(date(2023, 7, 1)), month_index(date(2026, 1, 1)))
+    month_to_date = rng.uniform(0, 800, size=40)
+    budgets = np.where(np.arange(40) % 2, rng.uniform(100, 1000, size=40), np.nan)
+    as_of = date(2026, 1, 20)
+
+    figures = project(history, months, month_to_date, budgets, as_of)
+    expected = project_per_category(history, months, month_to_date, budgets, as_of)
+
+    assert figures['projected_month_end'] == pytest.approx([row[0] for row in expected])
+    assert figures['projected_year_end'] == pytest.approx([row[1] for row in expected])
+    assert figures['over_budget_month'].tolist() == [row[2] for row in expected]
+
+
+def test_forecast_endpoint_flags_categories_over_budget(api_client, condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza", monthly_budget=Decimal("100.00"))
+    obras = Category.objects.create(condominium=condominium, name="Obras", monthly_budget=Decimal("5000.00"))
+    for month in range(1, 13):
+        Expense.objects.create(condominium=condominium, description="Faxina", amount=Decimal("90.00"), date=date(2025, month, 5), category=limpeza)
+        Expense.objects.create(condominium=condominium, description="Reparo", amount=Decimal("300.00"), date=date(2025, month, 7), category=obras)
+    Expense.objects.create(condominium=condominium, description="Faxina extra", amount=Decimal("80.00"), date=date(2026, 1, 3), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Avulsa", amount=Decimal("12.00"), date=date(2026, 1, 2))
+    # Depois da data de referência: fora do mês até agora
+    Expense.objects.create(condominium=condominium, description="Futura", amount=Decimal("999.00"), date=date(2026, 1, 20), category=obras)
+    assert rollups.verify() == []
+
+    response = api_client.get(reverse('expense-forecast'), {'as_of': '2026-01-10', 'months': 12})
+
+    assert response.status_code == 200
+    data = response.data
+    assert (data['month'], data['days_elapsed'], data['days_in_month']) == ('2026-01', 10, 31)
+    by_name = {entry['name']: entry for entry in data['categories']}
+    assert list(by_name) == ["Limpeza", "Obras", "Sem Categoria"]
+
+    cleaning = by_name["Limpeza"]
+    assert cleaning['month_to_date'] == "80.00"
+    assert cleaning['burn_rate'] == "8.00"
+    assert cleaning['moving_average'] == "90.00"
+    assert cleaning['budget_used'] == 0.8
+    assert cleaning['over_budget_month'] is True
+    assert by_name["Obras"]['month_to_date'] == "0.00"
+    assert by_name["Obras"]['over_budget_month'] is False
+    assert by_name["Sem Categoria"]['monthly_budget'] is None
+    assert data['totals']['month_to_date'] == "92.00"
+    assert data['totals']['over_budget_month'] == 1
+
+    # Mudar um orçamento invalida o cache
+    obras.monthly_budget = Decimal("1.00")
+    obras.save()
+    refreshed = api_client.get(reverse('expense-forecast'), {'as_of': '2026-01-10', 'months': 12}).data
+    assert {entry['name']: entry for entry in refreshed['categories']}["Obras"]['over_budget_year'] is True
+
+
+def test_forecast_rejects_bad_parameters(api_client):
+    url = reverse('expense-forecast')
+    assert api_client.get(url, {'months': 'x'}).status_code == 400
+    assert api_client.get(url, {'months': '12', 'window': '13'}).status_code == 400
+    assert api_client.get(url, {'as_of': '2026-13-01'}).status_code == 400
+    # Histórico antes do ano 1 (ou as_of no último ano) não cabe em datetime.date
+    assert api_client.get(url, {'as_of': '0001-01-15'}).status_code == 400
+    assert api_client.get(url, {'as_of': '0002-06-15', 'months': '240'}).status_code == 400
+    assert api_client.get(url, {'as_of': '9999-06-15'}).status_code == 400
+    assert api_client.get(url, {'as_of': '0004-06-15'}).status_code == 200
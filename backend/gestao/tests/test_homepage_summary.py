@@ -0,0 +1,66 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+def _month_starts():
+    current = timezone.now().date().replace(day=1)
+    previous = (current - datetime.timedelta(days=1)).replace(day=1)
+    return current, previous
+
+
+def _seed(condominium, rows):
+    current, previous = _month_starts()
+    categories = [Category.objects.create(condominium=condominium, name=f"Categoria {i}") for i in range(3)]
+    Expense.objects.bulk_create(
+        Expense(
+            condominium=condominium,
+            description=f"Gasto {i}",
+            amount=Decimal("1.00"),
+            date=(current if i % 2 else previous) + datetime.timedelta(days=i % 20),
+            category=categories[i % 3] if i % 5 else None,
+        )
+        for i in range(rows)
+    )
+
+
+def test_homepage_summary_totals_and_top_category(api_client, condominium):
+    current, previous = _month_starts()
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    obras = Category.objects.create(condominium=condominium, name="Obras")
+    Expense.objects.create(condominium=condominium, description="A", amount=Decimal("10.00"), date=current, category=limpeza)
+    Expense.objects.create(condominium=condominium, description="B", amount=Decimal("25.00"), date=current, category=obras)
+    Expense.objects.create(condominium=condominium, description="C", amount=Decimal("99.00"), date=current)
+    Expense.objects.create(condominium=condominium, description="D", amount=Decimal("50.00"), date=previous, category=limpeza)
+    Expense.objects.create(condominium=condominium, description="E", amount=Decimal("70.00"), date=previous - datetime.timedelta(days=1))
+
+    data = api_client.get(reverse('homepage-summary')).data
+
+    assert data['current_month_total'] == Decimal("134.00")
+    assert data['previous_month_total'] == Decimal("50.00")
+    assert data['top_category_current_month'] == {'category__name': "Obras", 'total': Decimal("25.00")}
+    assert len(data['recent_expenses']) == 5
+
+
+def test_homepage_summary_without_expenses(api_client):
+    data = api_client.get(reverse('homepage-summary')).data
+
+    assert data['current_month_total'] == Decimal("0.00")
+    assert data['top_category_current_month'] is None
+
+
+@pytest.mark.parametrize("rows", [10, 300])
+def test_homepage_summary_query_count_is_constant(api_client, condominium, django_assert_num_queries, rows):
+    _seed(condominium, rows)
+    # Um agregado condicional + as despesas recentes, independente do volume,
+    # + a resolução do condomínio (cacheada nas próximas requisições)
+    with django_assert_num_queries(3):
+        response = api_client.get(reverse('homepage-summary'))
+    assert response.status_code == 200
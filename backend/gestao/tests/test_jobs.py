@@ -0,0 +1,154 @@
+import datetime
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from gestao import jobs, rollups
+from gestao.models import Category, Expense, Job
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def flaky_task():
+    calls = []
+
+    @jobs.task('tests.flaky')
+    def flaky(payload):
+        calls.append(payload)
+        if len(calls) < payload['succeed_on']:
+            raise RuntimeError("boom")
+        return {'calls': len(calls)}
+
+    yield calls
+    del jobs.TASKS['tests.flaky']
+
+
+def test_bulk_recategorize_can_run_in_the_background(api_client, user, condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    ids = [
+        Expense.objects.create(condominium=condominium, description=f"Item {i}", amount=Decimal("5.00"), date=date(2025, 1, 1)).pk
+        for i in range(3)
+    ]
+
+    response = api_client.post(
+        reverse('expense-bulk-recategorize'), {'ids': ids, 'category': limpeza.pk},
+        format='json', HTTP_PREFER='respond-async',
+    )
+
+    assert response.status_code == 202
+    job_url = reverse('job-detail', args=[response.data['id']])
+    assert response['Location'].endswith(job_url)
+    assert response.data['status'] == Job.QUEUED
+    assert not Expense.objects.filter(category=limpeza).exists()
+
+    job = jobs.run_next('test-worker')
+    assert job.status == Job.SUCCEEDED
+    assert Expense.objects.filter(category=limpeza).count() == 3
+    assert rollups.verify() == []
+
+    polled = api_client.get(job_url).data
+    assert polled['status'] == Job.SUCCEEDED
+    assert polled['result'] == {'dry_run': False, 'count': 3, 'ids': ids}
+    assert [item['id'] for item in api_client.get(reverse('job-list')).data] == [job.pk]
+
+
+def test_jobs_of_other_users_are_hidden(api_client, django_user_model):
+    other = django_user_model.objects.create_user(username="outro", password="senha-segura")
+    job = jobs.enqueue('rollups.rebuild', user=other)
+
+    assert api_client.get(reverse('job-detail', args=[job.pk])).status_code == 404
+    assert api_client.get(reverse('job-list')).data == []
+
+
+def test_failed_jobs_are_retried_with_backoff_then_fail(flaky_task, settings):
+    settings.GESTAO_JOB_RETRY_DELAY = 10
+    job = jobs.enqueue('tests.flaky', {'succeed_on': 5}, max_attempts=2)
+
+    job = jobs.run_next('test-worker')
+    assert job.status == Job.QUEUED
+    assert job.attempts == 1
+    assert 'RuntimeError: boom' in job.error
+    assert job.run_after > timezone.now() + datetime.timedelta(seconds=5)
+    # Ainda não chegou a hora da nova tentativa
+    assert jobs.run_next('test-worker') is None
+
+    Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+    job = jobs.run_next('test-worker')
+    assert job.status == Job.FAILED
+    assert job.attempts == 2
+    assert len(flaky_task) == 2
+
+
+def test_stale_running_jobs_go_back_to_the_queue():
+    job = jobs.enqueue('rollups.rebuild')
+    assert jobs.claim('dead-worker').pk == job.pk
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - datetime.timedelta(hours=1))
+
+    assert jobs.requeue_stale(timeout=60) == 1
+    job.refresh_from_db()
+    assert job.status == Job.QUEUED
+    assert job.locked_by == ''
+
+
+
+def test_a_run_that_lost_its_claim_does_not_record_its_outcome():
+    job = jobs.enqueue('rollups.rebuild')
+    runs = []
+
+    @jobs.task('tests.slow')
+    def slow(payload):
+        runs.append(len(runs) + 1)
+        if len(runs) == 1:
+            # Enquanto roda, o job é dado como perdido e o mesmo worker o pega de novo
+            Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - datetime.timedelta(hours=1))
+            jobs.requeue_stale(timeout=60)
+            assert jobs.claim('same-worker').attempts == 2
+        return {'run': runs[-1]}
+
+    try:
+        Job.objects.filter(pk=job.pk).update(task='tests.slow')
+        assert jobs.claim('same-worker').attempts == 1
+        assert jobs.execute(job.pk) == Job.RUNNING
+        job.refresh_from_db()
+        assert (job.status, job.attempts, job.result) == (Job.RUNNING, 2, None)
+
+        # A segunda execução ainda é dona do job e grava o resultado dela
+        assert jobs.execute(job.pk) == Job.SUCCEEDED
+        job.refresh_from_db()
+        assert job.result == {'run': 2}
+    finally:
+        del jobs.TASKS['tests.slow']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_running_jobs_refresh_their_lock(settings, django_db_blocker):
+    settings.GESTAO_JOB_HEARTBEAT = 0.05
+    job = jobs.enqueue('rollups.rebuild')
+    claimed_at = jobs.claim('busy-worker').locked_at
+
+    with django_db_blocker.unblock(), jobs._heartbeat(Job.objects.filter(pk=job.pk)):
+        time.sleep(0.3)
+
+    job.refresh_from_db()
+    assert job.locked_at > claimed_at
+    assert jobs.requeue_stale(timeout=60) == 0
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_worker_command_drains_the_queue(flaky_task, django_db_blocker):
+    queued = [jobs.enqueue('tests.flaky', {'succeed_on': 1}) for _ in range(4)]
+
+    # Uma thread só: o SQLite em memória dos testes trava a tabela inteira
+    with django_db_blocker.unblock():
+        call_command('run_worker', '--burst', '--concurrency', '1', '--poll-interval', '0.01')
+
+    assert set(Job.objects.filter(pk__in=[job.pk for job in queued]).values_list('status', flat=True)) == {
+        Job.SUCCEEDED
+    }
+    assert len(flaky_task) == 4
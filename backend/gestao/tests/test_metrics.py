@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from gestao.metrics import registry
+from gestao.models import Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def metrics_enabled(settings):
+    settings.GESTAO_REQUEST_METRICS = True
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def test_server_timing_header_and_metrics_endpoint(metrics_enabled, admin_user, condominium):
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"))
+
+    response = client.get(reverse('homepage-summary'))
+    assert 'db;dur=' in response['Server-Timing']
+    # As duas do payload + a resolução do condomínio (depois fica em cache)
+    assert 'desc="3 queries"' in response['Server-Timing']
+
+    metrics = client.get(reverse('request-metrics')).data
+    stats = metrics['views']['homepage-summary']
+    assert metrics['enabled'] is True
+    assert stats['count'] == 1
+    assert stats['avg_queries'] == 3
+    assert stats['slowest_sql'].startswith('SELECT')
+
+
+def test_metrics_disabled_by_default(api_client):
+    response = api_client.get(reverse('homepage-summary'))
+    assert not response.has_header('Server-Timing')
+
+
+def test_metrics_endpoint_requires_staff(api_client):
+    assert api_client.get(reverse('request-metrics')).status_code == 403
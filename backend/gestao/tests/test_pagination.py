@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from gestao.models import Expense
+from gestao.pagination import encode_cursor_token
+
+pytestmark = pytest.mark.django_db
+
+
+def _create_expenses(condominium, count, start=date(2025, 1, 1)):
+    # Duas despesas por dia para exercitar o desempate por id
+    return [
+        Expense.objects.create(condominium=condominium, description=f"Gasto {i}", amount=Decimal("1.00"), date=start + timedelta(days=i // 2))
+        for i in range(count)
+    ]
+
+
+def _ids(response):
+    return [item['id'] for item in response.data['results']]
+
+
+def test_keyset_pages_cover_all_rows_in_order(api_client, condominium):
+    _create_expenses(condominium, 7)
+    expected = list(Expense.objects.order_by('-date', '-id').values_list('id', flat=True))
+
+    seen = []
+    url = reverse('expense-list-create') + '?page_size=3'
+    while url:
+        response = api_client.get(url)
+        assert response.status_code == 200
+        seen += _ids(response)
+        url = response.data['next']
+
+    assert seen == expected
+
+
+def test_cursor_is_stable_under_concurrent_inserts(api_client, condominium):
+    _create_expenses(condominium, 6)
+    first = api_client.get(reverse('expense-list-create') + '?page_size=2')
+    second_page_ids = _ids(api_client.get(first.data['next']))
+
+    # Novas despesas (mais recentes) não deslocam a página já emitida
+    Expense.objects.create(condominium=condominium, description="Nova", amount=Decimal("9.00"), date=date(2026, 1, 1))
+    again = api_client.get(first.data['next'])
+
+    assert _ids(again) == second_page_ids
+    previous = api_client.get(again.data['previous'])
+    assert _ids(previous) == _ids(first)
+
+
+@pytest.mark.parametrize('cursor', [
+    'bm90LWpzb24',
+    encode_cursor_token([None, None]),
+    encode_cursor_token([5, 1]),
+    encode_cursor_token([['x'], 1]),
+    encode_cursor_token(['2025-01-01', {'id': 1}]),
+])
+def test_invalid_cursor_returns_404(api_client, condominium, cursor):
+    _create_expenses(condominium, 2)
+    response = api_client.get(reverse('expense-list-create'), {'cursor': cursor})
+    assert response.status_code == 404
@@ -0,0 +1,87 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+
+from gestao import partitioning
+from gestao.benchmarks.partitioning import compare_partitioning, scanned_relations
+from gestao.models import Expense
+
+pytestmark = pytest.mark.django_db
+
+postgres_only = pytest.mark.skipif(connection.vendor != 'postgresql', reason="Postgres only")
+
+
+def test_partition_bounds_are_half_open_years():
+    assert partitioning.partition_name(2025) == 'gestao_expense_y2025'
+    assert partitioning.partition_bounds(2025) == (date(2025, 1, 1), date(2026, 1, 1))
+
+
+@pytest.mark.skipif(connection.vendor == 'postgresql', reason="Fallback de bancos sem particionamento")
+def test_plain_table_fallback(capsys):
+    call_command('partition_expenses')
+
+    assert "stays a plain table" in capsys.readouterr().out
+    assert partitioning.ensure_future_partitions() == []
+    assert 'skipped' in compare_partitioning()
+    with pytest.raises(CommandError):
+        call_command('partition_expenses', '--convert')
+
+
+@postgres_only
+def test_convert_keeps_rows_and_prunes_by_date(condominium):
+    old = Expense.objects.create(condominium=condominium, description="Antiga", amount=Decimal("1.00"), date=date(2019, 5, 1))
+    Expense.objects.create(condominium=condominium, description="Nova", amount=Decimal("2.00"), date=date.today())
+
+    assert partitioning.convert()
+    created = Expense.objects.create(condominium=condominium, description="Depois", amount=Decimal("3.00"), date=date.today())
+
+    assert created.pk > old.pk
+    assert Expense.objects.count() == 3
+    this_year = Expense.objects.filter(date__gte=date(date.today().year, 1, 1))
+    assert scanned_relations(this_year) == [partitioning.partition_name(date.today().year)]
+
+    assert partitioning.revert()
+    assert Expense.objects.count() == 3
+
+
+def _migrate(target):
+    executor = MigrationExecutor(connection)
+    executor.migrate(target or executor.loader.graph.leaf_nodes())
+    return executor.loader.project_state(target).apps if target else None
+
+
+@postgres_only
+@pytest.mark.django_db(transaction=True)
+def test_later_migrations_apply_to_a_converted_table():
+    before_tenancy = [('gestao', '0010_recurring_expense')]
+    old_apps = _migrate(before_tenancy)
+    try:
+        OldExpense = old_apps.get_model('gestao', 'Expense')
+        OldExpense.objects.create(description="Antiga", amount=Decimal("1.00"), date=date(2019, 5, 1))
+        OldExpense.objects.create(description="Nova", amount=Decimal("2.00"), date=date.today())
+        assert partitioning.convert()
+
+        # 0011 (chave do condomínio, NOT NULL, índices) e 0012 (fingerprint) sobre a tabela particionada
+        _migrate(None)
+
+        assert partitioning.is_partitioned()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT indexname FROM pg_indexes WHERE tablename = %s', [partitioning.TABLE])
+            indexes = {name for name, in cursor.fetchall()}
+        assert {'gestao_exp_condo_date_id_idx', 'gestao_exp_condo_fprint_idx', 'gestao_exp_desc_prefix_idx'} <= indexes
+        assert set(Expense.objects.values_list('condominium__slug', flat=True)) == {'condominio'}
+        assert '' not in set(Expense.objects.values_list('fingerprint', flat=True))
+        condominium = Expense.objects.first().condominium
+        Expense.objects.create(condominium=condominium, description="Depois", amount=Decimal("3.00"), date=date.today())
+
+        assert partitioning.revert()
+        assert Expense.objects.count() == 3
+    finally:
+        if partitioning.is_partitioned():
+            partitioning.revert()
+        _migrate(None)
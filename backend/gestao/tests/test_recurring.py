@@ -0,0 +1,108 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError
+
+from gestao import rollups
+from gestao.models import Category, Expense, RecurringExpense, RecurringExpenseOccurrence
+from gestao.recurring import generate, occurrence_dates
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def salary(condominium):
+    category = Category.objects.create(condominium=condominium, name="Salários")
+    return RecurringExpense.objects.create(
+        condominium=condominium,
+        description="Salário do zelador", amount=Decimal("2500.00"), category=category,
+        start_date=date(2025, 10, 31),
+    )
+
+
+def test_occurrence_dates_clamp_to_the_end_of_shorter_months():
+    template = RecurringExpense(start_date=date(2025, 1, 31), cadence=RecurringExpense.MONTHLY)
+
+    assert occurrence_dates(template, date(2025, 4, 30)) == [
+        date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30),
+    ]
+    assert occurrence_dates(template, date(2025, 4, 30), after=date(2025, 2, 28)) == [
+        date(2025, 3, 31), date(2025, 4, 30),
+    ]
+
+
+def test_occurrence_dates_follow_the_cadence_and_end_date():
+    template = RecurringExpense(
+        start_date=date(2024, 2, 10), end_date=date(2025, 5, 9), cadence=RecurringExpense.QUARTERLY,
+    )
+
+    assert occurrence_dates(template, date(2026, 1, 1), after=date(2024, 9, 1)) == [
+        date(2024, 11, 10), date(2025, 2, 10),
+    ]
+
+
+def test_generate_backfills_every_due_occurrence_once(salary, condominium):
+    yearly = RecurringExpense.objects.create(
+        condominium=condominium,
+        description="Seguro", amount=Decimal("1200.00"), cadence=RecurringExpense.YEARLY,
+        start_date=date(2025, 3, 1),
+    )
+    RecurringExpense.objects.create(condominium=condominium, description="Futuro", amount=Decimal("10.00"), start_date=date(2027, 1, 1))
+
+    assert generate(date(2026, 2, 15), batch_size=1) == (2, 5)
+
+    generated = Expense.objects.order_by('date')
+    assert [(expense.description, expense.date) for expense in generated] == [
+        ("Seguro", date(2025, 3, 1)),
+        ("Salário do zelador", date(2025, 10, 31)),
+        ("Salário do zelador", date(2025, 11, 30)),
+        ("Salário do zelador", date(2025, 12, 31)),
+        ("Salário do zelador", date(2026, 1, 31)),
+    ]
+    assert all(expense.change_seq > 0 for expense in generated)
+    assert rollups.verify() == []
+    assert yearly.occurrences.get().expense_id == Expense.objects.get(description="Seguro").pk
+
+    # Rodar de novo não duplica; apagar uma despesa gerada não a traz de volta
+    Expense.objects.filter(date=date(2025, 11, 30)).delete()
+    assert generate(date(2026, 2, 15)) == (0, 0)
+    assert generate(date(2026, 3, 31)) == (2, 3)
+    assert Expense.objects.filter(date__gte=date(2026, 2, 1)).count() == 3
+    salary.refresh_from_db()
+    assert salary.generated_through == date(2026, 3, 31)
+
+
+def test_generate_skips_periods_already_generated_after_the_start_date_changes(condominium):
+    cleaning = RecurringExpense.objects.create(
+        condominium=condominium,
+        description="Limpeza", amount=Decimal("800.00"), start_date=date(2025, 10, 5),
+    )
+    generate(date(2025, 10, 10))
+    cleaning.refresh_from_db()
+    cleaning.start_date = date(2025, 10, 20)
+    cleaning.save()
+
+    assert generate(date(2025, 11, 30)) == (1, 1)
+    assert list(cleaning.occurrences.values_list('period', flat=True)) == [date(2025, 10, 1), date(2025, 11, 1)]
+    assert list(Expense.objects.order_by('date').values_list('date', flat=True)) == [
+        date(2025, 10, 5), date(2025, 11, 20),
+    ]
+
+
+def test_occurrence_period_is_unique_per_template(salary):
+    RecurringExpenseOccurrence.objects.create(template=salary, period=date(2025, 10, 1), expense_id=1)
+
+    with pytest.raises(IntegrityError):
+        RecurringExpenseOccurrence.objects.create(template=salary, period=date(2025, 10, 1), expense_id=2)
+
+
+def test_generate_recurring_expenses_command(salary):
+    out = StringIO()
+
+    call_command('generate_recurring_expenses', '--through', '2025-12-31', stdout=out)
+
+    assert "Generated 3 expense(s) from 1 recurring template(s)." in out.getvalue()
+    assert Expense.objects.filter(category=salary.category).count() == 3
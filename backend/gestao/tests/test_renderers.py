@@ -0,0 +1,127 @@
+import gzip
+import json
+import zlib
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from gestao.models import Category, Expense
+from gestao.renderers import to_columnar
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def expenses(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Conta de luz", amount=Decimal("120.50"), date=date(2025, 2, 1))
+    Expense.objects.create(condominium=condominium, description="Faxina", amount=Decimal("80.00"), date=date(2025, 1, 1), category=limpeza)
+
+
+@pytest.fixture
+def full_page(condominium):
+    # Corpo grande o bastante para a compressão sempre compensar
+    for i in range(40):
+        Expense.objects.create(condominium=condominium, description=f"Despesa {i}", amount=Decimal("10.00"), date=date(2025, 1, 1))
+
+
+def test_to_columnar_names_each_field_once():
+    assert to_columnar([{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]) == {
+        'length': 2, 'columns': {'id': [1, 2], 'name': ['a', 'b']},
+    }
+    assert to_columnar([]) == {'length': 0, 'columns': {}}
+
+
+def test_expense_list_columnar_is_opt_in(api_client, expenses):
+    url = reverse('expense-list-create')
+    default = api_client.get(url)
+    assert default['Content-Type'] == 'application/json'
+
+    response = api_client.get(url, HTTP_ACCEPT='application/vnd.domu.columnar+json')
+    assert response['Content-Type'].startswith('application/vnd.domu.columnar+json')
+    results = json.loads(response.content)['results']
+    assert results['length'] == 2
+    assert results['columns']['description'] == ["Conta de luz", "Faxina"]
+    assert results['columns']['amount'] == ["120.50", "80.00"]
+    assert results['columns']['category_name'] == [None, "Limpeza"]
+
+    assert json.loads(api_client.get(url, {'format': 'columnar'}).content)['results'] == results
+
+
+def test_expense_list_messagepack(api_client, expenses):
+    msgpack = pytest.importorskip('msgpack')
+    response = api_client.get(reverse('expense-list-create'), HTTP_ACCEPT='application/msgpack')
+    assert response['Content-Type'] == 'application/msgpack'
+    payload = msgpack.unpackb(response.content)
+    assert payload['results'] == json.loads(api_client.get(reverse('expense-list-create')).content)['results']
+
+
+def test_large_responses_are_gzipped_and_small_ones_left_alone(api_client, full_page, settings):
+    settings.GESTAO_COMPRESSION_MIN_SIZE = 1024
+    url = reverse('expense-list-create')
+    plain = api_client.get(url).content
+
+    response = api_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    assert gzip.decompress(response.content) == plain
+
+    small = api_client.get(url, {'page_size': 1}, HTTP_ACCEPT_ENCODING='gzip')
+    assert not small.has_header('Content-Encoding')
+
+
+def test_brotli_is_preferred_when_accepted(api_client, full_page, settings):
+    brotli = pytest.importorskip('brotli')
+    settings.GESTAO_COMPRESSION_MIN_SIZE = 0
+    url = reverse('expense-list-create')
+    response = api_client.get(url, HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+    assert response['Content-Encoding'] == 'br'
+    assert brotli.decompress(response.content) == api_client.get(url).content
+
+    response = api_client.get(url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+    assert response['Content-Encoding'] == 'gzip'
+
+
+def test_weak_etag_from_compression_still_revalidates(api_client, expenses, settings):
+    settings.GESTAO_COMPRESSION_MIN_SIZE = 0
+    url = reverse('expense-summary')
+    response = api_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+    assert response['ETag'].startswith('W/')
+
+    revalidated = api_client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+    assert revalidated.status_code == 304
+
+
+def test_html_never_gets_brotli(admin_client, full_page, settings):
+    pytest.importorskip('brotli')
+    settings.GESTAO_COMPRESSION_MIN_SIZE = 0
+
+    # O admin carrega o token CSRF: só o gzip com preenchimento aleatório do Django
+    response = admin_client.get(reverse('admin:gestao_expense_changelist'), {'q': 'Despesa'},
+                                HTTP_ACCEPT_ENCODING='gzip, br')
+    assert response['Content-Encoding'] == 'gzip'
+    assert b'csrfmiddlewaretoken' in gzip.decompress(response.content)
+
+
+@pytest.mark.parametrize('encoding', ['gzip', 'br'])
+def test_streamed_chunks_are_flushed_one_by_one(api_client, encoding):
+    if encoding == 'br':
+        brotli = pytest.importorskip('brotli')
+        decompress = brotli.Decompressor().process
+    else:
+        decompress = zlib.decompressobj(wbits=31).decompress
+    body = ''.join(
+        json.dumps({'description': f"Conta {i}", 'amount': "10.00", 'date': f"2025-01-{i + 1:02d}"}) + '\n'
+        for i in range(3)
+    )
+
+    response = api_client.generic('POST', reverse('expense-bulk-import'), body,
+                                  content_type='application/x-ndjson', HTTP_ACCEPT_ENCODING=encoding)
+    assert response['Content-Encoding'] == encoding
+
+    # Cada linha de progresso sai inteira no seu pedaço, sem esperar o fim do corpo
+    chunks = iter(response.streaming_content)
+    assert json.loads(decompress(next(chunks)))['status'] == 'created'
+    assert json.loads(decompress(next(chunks)))['row'] == 2
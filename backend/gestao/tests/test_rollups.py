@@ -0,0 +1,75 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from gestao import rollups
+from gestao.models import Category, Expense, ExpenseMonthlyRollup
+
+pytestmark = pytest.mark.django_db
+
+
+def test_rollup_tracks_create_update_move_and_delete(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    obras = Category.objects.create(condominium=condominium, name="Obras")
+    expense = Expense.objects.create(
+        condominium=condominium,
+        description="Produtos", amount=Decimal("10.00"), date=date(2025, 1, 10), category=limpeza
+    )
+    Expense.objects.create(condominium=condominium, description="Vassoura", amount=Decimal("5.50"), date=date(2025, 1, 20), category=limpeza)
+    assert rollups.verify() == []
+
+    expense.amount = Decimal("12.00")
+    expense.category = obras
+    expense.date = date(2025, 2, 1)
+    expense.save()
+    assert rollups.verify() == []
+    row = ExpenseMonthlyRollup.objects.get(month=date(2025, 2, 1), category=obras)
+    assert (row.total, row.count) == (Decimal("12.00"), 1)
+
+    expense.delete()
+    assert rollups.verify() == []
+
+
+def test_rollup_moves_deleted_category_to_uncategorized(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Sem cat", amount=Decimal("1.00"), date=date(2025, 3, 1))
+    Expense.objects.create(condominium=condominium, description="Com cat", amount=Decimal("2.00"), date=date(2025, 3, 2), category=limpeza)
+
+    limpeza.delete()
+
+    assert rollups.verify() == []
+    row = ExpenseMonthlyRollup.objects.get(month=date(2025, 3, 1), category__isnull=True)
+    assert (row.total, row.count) == (Decimal("3.00"), 2)
+
+
+def test_summary_reads_rollup(api_client, condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Jan", amount=Decimal("100.00"), date=date(2025, 1, 15), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Fev", amount=Decimal("200.00"), date=date(2025, 2, 10))
+
+    limpeza.name = "Higiene"
+    limpeza.save()
+    response = api_client.get(reverse('expense-summary'))
+
+    assert response.status_code == 200
+    monthly = response.data['stacked_monthly_summary']
+    assert monthly['labels'] == ['2025-01', '2025-02']
+    assert [d['label'] for d in monthly['datasets']] == ['Higiene', 'Sem Categoria']
+    assert monthly['datasets'][0]['data'] == [100.0, 0]
+    assert response.data['category_summary'] == {
+        'labels': ['Sem Categoria', 'Higiene'],
+        'totals': [Decimal("200.00"), Decimal("100.00")],
+    }
+
+
+def test_rebuild_command_repairs_drift(condominium):
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"), date=date(2025, 4, 5))
+    ExpenseMonthlyRollup.objects.update(total=Decimal("1.00"))
+    assert rollups.verify() != []
+
+    call_command('rebuild_expense_rollup')
+
+    assert rollups.verify() == []
@@ -0,0 +1,32 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+
+from gestao.models import Category, Expense
+from gestao.serializers import ExpenseRowSerializer, ExpenseSerializer
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def expenses(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Produtos", amount=Decimal("10.5"), date=date(2025, 1, 10), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80"), date=date(2025, 2, 1))
+    return Expense.objects.order_by('-date', '-id')
+
+
+def test_row_serializer_matches_model_serializer(expenses):
+    expected = ExpenseSerializer(expenses, many=True).data
+
+    assert ExpenseRowSerializer.many(ExpenseRowSerializer.rows(expenses)) == expected
+
+
+def test_expense_list_uses_a_single_joined_query(api_client, expenses, django_assert_num_queries):
+    # A lista + a resolução do condomínio, feita uma vez por usuário e depois cacheada
+    with django_assert_num_queries(2):
+        response = api_client.get(reverse('expense-list-create'))
+
+    assert response.data['results'][1]['category_name'] == "Limpeza"
@@ -0,0 +1,147 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from gestao import sync
+from gestao.importers import ExpenseImporter
+from gestao.models import Category, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def settled_at_once(settings):
+    # Aqui cada escrita termina antes da leitura; a janela tem testes próprios abaixo
+    settings.GESTAO_SYNC_SETTLE_SECONDS = 0
+
+
+def fetch(api_client, token=None, **params):
+    if token:
+        params['since'] = token
+    response = api_client.get(reverse('sync'), params)
+    assert response.status_code == 200
+    return response.data
+
+
+def test_sync_returns_only_changes_after_the_token(api_client, condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    luz = Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"), date=date(2025, 1, 5))
+    agua = Expense.objects.create(condominium=condominium, description="Água", amount=Decimal("20.00"), date=date(2025, 1, 6))
+
+    first = fetch(api_client)
+    assert [c['name'] for c in first['categories']] == ["Limpeza"]
+    assert [e['id'] for e in first['expenses']] == [luz.pk, agua.pk]
+
+    assert fetch(api_client, first['next'])['expenses'] == []
+
+    luz.amount = Decimal("90.00")
+    luz.save()
+    agua_id, limpeza_id = agua.pk, limpeza.pk
+    agua.delete()
+    limpeza.delete()
+
+    delta = fetch(api_client, first['next'])
+    assert [(e['id'], e['amount']) for e in delta['expenses']] == [(luz.pk, "90.00")]
+    assert delta['deleted'] == {'categories': [limpeza_id], 'expenses': [agua_id]}
+
+
+def test_deleting_a_category_puts_its_expenses_in_the_feed(api_client, condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    expense = Expense.objects.create(condominium=condominium, description="Produtos", amount=Decimal("5.00"), category=limpeza)
+    token = fetch(api_client)['next']
+
+    limpeza.delete()
+
+    delta = fetch(api_client, token)
+    assert [(e['id'], e['category']) for e in delta['expenses']] == [(expense.pk, None)]
+
+
+def test_renaming_a_category_puts_its_expenses_in_the_feed(api_client, condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    expense = Expense.objects.create(condominium=condominium, description="Produtos", amount=Decimal("5.00"), category=limpeza)
+    Expense.objects.create(condominium=condominium, description="Luz", amount=Decimal("80.00"))
+    token = fetch(api_client)['next']
+
+    limpeza.monthly_budget = Decimal("100.00")
+    limpeza.save()
+    assert fetch(api_client, token)['expenses'] == []
+
+    limpeza.name = "Higiene"
+    limpeza.save()
+
+    delta = fetch(api_client, token)
+    assert [c['name'] for c in delta['categories']] == ["Higiene"]
+    assert [(e['id'], e['category_name']) for e in delta['expenses']] == [(expense.pk, "Higiene")]
+
+
+def test_pages_resume_inside_a_bulk_write(api_client, condominium):
+    importer = ExpenseImporter(condominium)
+    list(importer.run({'description': f"Item {i}", 'amount': "1.00", 'category': "Obras"} for i in range(5)))
+    ids = sorted(Expense.objects.values_list('pk', flat=True))
+
+    seen, token, has_more = [], None, True
+    while has_more:
+        page = fetch(api_client, token, limit=2)
+        seen += [e['id'] for e in page['expenses']]
+        token, has_more = page['next'], page['has_more']
+
+    assert sorted(seen) == ids
+    assert len(set(seen)) == len(seen)
+
+
+def test_touch_gives_each_row_a_new_change_number(condominium):
+    expenses = [Expense.objects.create(condominium=condominium, description=f"D{i}", amount=Decimal("1.00")) for i in range(3)]
+    before = max(e.change_seq for e in expenses)
+
+    assert sync.touch(Expense.objects.all(), description="Revisado") == 3
+
+    numbers = list(Expense.objects.values_list('change_seq', flat=True))
+    assert len(set(numbers)) == 3
+    assert min(numbers) > before
+
+
+def test_invalid_token_is_rejected(api_client):
+    response = api_client.get(reverse('sync'), {'since': 'not-a-token'})
+    assert response.status_code == 400
+
+
+def _settle(queryset):
+    queryset.update(updated_at=timezone.now() - timedelta(minutes=5))
+
+
+def test_token_waits_for_a_transaction_that_commits_out_of_order(api_client, condominium, settings):
+    settings.GESTAO_SYNC_SETTLE_SECONDS = 60
+    old = Expense.objects.create(condominium=condominium, description="Antiga", amount=Decimal("1.00"))
+    _settle(Expense.objects.all())
+    # A transação lenta pega o número primeiro e só grava depois da rápida
+    slow = Expense(condominium=condominium, description="Lenta", amount=Decimal("2.00"), date=date(2025, 1, 5))
+    sync.stamp([slow])
+    fast = Expense.objects.create(condominium=condominium, description="Rápida", amount=Decimal("3.00"))
+
+    first = fetch(api_client)
+    assert [e['id'] for e in first['expenses']] == [old.pk, fast.pk]
+    assert sync.decode_token(first['next']) == (old.change_seq, sync.EXPENSES, old.pk)
+
+    Expense.objects.bulk_create([slow])
+    second = fetch(api_client, first['next'])
+    assert [e['id'] for e in second['expenses']] == [slow.pk, fast.pk]
+
+    _settle(Expense.objects.all())
+    third = fetch(api_client, second['next'])
+    assert [e['id'] for e in third['expenses']] == [slow.pk, fast.pk]
+    assert fetch(api_client, third['next'])['expenses'] == []
+
+
+def test_unsettled_pages_do_not_ask_for_more(api_client, condominium, settings):
+    settings.GESTAO_SYNC_SETTLE_SECONDS = 60
+    for i in range(3):
+        Expense.objects.create(condominium=condominium, description=f"D{i}", amount=Decimal("1.00"))
+
+    page = fetch(api_client, limit=2)
+
+    assert len(page['expenses']) == 2
+    assert page['has_more'] is False
+    assert sync.decode_token(page['next']) == (0, -1, 0)
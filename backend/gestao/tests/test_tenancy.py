@@ -0,0 +1,119 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from gestao import rollups
+from gestao.models import Category, Condominium, Expense
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def neighbour():
+    """Outro condomínio do mesmo banco, com dados próprios."""
+    condominium = Condominium.objects.create(name="Edifício Boreal", slug="boreal")
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    Expense.objects.create(condominium=condominium, description="Vizinho", amount=Decimal("999.00"),
+                           date=date(2025, 1, 3), category=limpeza)
+    return condominium
+
+
+@pytest.fixture
+def ledger(condominium):
+    limpeza = Category.objects.create(condominium=condominium, name="Limpeza")
+    return Expense.objects.create(condominium=condominium, description="Faxina", amount=Decimal("80.00"),
+                                  date=date(2025, 1, 5), category=limpeza)
+
+
+def test_every_view_only_sees_the_request_condominium(api_client, ledger, neighbour):
+    expenses = api_client.get(reverse('expense-list-create')).data['results']
+    assert [expense['description'] for expense in expenses] == ["Faxina"]
+    assert [category['name'] for category in api_client.get(reverse('category-list')).data] == ["Limpeza"]
+
+    summary = api_client.get(reverse('expense-summary'), {'output': 'series'}).data
+    assert [(entry['category'], entry['total']) for entry in summary['series']] == [("Limpeza", "80.00")]
+    sync = api_client.get(reverse('sync')).data
+    assert [expense['id'] for expense in sync['expenses']] == [ledger.pk]
+
+    other = Expense.objects.get(condominium=neighbour)
+    assert api_client.get(reverse('expense-detail', args=[other.pk])).status_code == 404
+    assert api_client.delete(reverse('expense-detail', args=[other.pk])).status_code == 404
+    delete = api_client.post(reverse('expense-bulk-delete'), {'ids': [other.pk, ledger.pk]}, format='json')
+    assert delete.data['ids'] == [ledger.pk]
+    assert Expense.objects.filter(pk=other.pk).exists()
+    assert rollups.verify() == []
+
+
+def test_header_selects_among_the_user_condominiums(api_client, user, ledger, neighbour):
+    neighbour.members.add(user)
+    url = reverse('expense-list-create')
+
+    # Com mais de um condomínio, é preciso dizer qual
+    assert api_client.get(url).status_code == 400
+    by_slug = api_client.get(url, HTTP_X_CONDOMINIUM='boreal').data['results']
+    by_id = api_client.get(url, HTTP_X_CONDOMINIUM=str(neighbour.pk)).data['results']
+    assert [e['description'] for e in by_slug] == [e['description'] for e in by_id] == ["Vizinho"]
+    assert api_client.get(url, HTTP_X_CONDOMINIUM='inexistente').status_code == 404
+
+
+def test_condominium_list_offers_what_the_header_accepts(api_client, user, neighbour):
+    Condominium.objects.create(name="Edifício Cedro", slug="cedro")
+    neighbour.members.add(user)
+
+    response = api_client.get(reverse('condominium-list'))
+    assert [(c['slug'], c['name']) for c in response.data] == [
+        ('boreal', "Edifício Boreal"), ('aurora', "Residencial Aurora"),
+    ]
+    # Staff alcança todos
+    staff = APIClient()
+    staff.force_authenticate(get_user_model().objects.create_user(username="gestor", is_staff=True))
+    assert [c['slug'] for c in staff.get(reverse('condominium-list')).data] == ['boreal', 'cedro', 'aurora']
+
+
+def test_users_without_a_condominium_are_forbidden(api_client, user, condominium):
+    condominium.members.remove(user)
+
+    assert api_client.get(reverse('expense-list-create')).status_code == 403
+
+
+def test_category_names_are_unique_per_condominium(api_client, condominium, neighbour):
+    url = reverse('category-list')
+
+    assert api_client.post(url, {'name': "Limpeza"}).status_code == 201
+    duplicate = api_client.post(url, {'name': "Limpeza"})
+    assert duplicate.status_code == 400
+    assert 'name' in duplicate.data
+    assert Category.objects.filter(name="Limpeza").count() == 2
+    with pytest.raises(IntegrityError):
+        Category.objects.create(condominium=condominium, name="Limpeza")
+
+
+def test_expenses_cannot_use_another_condominium_category(api_client, condominium, neighbour):
+    foreign = Category.objects.get(condominium=neighbour)
+
+    response = api_client.post(reverse('expense-list-create'), {
+        'description': "Produtos", 'amount': "12.00", 'date': "2025-02-01", 'category': foreign.pk,
+    })
+
+    assert response.status_code == 400
+    assert 'category' in response.data
+    created = api_client.post(reverse('expense-list-create'), {
+        'description': "Produtos", 'amount': "12.00", 'date': "2025-02-01",
+    })
+    assert Expense.objects.get(pk=created.data['id']).condominium == condominium
+
+
+def test_cached_payloads_are_versioned_per_condominium(api_client, condominium, ledger, neighbour):
+    url = reverse('expense-summary')
+    etag = api_client.get(url)['ETag']
+
+    Expense.objects.create(condominium=neighbour, description="Outro", amount=Decimal("1.00"))
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    Expense.objects.create(condominium=condominium, description="Nosso", amount=Decimal("1.00"))
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
@@ -1,19 +1,47 @@
 from django.urls import path
+from .async_views import AsyncExpenseSummaryView, AsyncHomePageSummaryView
 from .views import (
     ExpenseListCreateAPIView, 
+    ExpenseBulkDeleteView,
+    ExpenseBulkImportView,
+    ExpenseBulkRecategorizeView,
+    ExpenseExportView,
+    ExpenseForecastView,
     ExpenseSummaryView, 
     ExpenseRetrieveUpdateDestroyAPIView,
     CategoryListCreateView,
     CategoryRetrieveUpdateDestroyView,
-    HomePageSummaryView
+    CondominiumListView,
+    DashboardBundleView,
+    HomePageSummaryView,
+    JobDetailView,
+    JobListView,
+    RequestMetricsView,
+    SyncView,
 )
 
 urlpatterns = [
     path("expenses/", ExpenseListCreateAPIView.as_view(), name="expense-list-create"),
+    path("expenses/bulk/", ExpenseBulkImportView.as_view(), name="expense-bulk-import"),
+    path("expenses/bulk/recategorize/", ExpenseBulkRecategorizeView.as_view(), name="expense-bulk-recategorize"),
+    path("expenses/bulk/delete/", ExpenseBulkDeleteView.as_view(), name="expense-bulk-delete"),
+    path("expenses/export/", ExpenseExportView.as_view(), name="expense-export"),
     path("expenses/summary/", ExpenseSummaryView.as_view(), name="expense-summary"),
+    path("expenses/forecast/", ExpenseForecastView.as_view(), name="expense-forecast"),
     path("expenses/<int:pk>/", ExpenseRetrieveUpdateDestroyAPIView.as_view(), name="expense-detail"),
 
     path("categories/", CategoryListCreateView.as_view(), name="category-list"),
     path("categories/<int:pk>/", CategoryRetrieveUpdateDestroyView.as_view(), name="category-detail"),
+    path("condominiums/", CondominiumListView.as_view(), name="condominium-list"),
     path("homepage-summary/",  HomePageSummaryView.as_view(), name="homepage-summary"),
+    path("sync/", SyncView.as_view(), name="sync"),
+    path("bundle/", DashboardBundleView.as_view(), name="dashboard-bundle"),
+    path("jobs/", JobListView.as_view(), name="job-list"),
+    path("jobs/<int:pk>/", JobDetailView.as_view(), name="job-detail"),
+
+    # Variantes assíncronas (para deploy ASGI, ver backend/asgi.py)
+    path("async/expenses/summary/", AsyncExpenseSummaryView.as_view(), name="expense-summary-async"),
+    path("async/homepage-summary/", AsyncHomePageSummaryView.as_view(), name="homepage-summary-async"),
+
+    path("_metrics/", RequestMetricsView.as_view(), name="request-metrics"),
 ]
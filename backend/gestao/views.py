@@ -1,18 +1,62 @@
 import datetime
+import json
 from decimal import Decimal
-from collections import defaultdict
+from asgiref.sync import sync_to_async
 from rest_framework import generics
-from rest_framework.views import APIView
+from rest_framework.exceptions import UnsupportedMediaType, ValidationError
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from django.db.models import Sum, Value, DecimalField
-from django.db.models.functions import TruncMonth, Coalesce
+from rest_framework.views import APIView
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, Sum
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 
-from .models import Expense, Category
-from .serializers import ExpenseSerializer, CategorySerializer
+from . import aggregation, bulk, bundle, forecast, jobs, sync, tenancy
+from .authentication import token_cache
+from .cache import cached_response
+from .exporters import ENCODERS as EXPORT_ENCODERS, iter_export_rows
+from .filters import ExpenseFilterBackend
+from .importers import CONTENT_TYPES, ExpenseImporter, iter_records, iter_text_lines
+from .metrics import registry as metrics_registry
+from .models import Expense, Category, Job
+from .pagination import KeysetPagination
+from .renderers import CSVRenderer, NDJSONRenderer, get_large_payload_renderers
+from .serializers import (
+    CategorySerializer,
+    CondominiumSerializer,
+    ExpenseBulkActionSerializer,
+    ExpenseRecategorizeSerializer,
+    ExpenseRowSerializer,
+    ExpenseSerializer,
+    JobSerializer,
+)
+from .tenancy import CondominiumScopedMixin, get_condominium
+
+
+async def _aiter_in_thread(chunks):
+    # Um next() por vez na thread da view (mesma conexão, mesmo cursor)
+    chunks = iter(chunks)
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    done = object()
+    while (chunk := await next_chunk(chunks, done)) is not done:
+        yield chunk
+
+
+def streaming_response(request, chunks, **kwargs):
+    """
+    StreamingHttpResponse over a sync iterator that stays streamed under
+    ASGI too: Django would otherwise read the whole iterator into a list
+    before sending the first byte.
+    """
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        chunks = _aiter_in_thread(chunks)
+    return StreamingHttpResponse(chunks, **kwargs)
 
 
-class CategoryListCreateView(generics.ListCreateAPIView):
+class CategoryListCreateView(CondominiumScopedMixin, generics.ListCreateAPIView):
     """
     API View to list (GET) and create (POST) categories.
     """
@@ -20,145 +64,344 @@ class CategoryListCreateView(generics.ListCreateAPIView):
     serializer_class = CategorySerializer
     # pagination_class = None
 
-class CategoryRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class CategoryRetrieveUpdateDestroyView(CondominiumScopedMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
-class ExpenseListCreateAPIView(generics.ListCreateAPIView):
-    queryset = Expense.objects.all().order_by("-date")
+class ExpenseListCreateAPIView(CondominiumScopedMixin, generics.ListCreateAPIView):
+    queryset = Expense.objects.all().order_by("-date", "-id")
     serializer_class = ExpenseSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [ExpenseFilterBackend]
+    # JSON por padrão; colunar e MessagePack sob demanda (Accept ou ?format=)
+    renderer_classes = get_large_payload_renderers()
+
+    def list(self, request, *args, **kwargs):
+        # Caminho rápido de leitura: uma consulta com JOIN em .values()
+        rows = ExpenseRowSerializer.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        return self.get_paginated_response(ExpenseRowSerializer.many(page))
+
+class ExpenseExportView(CondominiumScopedMixin, generics.GenericAPIView):
+    """
+    API View to export expenses (GET) as CSV (default) or NDJSON
+    (?format=ndjson or Accept header), with the same filters as the list.
+    The body is streamed straight from a database cursor.
+    """
+    queryset = Expense.objects.all().order_by("-date", "-id")
+    filter_backends = [ExpenseFilterBackend]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+
+    def get(self, request, format=None):
+        renderer = request.accepted_renderer
+        rows = iter_export_rows(self.filter_queryset(self.get_queryset()))
+        response = streaming_response(
+            request,
+            EXPORT_ENCODERS[renderer.format](rows),
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response['Content-Disposition'] = f'attachment; filename="expenses.{renderer.format}"'
+        return response
+
+class ExpenseBulkImportView(APIView):
+    """
+    API View to import many expenses at once (POST).
+    Accepts a CSV (text/csv) or NDJSON (application/x-ndjson) body, read row by
+    row, and streams back one NDJSON line per input row plus a final summary.
+    """
+    def post(self, request, format=None):
+        media_type = (request.content_type or '').split(';')[0].strip().lower()
+        data_format = CONTENT_TYPES.get(media_type)
+        if data_format is None:
+            raise UnsupportedMediaType(media_type)
+
+        importer = ExpenseImporter(get_condominium(request))
+        # Lê o corpo linha a linha direto do HttpRequest, sem carregá-lo inteiro
+        records = iter_records(iter_text_lines(request._request), data_format)
+
+        def stream_results():
+            for result in importer.run(records):
+                yield json.dumps(result, cls=DjangoJSONEncoder) + '\n'
+            summary = {'created': importer.created, 'errors': importer.failed}
+            yield json.dumps({'summary': summary}) + '\n'
+
+        return streaming_response(request, stream_results(), content_type='application/x-ndjson')
 
-class ExpenseRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
+class ExpenseBulkActionView(APIView):
+    """
+    Base for set-based bulk actions (POST): selects expenses by `ids` or
+    `filter`, runs the view's task on them and returns the affected ids.
+    With `Prefer: respond-async` (or ?async=true) the task is queued
+    instead and the response is a 202 pointing at the job.
+    """
+    serializer_class = ExpenseBulkActionSerializer
+    task = None
+
+    def post(self, request, format=None):
+        serializer = self.serializer_class(data=request.data, context={'condominium': get_condominium(request)})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        # Valida a seleção já aqui, também quando o trabalho vai para a fila
+        condominium = get_condominium(request)
+        bulk.get_selection(data, condominium)
+        payload = self.get_payload(data)
+        payload['condominium'] = condominium.pk
+        if jobs.wants_async(request):
+            job = jobs.enqueue(self.task, payload, user=request.user)
+            return jobs.accepted_response(request, job, JobSerializer(job).data)
+        return Response(jobs.TASKS[self.task](payload))
+
+    def get_payload(self, data):
+        """
+        The task payload: the selection and dry_run, as plain JSON.
+        """
+        payload = {key: data[key] for key in ('ids', 'filter') if key in data}
+        payload['dry_run'] = data['dry_run']
+        return payload
+
+
+class ExpenseBulkRecategorizeView(ExpenseBulkActionView):
+    """
+    API View moving many expenses to one category with a set-based UPDATE.
+    """
+    serializer_class = ExpenseRecategorizeSerializer
+    task = 'expenses.recategorize'
+
+    def get_payload(self, data):
+        payload = super().get_payload(data)
+        payload['category'] = data['category'].pk if data['category'] else None
+        return payload
+
+
+class ExpenseBulkDeleteView(ExpenseBulkActionView):
+    """
+    API View deleting many expenses with a set-based DELETE.
+    """
+    task = 'expenses.delete'
+
+class ExpenseRetrieveUpdateDestroyAPIView(CondominiumScopedMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
 
 class ExpenseSummaryView(APIView):
     """
-    API View that retrieves expense summary:
-    - Total by month
-    - Total by category
+    API View that retrieves the expense summary: totals per time bucket and
+    category, and totals per category. Query parameters (all optional):
+    granularity (day, week, month, quarter, year), date_from, date_to,
+    category, uncategorized, top and output (chartjs, series), see
+    gestao.aggregation.
+    Responses are cached per data version and parameters (see gestao.cache).
     """
     def get(self, request, format=None):
+        condominium = get_condominium(request)
+        query, output = self.parse_params(request.query_params, condominium)
+        return cached_response(
+            request, 'expense-summary', lambda: self.get_summary_data(query, output),
+            variant=f"{query.cache_variant}:{output}", condominium=condominium
+        )
 
-        monthly_category_query = Expense.objects \
-            .annotate(month=TruncMonth('date'),
-                      # Agrupa nulos como 'Sem Categoria'
-                      category_name_agg=Coalesce('category__name', Value('Sem Categoria'))) \
-            .values('month', 'category_name_agg') \
-            .annotate(total=Sum('amount')) \
-            .values('month', 'category_name_agg', 'total') \
-            .order_by('month', 'category_name_agg') # Ordena para processamento
-
-        datasets_by_category = defaultdict(lambda: defaultdict(float))
-        all_months_set = set()
-        all_categories_set = set()
-
-        for item in monthly_category_query:
-            # Ignora itens sem mês (não deveria acontecer com TruncMonth)
-            if not item['month']:
-                continue
-            month_str = item['month'].strftime('%Y-%m')
-            category_name = item['category_name_agg']
-            total = float(item['total'] or 0)
-
-            datasets_by_category[category_name][month_str] = total
-            all_months_set.add(month_str)
-            all_categories_set.add(category_name)
-
-        sorted_months = sorted(list(all_months_set))
-        sorted_categories = sorted(list(all_categories_set))
-
-        chartjs_datasets = []
-        colors = [
-          'rgba(255, 99, 132, 0.7)', 'rgba(54, 162, 235, 0.7)', 'rgba(255, 206, 86, 0.7)',
-          'rgba(75, 192, 192, 0.7)', 'rgba(153, 102, 255, 0.7)', 'rgba(255, 159, 64, 0.7)',
-          'rgba(199, 199, 199, 0.7)', 'rgba(83, 102, 255, 0.7)'
-        ]
-        color_index = 0
-        for category in sorted_categories:
-            # Para cada categoria, cria uma lista de valores para cada mês (0 se não houver gasto)
-            data_points = [datasets_by_category[category].get(month, 0) for month in sorted_months]
-            chartjs_datasets.append({
-                'label': category, # Nome da categoria vai na legenda
-                'data': data_points,
-                'backgroundColor': colors[color_index % len(colors)], # Pega uma cor da paleta
-            })
-            color_index += 1
-
-        stacked_monthly_summary_data = {
-            'labels': sorted_months, # Meses no eixo X
-            'datasets': chartjs_datasets # Um dataset por categoria
-        }
-
-        category_summary_query = Expense.objects \
-            .annotate(cat_name=Coalesce('category__name', Value('Sem Categoria'))) \
-            .values('cat_name') \
-            .annotate(total=Sum('amount')) \
-            .values('cat_name', 'total') \
-            .order_by('-total')
+    def get_summary_data(self, query, output='chartjs'):
+        return self.build_summary(query, list(query.get_queryset()), output)
 
-        category_labels = [item['cat_name'] for item in category_summary_query]
-        category_totals = [item['total'] or 0 for item in category_summary_query]
-
-        category_summary_data = {
-            'labels': category_labels,
-            'totals': category_totals
-        }
+    @staticmethod
+    def parse_params(params, condominium):
+        output = params.get('output', 'chartjs')
+        if output not in aggregation.FORMATS:
+            raise ValidationError({'output': f"Choose one of: {', '.join(aggregation.FORMATS)}."})
+        return aggregation.SummaryQuery.from_params(params, condominium), output
 
-        combined_data = {
-            'stacked_monthly_summary': stacked_monthly_summary_data,
-            'category_summary': category_summary_data # Mantém o de pizza
-        }
+    @staticmethod
+    def build_summary(query, rows, output='chartjs'):
+        """
+        Renders the rows of query.get_queryset() in the requested format.
+        Shared with the async variant in gestao.async_views.
+        """
+        return aggregation.FORMATS[output](query.build(rows))
 
-        return Response(combined_data)
+class ExpenseForecastView(APIView):
+    """
+    API View with the per-category budget and forecast figures: month to
+    date, burn rate, moving average, projected month and year end and
+    budget overrun flags. Query parameters (all optional): as_of, months
+    and window, see gestao.forecast.
+    Responses are cached per data version and parameters (see gestao.cache).
+    """
+    def get(self, request, format=None):
+        condominium = get_condominium(request)
+        query = forecast.ForecastQuery.from_params(request.query_params, condominium)
+        return cached_response(
+            request, 'expense-forecast', query.build, variant=query.cache_variant, condominium=condominium
+        )
 
 class HomePageSummaryView(APIView):
     """
     API View to retrieve summary data for logged home page.
+    Responses are cached per data version and month (see gestao.cache).
     """
     def get(self, request, format=None):
         now = timezone.now()
-        current_month = now.month
-        current_year = now.year
-
-        first_day_current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        last_day_previous_month = first_day_current_month - datetime.timedelta(days=1)
-        previous_month = last_day_previous_month.month
-        previous_month_year = last_day_previous_month.year
-
-        total_this_month = Expense.objects.filter(
-            date__year=current_year,
-            date__month=current_month
-        ).aggregate(
-            total=Coalesce(Sum('amount', output_field=DecimalField()), Decimal('0.00'))
-        )['total']
-
-        total_previous_month = Expense.objects.filter(
-            date__year=previous_month_year,
-            date__month=previous_month
-        ).aggregate(
-             total=Coalesce(Sum('amount', output_field=DecimalField()), Decimal('0.00'))
-        )['total']
-
-        top_category_this_month_data = Expense.objects.filter(
-            date__year=current_year,
-            date__month=current_month,
-            category__isnull=False
+        condominium = get_condominium(request)
+        return cached_response(
+            request, 'homepage-summary', lambda: self.get_summary_data(now, condominium),
+            variant=now.strftime('%Y-%m'), condominium=condominium
+        )
+
+    def get_summary_data(self, now, condominium):
+        per_category_query, recent_expenses_query = self.get_queries(now, condominium)
+        return self.build_summary(now, list(per_category_query), list(recent_expenses_query))
+
+    @staticmethod
+    def get_queries(now, condominium):
+        """
+        Returns the two independent querysets behind the payload: per-category
+        totals of `condominium` for the current and previous month, and its
+        recent expenses.
+        """
+        # Intervalos semiabertos [início, fim) para que o índice em date seja usado
+        current_month_start = now.date().replace(day=1)
+        previous_month_start = (current_month_start - datetime.timedelta(days=1)).replace(day=1)
+        next_month_start = (current_month_start + datetime.timedelta(days=32)).replace(day=1)
+        in_current_month = Q(date__gte=current_month_start)
+        in_previous_month = Q(date__lt=current_month_start)
+
+        # Uma única varredura dos dois meses, agrupada por categoria: os totais
+        # gerais e a categoria principal saem das mesmas linhas.
+        expenses = Expense.objects.for_condominium(condominium)
+        per_category = expenses.filter(
+            date__gte=previous_month_start,
+            date__lt=next_month_start
         ).values(
-            'category__name'
+            'category_id', 'category__name'
         ).annotate(
-            total=Sum('amount')
-        ).order_by('-total').first()
+            current=Sum('amount', filter=in_current_month),
+            previous=Sum('amount', filter=in_previous_month)
+        ).order_by()
 
-        recent_expenses_qs = Expense.objects.all().order_by('-date', '-pk')[:5]
-        recent_expenses_serializer = ExpenseSerializer(recent_expenses_qs, many=True)
+        recent_expenses = ExpenseRowSerializer.rows(expenses.order_by('-date', '-pk'))[:5]
+        return per_category, recent_expenses
+
+    @staticmethod
+    def build_summary(now, per_category, recent_expenses):
+        """
+        Builds the payload from the rows of get_queries().
+        Shared with the async variant in gestao.async_views.
+        """
+        total_this_month = Decimal('0.00')
+        total_previous_month = Decimal('0.00')
+        top_category_this_month_data = None
+        for item in per_category:
+            total_this_month += item['current'] or 0
+            total_previous_month += item['previous'] or 0
+            if item['category_id'] is None or item['current'] is None:
+                continue
+            if top_category_this_month_data is None or \
+                    item['current'] > top_category_this_month_data['total']:
+                top_category_this_month_data = {
+                    'category__name': item['category__name'],
+                    'total': item['current']
+                }
 
         data = {
             'summary_period_label': now.strftime('%m/%Y'),
             'current_month_total': total_this_month,
             'previous_month_total': total_previous_month,
             'top_category_current_month': top_category_this_month_data,
-            'recent_expenses': recent_expenses_serializer.data
+            'recent_expenses': ExpenseRowSerializer.many(recent_expenses)
         }
 
-        return Response(data)
+        return data
+
+
+class SyncView(APIView):
+    """
+    API View returning the categories and expenses created, changed or
+    deleted after a sync token (`since`), oldest change first, plus the
+    token to send next time (see gestao.sync). Without `since` it returns
+    everything; `limit` caps the page (more pages: has_more is true).
+    """
+    def get(self, request, format=None):
+        position = None
+        since = request.query_params.get('since')
+        if since:
+            try:
+                position = sync.decode_token(since)
+            except (TypeError, ValueError, KeyError, UnicodeError):
+                raise ValidationError({'since': "Invalid sync token."})
+        limit = request.query_params.get('limit')
+        try:
+            limit = min(int(limit), sync.MAX_LIMIT) if limit else sync.DEFAULT_LIMIT
+        except ValueError:
+            raise ValidationError({'limit': "Must be a positive integer."})
+        if limit < 1:
+            raise ValidationError({'limit': "Must be a positive integer."})
+        return Response(sync.changes_since(get_condominium(request), position, limit))
+
+
+class DashboardBundleView(APIView):
+    """
+    API View serving several read endpoints in one round-trip (see
+    gestao.bundle). POST {"parts": [{"resource": "expense-summary",
+    "name": "summary", "params": {"granularity": "week"}}, "categories"]};
+    each part comes back with its status, data and duration.
+    """
+    def post(self, request, format=None):
+        parts = bundle.parse_parts(request.data)
+        # Resolvido antes das partes, que o reaproveitam (mesmo HttpRequest copiado)
+        get_condominium(request)
+        return Response(bundle.run_bundle(request._request, parts))
+
+
+class CondominiumListView(generics.ListAPIView):
+    """
+    API View listing the condominiums the caller may act on (what the
+    X-Condominium header accepts), for the frontend's selector.
+    """
+    serializer_class = CondominiumSerializer
+
+    def get_queryset(self):
+        return tenancy.available_to(self.request.user)
+
+
+class JobListView(generics.ListAPIView):
+    """
+    API View listing the caller's most recent background jobs (all jobs for
+    staff), optionally filtered by `status`.
+    """
+    serializer_class = JobSerializer
+    limit = 100
+
+    def get_queryset(self):
+        queryset = Job.objects.all()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        job_status = self.request.query_params.get('status')
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset.order_by('-created_at', '-id')[:self.limit]
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    """
+    API View polled for the status and result of one background job.
+    """
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(created_by=self.request.user)
+
+
+class RequestMetricsView(APIView):
+    """
+    API View exposing the per-view request metrics collected by
+    RequestMetricsMiddleware in this process (staff only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, format=None):
+        return Response({
+            'enabled': getattr(settings, 'GESTAO_REQUEST_METRICS', False),
+            'views': metrics_registry.snapshot(),
+            'token_auth': token_cache.stats(),
+        })
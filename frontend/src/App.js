@@ -13,6 +13,7 @@ import HomePage from './HomePage';
 import ExpenseListPage from './ExpenseListPage';
 import DashboardPage from './DashboardPage';
 import CategoryManagementPage from './CategoryManagementPage';
+import CondominiumSelector from './CondominiumSelector';
 import LoginPage from './LoginPage';
 import { useAuth } from './context/AuthContext';
 import ProtectedRoute from './ProtectedRoute';
@@ -77,7 +78,8 @@ function App() {
 
         <Spacer display={{ base: 'none', md: 'block' }} />
 
-        <Box>
+        <Flex align="center">
+            {auth.isAuthenticated && <CondominiumSelector />}
             {auth.isAuthenticated ? (
                 <Button onClick={handleLogout} colorScheme="teal" variant="solid" size="sm" _hover={{ bg: 'teal.700' }}>
                     Sair
@@ -89,7 +91,7 @@ function App() {
                     </Button>
                 </ChakraLink>
             )}
-        </Box>
+        </Flex>
         
         </Flex>
 
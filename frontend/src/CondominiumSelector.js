@@ -0,0 +1,66 @@
+import React, { useState, useEffect } from 'react';
+import axios from 'axios';
+import { Select } from '@chakra-ui/react';
+
+// Slug do condomínio escolhido; o interceptador do axios (index.js) manda no cabeçalho X-Condominium
+export const CONDOMINIUM_STORAGE_KEY = 'condominium';
+
+function CondominiumSelector() {
+  const [condominiums, setCondominiums] = useState([]);
+  const [selected, setSelected] = useState(localStorage.getItem(CONDOMINIUM_STORAGE_KEY) || '');
+
+  useEffect(() => {
+    const fetchCondominiums = async () => {
+      try {
+        const apiUrl = `${process.env.REACT_APP_API_BASE_URL}/condominiums/`;
+        const response = await axios.get(apiUrl);
+        const available = response.data || [];
+        setCondominiums(available);
+        const stored = localStorage.getItem(CONDOMINIUM_STORAGE_KEY);
+        const isValid = available.some(condominium => condominium.slug === stored);
+        if (stored && !isValid) {
+          localStorage.removeItem(CONDOMINIUM_STORAGE_KEY);
+        }
+        // Com mais de um condomínio o backend exige a escolha: fica o primeiro e as telas recarregam com ele
+        if (available.length > 1 && !isValid) {
+          localStorage.setItem(CONDOMINIUM_STORAGE_KEY, available[0].slug);
+        }
+        if (!isValid && (stored || available.length > 1)) {
+          window.location.reload();
+        }
+      } catch (err) {
+        console.error("Erro ao buscar condomínios:", err);
+      }
+    };
+    fetchCondominiums();
+  }, []);
+
+  const handleChange = (event) => {
+    const slug = event.target.value;
+    setSelected(slug);
+    localStorage.setItem(CONDOMINIUM_STORAGE_KEY, slug);
+    // Todas as telas buscam os dados do novo condomínio
+    window.location.reload();
+  };
+
+  if (condominiums.length < 2) return null;
+
+  return (
+    <Select
+      aria-label="Condomínio"
+      value={selected}
+      onChange={handleChange}
+      size="sm"
+      maxW="220px"
+      mr={4}
+      bg="white"
+      color="gray.800"
+    >
+      {condominiums.map(condominium => (
+        <option key={condominium.id} value={condominium.slug}>{condominium.name}</option>
+      ))}
+    </Select>
+  );
+}
+
+export default CondominiumSelector;
@@ -14,18 +14,48 @@ function ExpenseListPage() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [editingExpense, setEditingExpense] = useState(null);
+  // Listagem paginada por cursor: `next` é a URL da página seguinte (null na última)
+  const [nextPageUrl, setNextPageUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const { isOpen: isEditModalOpen, onOpen: onEditModalOpen, onClose: onEditModalClose } = useDisclosure();
 
   const toast = useToast();
 
   const fetchExpenses = useCallback(async () => {
-    setLoading(true); setError(null); try { const apiUrl = `${process.env.REACT_APP_API_BASE_URL}/expenses/`; const response = await axios.get(apiUrl); setExpenses(response.data.results || response.data || []); } catch (err) { console.error("Erro ao buscar despesas:", err); setError("Falha ao carregar despesas."); setExpenses([]); } finally { setLoading(false); }
+    setLoading(true); setError(null); try { const apiUrl = `${process.env.REACT_APP_API_BASE_URL}/expenses/`; const response = await axios.get(apiUrl); setExpenses(response.data.results || response.data || []); setNextPageUrl(response.data.next || null); } catch (err) { console.error("Erro ao buscar despesas:", err); setError("Falha ao carregar despesas."); setExpenses([]); setNextPageUrl(null); } finally { setLoading(false); }
   }, []);
   useEffect(() => { fetchExpenses(); }, [fetchExpenses]);
 
-  const handleExpenseAdded = (newExpense) => {
+  const loadMoreExpenses = async () => {
+    if (!nextPageUrl) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(nextPageUrl);
+      // Ignora as que já estão na lista (ex.: adicionadas nesta tela)
+      setExpenses(prevExpenses => {
+        const shown = new Set(prevExpenses.map(expense => expense.id));
+        return [...prevExpenses, ...(response.data.results || []).filter(expense => !shown.has(expense.id))];
+      });
+      setNextPageUrl(response.data.next || null);
+    } catch (err) {
+      console.error("Erro ao buscar mais despesas:", err);
+      toast({ title: "Falha ao carregar mais despesas.", status: "error", duration: 5000, isClosable: true, position: "top-right" });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // O backend salva mesmo assim e só avisa quando já existe despesa igual (descrição, valor e semana)
+  const warnPossibleDuplicates = (possibleDuplicates) => {
+    if (possibleDuplicates && possibleDuplicates.length > 0) {
+      toast({ title: "Possível despesa duplicada", description: `Já existe despesa com a mesma descrição, valor e semana (ID ${possibleDuplicates.join(', ')}).`, status: "warning", duration: 8000, isClosable: true, position: "top-right" });
+    }
+  };
+
+  const handleExpenseAdded = ({ possible_duplicates, ...newExpense }) => {
     setExpenses(prevExpenses => [newExpense, ...prevExpenses]);
     toast({ title: "Despesa adicionada!", status: "success", duration: 3000, isClosable: true, position: "top-right" });
+    warnPossibleDuplicates(possible_duplicates);
   };
 
   const handleDeleteExpense = async (expenseId) => {
@@ -48,11 +78,12 @@ function ExpenseListPage() {
   };
 
   
-  const handleUpdateExpense = (updatedExpense) => {
+  const handleUpdateExpense = ({ possible_duplicates, ...updatedExpense }) => {
     setExpenses(prevExpenses => prevExpenses.map(expense => expense.id === updatedExpense.id ? updatedExpense : expense ));
     onEditModalClose(); 
     setEditingExpense(null); 
     toast({ title: "Despesa atualizada!", status: "success", duration: 3000, isClosable: true, position: "top-right" });
+    warnPossibleDuplicates(possible_duplicates);
   };
 
   
@@ -118,6 +149,13 @@ function ExpenseListPage() {
               ))}
             </Tbody>
           </Table>
+          {nextPageUrl && (
+            <Center py={4}>
+              <Button onClick={loadMoreExpenses} isLoading={loadingMore} variant="outline" colorScheme="teal">
+                Carregar mais
+              </Button>
+            </Center>
+          )}
         </Box>
       ) : (
         !loading && !error && <Text color="gray.500" mt={4}>Nenhuma despesa registrada.</Text>
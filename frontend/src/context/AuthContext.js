@@ -60,6 +60,8 @@ export const AuthProvider = ({ children }) => {
         setAuthLoading(true);
         console.log("AuthContext: Fazendo logout.");
         localStorage.removeItem('authToken');
+        // O próximo usuário pode ter outros condomínios
+        localStorage.removeItem('condominium');
         setToken(null);
         setIsAuthenticated(false);
         setUser(null);
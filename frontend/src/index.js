@@ -7,6 +7,7 @@ import { BrowserRouter } from 'react-router-dom';
 import { AuthProvider } from './context/AuthContext';
 import { ChakraProvider } from '@chakra-ui/react';
 import axios from 'axios';
+import { CONDOMINIUM_STORAGE_KEY } from './CondominiumSelector';
 
 axios.interceptors.request.use(
   config => {
@@ -15,6 +16,10 @@ axios.interceptors.request.use(
     if (token && config.url && config.url.startsWith(apiBaseUrl)) {
       config.headers['Authorization'] = `Token ${token}`;
     }
+    const condominium = localStorage.getItem(CONDOMINIUM_STORAGE_KEY);
+    if (condominium && config.url && config.url.startsWith(apiBaseUrl)) {
+      config.headers['X-Condominium'] = condominium;
+    }
     return config;
   },
   error => {